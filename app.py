@@ -1,19 +1,85 @@
 import random
-import time
 import csv
 import os
-from datetime import datetime
-from dashboard import show_dashboard
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from functools import lru_cache
+from dashboard import DashboardRenderer, show_dashboard
+from wo_store import VersionConflict, WorkOrderStore
+from file_lock import FileLock
+from sla_monitor import SlaMonitor
+from queue_index import PriorityIndex
+from sqlite_store import SqliteWorkOrderStore, read_rows as read_sqlite_rows
+from wo_ids import WorkOrderIdAllocator
+from wo_schema import CsvSchema
+from wo_archive import WorkOrderArchive
+from wo_docs import DocumentContainer
+from sim_clock import RealClock
+from event_log import CsvStream, EventLog
+from records import FaultEvent, make_record_class
+from metrics import METRICS, format_metrics_table
 
 # ----------------------------
 # CONFIG
 # ----------------------------
 COUNTER_FILE = "wo_counter.txt"
 WORK_ORDERS_CSV = "work_orders.csv"
+WORK_ORDERS_LOG = "work_orders.log"   # append-only change log, folded into the CSV on compaction
 FAULT_LOG_TXT = "fault_log.txt"
+FAULT_LOG_JSONL = "fault_log.jsonl"   # same events, one JSON object per line
 REPORT_TXT = "report_summary.txt"
+METRICS_PROM = "metrics.prom"         # Prometheus text format, written next to REPORT_TXT
+METRICS_JSON = "metrics.json"
 FAULT_HISTORY_CSV = "fault_history.csv"
 
+# Work order storage: "csv" (work_orders.csv + change log) or "sqlite" (work_orders.db)
+STORAGE_BACKEND = os.environ.get("FSD_STORAGE_BACKEND", "csv").strip().lower()
+WORK_ORDERS_DB = "work_orders.db"
+SQLITE_EXPORT_CSV_ON_CLOSE = True   # keep work_orders.csv current for reports
+
+# The queue view shows breaches live; the SLA scan persists them at most this often (sim seconds)
+SLA_PERSIST_INTERVAL_SEC = 60
+
+# Archive: CLOSED orders leave work_orders.csv for dated, append-only partitions
+# (work_orders_archive/work_orders_YYYY-MM.csv) whenever the store compacts
+ARCHIVE_DIR = "work_orders_archive"
+ARCHIVE_CLOSED = True
+ARCHIVE_BREACHED_AFTER_DAYS = None   # also archive BREACHED orders untouched this long (on close / archive run)
+REPORT_HISTORY_DAYS = 30             # work order history window in report_summary.txt
+
+# Work order documents: "files" (one work_order_<WO_ID>_<ts>.txt each) or "container"
+# (one append-only work_orders.wod + offset index; Work_Order_File = "work_orders.wod#<WO_ID>")
+WORK_ORDER_DOCS = os.environ.get("FSD_WORK_ORDER_DOCS", "files").strip().lower()
+WORK_ORDER_CONTAINER = "work_orders.wod"
+WORK_ORDER_DOCS_LAZY = None   # container: store fields, render on first read (None = lazy when not interactive)
+
+WO_ID_BLOCK_SIZE = 100   # WO numbers reserved per counter-file lock (see wo_ids.py)
+
+# Several consoles may share one working directory: csv store writes hold an advisory
+# lock (work_orders.csv.lock) and read-modify-writes retry on a Row_Version conflict
+WORK_ORDERS_LOCK_TIMEOUT_SEC = 10.0
+WO_WRITE_RETRIES = 5
+
+# Events / work order rows as compact slots records with interned codes (records.py);
+# False keeps plain dicts
+COMPACT_RECORDS = True
+
+# Fault event log (see event_log.py): buffered writers, flushed on size or time
+EVENT_LOG_FORMATS = ("text", "jsonl")   # legacy pipe-delimited fault_log.txt and/or fault_log.jsonl
+EVENT_LOG_FLUSH_BYTES = 64 * 1024
+EVENT_LOG_FLUSH_SEC = 1.0
+EVENT_LOG_ROTATE_BYTES = 50 * 1024 * 1024   # None = never rotate by size
+EVENT_LOG_ROTATE_DAILY = False
+EVENT_LOG_COMPRESS = True                   # gzip rotated segments
+
+# Fault history: streamed to fault_history.csv as events happen
+FAULT_HISTORY_FLUSH_ROWS = 50
+FAULT_HISTORY_FLUSH_SEC = 1.0
+EVENT_HISTORY_RING = 500     # recent events kept in memory (dashboard)
+DASHBOARD_RECENT_EVENTS = 5
+DASHBOARD_MAX_FPS = 10.0     # redraw cap; updates in between are coalesced (no-TTY output skips the dashboard)
+
 # Fault list with severity levels
 FAULTS = [
     {"name": "Motor Overload", "severities": ["Minor", "Major", "Critical"]},
@@ -26,6 +92,23 @@ FAULTS = [
     {"name": "Power Surge", "severities": ["Critical"]},
 ]
 
+# Relative arrival weights per fault name (None = uniform, like random.choice)
+FAULT_WEIGHTS = None
+
+# SLA per priority (minutes); unknown priorities get LOW's SLA
+SLA_MINUTES = {"HIGH": 15, "MEDIUM": 60, "LOW": 240}
+
+# Repair minutes by outcome (correct action?) and severity
+REPAIR_MINUTES = {
+    True: {"Minor": 2, "Major": 5, "Critical": 7},
+    False: {"Minor": 12, "Major": 8, "Critical": 12},
+}
+
+# Site status thresholds (apply_escalation_rules / SLA scan)
+STOP_WORK_CRITICAL_WRONG = 2      # critical faults handled wrong => STOP WORK
+WATCH_ESCALATIONS = 3             # escalations => WATCH
+STOP_WORK_HIGH_SLA_BREACHES = 2   # HIGH breaches found in one scan => STOP WORK
+
 # Stats
 fault_count = {f["name"]: 0 for f in FAULTS}
 total_repair_time = 0
@@ -44,50 +127,86 @@ status_flags = {
     "site_status": "NORMAL",  # NORMAL | WATCH | STOP WORK
 }
 
-# In-memory event history for CSV export
-event_history = []
+# Recent events only (ring buffer); the full history is streamed to FAULT_HISTORY_CSV
+event_history = deque(maxlen=EVENT_HISTORY_RING)
 
 # ----------------------------
 # TIME HELPERS
 # ----------------------------
+# All timestamps, ages, SLA checks and main-loop sleeps read this clock.
+# Swap in sim_clock.VirtualClock (set_clock) to run simulated time.
+CLOCK = RealClock()
+
+
+def set_clock(clock):
+    global CLOCK
+    CLOCK = clock
+    return clock
+
+
 def now_iso() -> str:
-    return datetime.now().isoformat(sep=" ", timespec="seconds")
+    return CLOCK.now().isoformat(sep=" ", timespec="seconds")
+
+
+_MONTHS = {m: i for i, m in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), start=1)}
+
+
+def _parse_iso(v: str):
+    # "2026-02-09 00:13:12", "2026-02-09T00:13:12", "2026-02-09 00:13"
+    if len(v) not in (16, 19) or v[4] != "-" or v[10] not in (" ", "T"):
+        return None
+    try:
+        return datetime.fromisoformat(v)
+    except ValueError:
+        return None
+
+
+def _parse_ctime(v: str):
+    # "Mon Feb  9 00:13:28 2026" (time.ctime pads the day with a space)
+    parts = v.split()
+    if len(parts) != 5 or parts[1] not in _MONTHS:
+        return None
+    try:
+        h, m, s = parts[3].split(":")
+        return datetime(int(parts[4]), _MONTHS[parts[1]], int(parts[2]), int(h), int(m), int(s))
+    except ValueError:
+        return None
 
 
+@lru_cache(maxsize=65536)
 def _parse_dt(value: str):
     """
     Parses timestamps from:
     - ISO: "2026-02-09 00:13:12" or with "T"
     - time.ctime: "Sun Feb  9 00:13:12 2026"
-    Returns datetime or None.
+    Returns datetime or None. The format is picked from the shape of the value
+    (no trial-and-error strptime) and results are memoized per string.
     """
     if not value:
         return None
     v = value.strip()
-    v2 = v.replace("T", " ")
-    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"):
-        try:
-            return datetime.strptime(v2, fmt)
-        except:
-            pass
-    try:
-        return datetime.strptime(v, "%a %b %d %H:%M:%S %Y")
-    except:
-        pass
-    try:
-        return datetime.strptime(v, "%a %b  %d %H:%M:%S %Y")
-    except:
-        pass
-    return None
+    if v[:1].isdigit():
+        return _parse_iso(v)
+    return _parse_ctime(v)
 
 
-def _age_minutes(created_ts: str) -> int:
-    dt = _parse_dt(created_ts)
-    if not dt:
+def to_epoch(value: str):
+    """Timestamp string -> int epoch seconds (local time), or None."""
+    dt = _parse_dt(value)
+    return int(dt.timestamp()) if dt else None
+
+
+def _age_minutes_epoch(created_epoch, now_epoch: float | None = None) -> int:
+    if created_epoch is None:
         return -1
-    delta = datetime.now() - dt
-    mins = int(delta.total_seconds() // 60)
-    return max(mins, 0)
+    if now_epoch is None:
+        now_epoch = CLOCK.time()
+    return max(int((now_epoch - created_epoch) // 60), 0)
+
+
+def _age_minutes(created_ts: str) -> int:
+    return _age_minutes_epoch(to_epoch(created_ts))
 
 
 # ----------------------------
@@ -104,11 +223,7 @@ def severity_to_priority(sev: str) -> str:
 
 def priority_to_sla_minutes(priority: str) -> int:
     p = (priority or "").strip().upper()
-    if p == "HIGH":
-        return 15
-    if p == "MEDIUM":
-        return 60
-    return 240
+    return SLA_MINUTES.get(p, SLA_MINUTES["LOW"])
 
 
 def priority_rank(priority: str) -> int:
@@ -119,25 +234,38 @@ def priority_rank(priority: str) -> int:
 # ----------------------------
 # WORK ORDER ID (PERSISTENT)
 # ----------------------------
-def _ensure_counter_file():
-    if not os.path.exists(COUNTER_FILE):
-        with open(COUNTER_FILE, "w", encoding="utf-8") as f:
-            f.write("0")
+_id_allocator = None
+
+
+def _max_issued_wo_number(deep: bool = True) -> int:
+    # Highest WO-###### already in the live queue (counter recovery on startup);
+    # the archive is only scanned when wo_counter.txt has no high-water mark
+    best = get_work_order_archive().max_wo_number() if deep else 0
+    for r in get_work_order_store().iter_rows():
+        wo_id = r.get("WO_ID", "")
+        if wo_id.startswith("WO-") and wo_id[3:].isdigit():
+            best = max(best, int(wo_id[3:]))
+    return best
 
 
 def next_work_order_id() -> str:
-    _ensure_counter_file()
-    try:
-        with open(COUNTER_FILE, "r", encoding="utf-8") as f:
-            current = int(f.read().strip() or "0")
-    except:
-        current = 0
+    """
+    Allocates the next WO ID: locked, block-reserved and crash-safe across
+    concurrent terminals (WorkOrderIdAllocator). Re-opens if COUNTER_FILE moved.
+    """
+    global _id_allocator
+    if _id_allocator is None or _id_allocator.counter_path != COUNTER_FILE:
+        release_work_order_ids()
+        _id_allocator = WorkOrderIdAllocator(COUNTER_FILE, WO_ID_BLOCK_SIZE, recover=_max_issued_wo_number)
+    return _id_allocator.next_id()
 
-    current += 1
-    with open(COUNTER_FILE, "w", encoding="utf-8") as f:
-        f.write(str(current))
 
-    return f"WO-{current:06d}"
+def release_work_order_ids():
+    """Returns unused reserved WO numbers to wo_counter.txt (if no one reserved after us)."""
+    global _id_allocator
+    if _id_allocator is not None:
+        _id_allocator.release()
+        _id_allocator = None
 
 
 # ----------------------------
@@ -161,77 +289,307 @@ WORK_ORDER_COLUMNS = [
     "Closed_Timestamp",
     "Closeout_Notes",
     "Breach_Reason",         # NEW: why it breached (e.g., SLA exceeded)
+    "Created_Epoch",         # Created_Timestamp as int epoch seconds (age/SLA math without parsing)
+    "Assigned_Tech",         # technician the dispatcher sent (dispatch.py), blank = unassigned
+    "Row_Version",           # bumped by every update (optimistic concurrency, see modify_work_order)
 ]
 
+# Row type for the CSV-backed store (dict-compatible: get / [] / update)
+WorkOrderRecord = make_record_class("WorkOrderRecord", WORK_ORDER_COLUMNS)
+
+
+def row_created_epoch(row: dict):
+    v = row.get("Created_Epoch")
+    if v:
+        try:
+            return int(v)
+        except ValueError:
+            pass
+    return to_epoch(row.get("Created_Timestamp", ""))
+
+
+def _migrate_v1_add_created_epoch(row: dict):
+    if not row.get("Created_Epoch"):
+        epoch = to_epoch(row.get("Created_Timestamp", ""))
+        row["Created_Epoch"] = "" if epoch is None else str(epoch)
+
+
+def _migrate_v2_add_assigned_tech(row: dict):
+    row.setdefault("Assigned_Tech", "")
+
+
+def _migrate_v3_add_row_version(row: dict):
+    if not row.get("Row_Version"):
+        row["Row_Version"] = "0"
+
+
+# work_orders.csv header per schema version (last = WORK_ORDER_COLUMNS) and the
+# row migration from each version to the next; see wo_schema.CsvSchema
+WORK_ORDER_SCHEMA = CsvSchema(
+    versions=[
+        WORK_ORDER_COLUMNS[:17],   # v1: through Breach_Reason
+        WORK_ORDER_COLUMNS[:18],   # v2: + Created_Epoch
+        WORK_ORDER_COLUMNS[:19],   # v3: + Assigned_Tech
+        WORK_ORDER_COLUMNS,        # v4: + Row_Version
+    ],
+    migrations={
+        1: _migrate_v1_add_created_epoch,
+        2: _migrate_v2_add_assigned_tech,
+        3: _migrate_v3_add_row_version,
+    },
+)
+
 
 def ensure_work_orders_csv_schema():
-    if not os.path.exists(WORK_ORDERS_CSV):
-        with open(WORK_ORDERS_CSV, "w", newline="", encoding="utf-8") as f:
-            csv.writer(f).writerow(WORK_ORDER_COLUMNS)
+    """
+    Creates or migrates work_orders.csv to the current schema version. Only the
+    header line is read, and only when the file's inode/mtime changed since the
+    last check; an upgrade is one streaming pass + atomic rename, done under
+    the store's lock (work_orders.csv.lock) so other consoles' writes and
+    compactions cannot interleave with it.
+    """
+    if WORK_ORDER_SCHEMA.is_current(WORK_ORDERS_CSV):
         return
+    started = METRICS.clock() if METRICS.enabled else None
+    lock = FileLock(WORK_ORDERS_CSV + ".lock", timeout=WORK_ORDERS_LOCK_TIMEOUT_SEC)
+    written = WORK_ORDER_SCHEMA.ensure(WORK_ORDERS_CSV, lock=lock)
+    if written and started is not None:
+        METRICS.observe("csv_write", METRICS.clock() - started)
+        METRICS.add_bytes("csv_write", written)
 
-    with open(WORK_ORDERS_CSV, "r", newline="", encoding="utf-8") as f:
-        rows = list(csv.reader(f))
 
-    if not rows:
-        with open(WORK_ORDERS_CSV, "w", newline="", encoding="utf-8") as f:
-            csv.writer(f).writerow(WORK_ORDER_COLUMNS)
-        return
+_wo_store = None
+_sla_monitor = SlaMonitor()
 
-    existing_header = rows[0]
-    if existing_header == WORK_ORDER_COLUMNS:
-        return
+SLA_ACTIVE_STATUSES = ("OPEN", "IN_PROGRESS")
+QUEUE_ACTIVE_STATUSES = ("OPEN", "IN_PROGRESS", "BREACHED")
 
-    old_cols = existing_header
-    data_rows = rows[1:]
+_queue_index = PriorityIndex(SLA_ACTIVE_STATUSES)
 
-    upgraded = []
-    for r in data_rows:
-        d = {old_cols[i]: (r[i] if i < len(r) else "") for i in range(len(old_cols))}
-        for col in WORK_ORDER_COLUMNS:
-            if col not in d:
-                d[col] = ""
-        upgraded.append(d)
 
-    with open(WORK_ORDERS_CSV, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(WORK_ORDER_COLUMNS)
-        for d in upgraded:
-            w.writerow([d.get(col, "") for col in WORK_ORDER_COLUMNS])
+def _sqlite_derived_fields(row: dict) -> dict:
+    # Numeric columns the SQLite indexes sort/filter on (see sqlite_store.DERIVED_COLUMNS)
+    status = (row.get("Status", "") or "").strip().upper()
+    created = row_created_epoch(row)
+    sla = _safe_int(row.get("SLA_Minutes"), 999999)
+    return {
+        "q_status": status,
+        "q_priority": (row.get("Priority", "") or "").strip().upper(),
+        "q_pr_rank": priority_rank(row.get("Priority")),
+        "q_sla_min": sla,
+        "q_created": created if created is not None else 1e18,
+        "q_deadline": sla_deadline_epoch(created, sla),
+        "q_breached": 0 if status == "BREACHED" else 1,
+    }
 
 
-def append_work_order_to_queue(wo_row: dict):
-    ensure_work_orders_csv_schema()
-    with open(WORK_ORDERS_CSV, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow([wo_row.get(col, "") for col in WORK_ORDER_COLUMNS])
+def open_sqlite_store(import_csv: bool = True) -> SqliteWorkOrderStore:
+    """
+    Opens work_orders.db; on first use it is seeded from work_orders.csv.
+    """
+    fresh = not os.path.exists(WORK_ORDERS_DB)
+    store = SqliteWorkOrderStore(
+        WORK_ORDERS_DB,
+        WORK_ORDER_COLUMNS,
+        _sqlite_derived_fields,
+        sla_statuses=SLA_ACTIVE_STATUSES,
+        queue_statuses=QUEUE_ACTIVE_STATUSES,
+        history_columns=FAULT_HISTORY_COLUMNS,
+        csv_path=WORK_ORDERS_CSV,
+    )
+    if fresh and import_csv and os.path.exists(WORK_ORDERS_CSV):
+        ensure_work_orders_csv_schema()
+        store.import_csv(WORK_ORDERS_CSV)
+    return store
+
+
+def get_work_order_store():
+    """
+    Opens the work order store once per process (schema checked on open):
+    - csv:    indexed WorkOrderStore + in-memory SLA heap / queue index
+    - sqlite: SqliteWorkOrderStore, whose SQL view and queries replace both
+    Re-opens if WORK_ORDERS_CSV has been pointed somewhere else.
+    """
+    global _wo_store, _sla_monitor, _queue_index
+    if _wo_store is None or _wo_store.csv_path != WORK_ORDERS_CSV:
+        if _wo_store is not None:
+            close_work_order_store()
+
+        if STORAGE_BACKEND == "sqlite":
+            _wo_store = open_sqlite_store()
+            _sla_monitor = _wo_store.sla
+            return _wo_store
+
+        ensure_work_orders_csv_schema()
+        with METRICS.stage("csv_read") as st:
+            _wo_store = WorkOrderStore(
+                WORK_ORDERS_CSV,
+                WORK_ORDER_COLUMNS,
+                WORK_ORDERS_LOG,
+                record_class=WorkOrderRecord if COMPACT_RECORDS else None,
+                evict=_is_closed if ARCHIVE_CLOSED else None,
+                archive=_archive_rows,
+                lock_path=WORK_ORDERS_CSV + ".lock",
+                lock_timeout=WORK_ORDERS_LOCK_TIMEOUT_SEC,
+            )
+            if METRICS.enabled:
+                st.add_bytes(sum(os.path.getsize(p) for p in (WORK_ORDERS_CSV, WORK_ORDERS_LOG) if os.path.exists(p)), "read")
+
+        _sla_monitor = SlaMonitor()
+        _queue_index = PriorityIndex(SLA_ACTIVE_STATUSES)
+        for r in _wo_store.rows:
+            _track_sla(r)
+            _index_queue(r)
+        _wo_store.subscribe(_track_sla, on_drop=_untrack_sla)
+        _wo_store.subscribe(_index_queue, on_drop=_unindex_queue)
+    return _wo_store
+
+
+def close_work_order_store():
+    """
+    Compacts pending changes into work_orders.csv, archiving finished orders
+    first (sqlite: exports the table to it).
+    """
+    global _wo_store
+    if _wo_store is not None:
+        with METRICS.stage("csv_write") as st:
+            before = getattr(_wo_store, "bytes_written", 0)
+            if isinstance(_wo_store, SqliteWorkOrderStore) and SQLITE_EXPORT_CSV_ON_CLOSE:
+                _wo_store.export_csv(_wo_store.csv_path)
+                st.add_bytes(os.path.getsize(_wo_store.csv_path))
+            if isinstance(_wo_store, WorkOrderStore):
+                _wo_store.compact(evict=_is_archivable)
+            _wo_store.close()
+            st.add_bytes(getattr(_wo_store, "bytes_written", 0) - before)
+        _wo_store = None
+
+
+def work_order_store_batch():
+    """
+    `with work_order_store_batch(): ...` groups several work order writes
+    under one store lock (csv backend; sqlite commits per write anyway).
+    """
+    store = get_work_order_store()
+    return store.locked() if isinstance(store, WorkOrderStore) else nullcontext()
 
 
-def update_work_order_row(wo_id: str, updates: dict) -> bool:
-    ensure_work_orders_csv_schema()
+def _store_write(fn, *args):
+    # One work order store change, timed with the change-log / compaction bytes it wrote
+    if not METRICS.enabled:
+        result = fn(*args)
+    else:
+        store = get_work_order_store()
+        before = getattr(store, "bytes_written", 0)
+        with METRICS.stage("wo_store_write") as st:
+            result = fn(*args)
+            st.add_bytes(getattr(store, "bytes_written", 0) - before)
+    return result
 
-    with open(WORK_ORDERS_CSV, "r", newline="", encoding="utf-8") as f:
-        rows = list(csv.reader(f))
-
-    header = rows[0]
-    idx_map = {name: i for i, name in enumerate(header)}
-    updated = False
-
-    for i in range(1, len(rows)):
-        if len(rows[i]) < len(header):
-            rows[i] += [""] * (len(header) - len(rows[i]))
-        if rows[i][idx_map["WO_ID"]] == wo_id:
-            for k, v in updates.items():
-                if k in idx_map:
-                    rows[i][idx_map[k]] = str(v)
-            updated = True
-            break
 
-    if updated:
-        with open(WORK_ORDERS_CSV, "w", newline="", encoding="utf-8") as f:
-            csv.writer(f).writerows(rows)
+# ----------------------------
+# WORK ORDER ARCHIVE
+# ----------------------------
+_wo_archive = None
+
+
+def _row_settled_dt(row: dict):
+    # Partition / history date: when the order was closed, else last touched, else created
+    for col in ("Closed_Timestamp", "Last_Updated", "Created_Timestamp"):
+        dt = _parse_dt(row.get(col, "") or "")
+        if dt is not None:
+            return dt
+    return None
+
+
+def get_work_order_archive() -> WorkOrderArchive:
+    global _wo_archive
+    if _wo_archive is None or _wo_archive.directory != ARCHIVE_DIR:
+        _wo_archive = WorkOrderArchive(ARCHIVE_DIR, WORK_ORDER_COLUMNS, _row_settled_dt)
+    return _wo_archive
+
 
-    return updated
+def _is_closed(row: dict) -> bool:
+    return (row.get("Status", "") or "").strip().upper() == "CLOSED"
+
+
+def _is_archivable(row: dict) -> bool:
+    # CLOSED (if ARCHIVE_CLOSED), or BREACHED and untouched for ARCHIVE_BREACHED_AFTER_DAYS
+    status = (row.get("Status", "") or "").strip().upper()
+    if status == "CLOSED":
+        return ARCHIVE_CLOSED
+    if status == "BREACHED" and ARCHIVE_BREACHED_AFTER_DAYS is not None:
+        touched = _parse_dt(row.get("Last_Updated", "") or "")
+        return touched is not None and (CLOCK.now() - touched).days >= ARCHIVE_BREACHED_AFTER_DAYS
+    return False
+
+
+def _archive_rows(rows: list):
+    archive = get_work_order_archive()
+    before = archive.bytes_written
+    with METRICS.stage("archive_write") as st:
+        archive.append(rows)
+        st.add_bytes(archive.bytes_written - before)
+
+
+def archive_work_orders() -> int:
+    """
+    Moves finished orders (see _is_archivable) out of work_orders.csv into the
+    archive now. Returns how many were archived (csv backend only).
+    """
+    store = get_work_order_store()
+    if not isinstance(store, WorkOrderStore):
+        return 0
+    return store.compact(evict=_is_archivable)
+
+
+def iter_work_order_history(start: datetime | None = None, end: datetime | None = None):
+    """
+    Work orders settled (closed / last touched / created) within [start, end]:
+    archive partitions overlapping the range first, then the live ones.
+    """
+    yield from get_work_order_archive().iter_rows(start, end)
+    for row in get_work_order_store().iter_rows():
+        if start is not None or end is not None:
+            dt = _row_settled_dt(row)
+            if dt is None or (start is not None and dt < start) or (end is not None and dt > end):
+                continue
+        yield row
+
+
+def append_work_order_to_queue(wo_row: dict):
+    _store_write(get_work_order_store().append, wo_row)
+
+
+def update_work_order_row(wo_id: str, updates: dict, expected_version: int | None = None) -> bool:
+    """Raises VersionConflict if expected_version is given and the row has moved on."""
+    return _store_write(get_work_order_store().update, wo_id, updates, expected_version)
+
+
+def modify_work_order(wo_id: str, fn, retries: int | None = None) -> bool:
+    """
+    Optimistic read-modify-write of one work order:
+    - fn(row) gets a copy of the row and returns the updates (None = leave it)
+    - the write only lands if Row_Version is still the one fn saw; otherwise
+      the store catches up on the other writer and fn runs again, up to
+      `retries` times (default WO_WRITE_RETRIES) before VersionConflict is raised
+    Returns True if an update was written.
+    """
+    store = get_work_order_store()
+    retries = WO_WRITE_RETRIES if retries is None else retries
+    for attempt in range(retries + 1):
+        row = store.get(wo_id)
+        if row is None:
+            return False
+        updates = fn(dict(row))
+        if not updates:
+            return False
+        try:
+            return update_work_order_row(wo_id, updates, store.row_version(row))
+        except VersionConflict:
+            METRICS.incr("wo_version_conflicts")
+            if attempt == retries:
+                raise
+            store.refresh()
 
 
 # ----------------------------
@@ -244,100 +602,211 @@ def _safe_int(v, default=999999):
         return default
 
 
-def sla_breach_escalation_scan():
+def sla_deadline_epoch(created_epoch, sla_minutes: int):
     """
-    Scans work_orders.csv:
-    - If OPEN/IN_PROGRESS and AGE > SLA => mark BREACHED, escalate, update site status
-    - Updates global status_flags counts and site status
+    Epoch second at which AGE > SLA first holds (AGE is whole minutes), or None.
     """
-    ensure_work_orders_csv_schema()
-    if not os.path.exists(WORK_ORDERS_CSV):
-        return
+    if created_epoch is None or sla_minutes == 999999:
+        return None
+    return created_epoch + (sla_minutes + 1) * 60
 
-    # Reset breach counters each scan
-    status_flags["sla_breaches"] = 0
-    status_flags["high_sla_breaches"] = 0
 
-    with open(WORK_ORDERS_CSV, "r", newline="", encoding="utf-8") as f:
-        rows = list(csv.DictReader(f))
+def _track_sla(row: dict):
+    # Store listener: keeps the SLA deadline heap in step with status changes
+    wo_id = row.get("WO_ID", "")
+    if (row.get("Status", "") or "").strip().upper() in SLA_ACTIVE_STATUSES:
+        deadline = sla_deadline_epoch(row_created_epoch(row), _safe_int(row.get("SLA_Minutes"), 999999))
+        if deadline is not None:
+            _sla_monitor.track(wo_id, deadline)
+            return
+    _sla_monitor.untrack(wo_id)
 
-    for r in rows:
-        st = (r.get("Status", "") or "").strip().upper()
-        if st not in ("OPEN", "IN_PROGRESS"):
+
+def _untrack_sla(row: dict):
+    _sla_monitor.untrack(row.get("WO_ID", ""))
+
+
+def next_sla_breach_minutes():
+    """Minutes until the next OPEN/IN_PROGRESS order breaches (None if none pending)."""
+    get_work_order_store()
+    return _sla_monitor.next_breach_minutes(CLOCK.time())
+
+
+@METRICS.timed("sla_scan")
+def sla_breach_escalation_scan(flags: dict | None = None) -> int:
+    """
+    Pops expired deadlines from the SLA monitor (no full rescan):
+    - If OPEN/IN_PROGRESS and AGE > SLA => mark BREACHED, escalate, update site status
+    - All transitions are committed in one write (none if nothing breached)
+    - Updates status_flags counts and site status (global unless flags is given)
+    - Sets status_flags["next_breach_min"] for the dashboard
+    Returns the number of rows marked BREACHED.
+    """
+    flags = status_flags if flags is None else flags
+    store = get_work_order_store()
+
+    # Reset breach counters each scan
+    flags["sla_breaches"] = 0
+    flags["high_sla_breaches"] = 0
+
+    now = CLOCK.time()
+    changes = []
+    high = set()
+    stamp = None
+    for wo_id in _sla_monitor.pop_expired(now):
+        r = store.get(wo_id)
+        if r is None:
             continue
 
-        created = r.get("Created_Timestamp", "")
-        age = _age_minutes(created)
+        age = _age_minutes_epoch(row_created_epoch(r), now)
         sla = _safe_int(r.get("SLA_Minutes"), 999999)
 
         if age >= 0 and sla != 999999 and age > sla:
-            status_flags["sla_breaches"] += 1
             if (r.get("Priority", "") or "").strip().upper() == "HIGH":
-                status_flags["high_sla_breaches"] += 1
+                high.add(wo_id)
 
-            wo_id = r.get("WO_ID", "")
-            # Update row to BREACHED (idempotent)
-            update_work_order_row(wo_id, {
+            stamp = stamp or now_iso()
+            # Update row to BREACHED (idempotent); skipped if another console
+            # changed the row since we read it (its new state is re-tracked)
+            changes.append((wo_id, {
                 "Status": "BREACHED",
                 "Escalation": "AUTO ESCALATE: SLA BREACH",
                 "Site_Status": "WATCH",  # may be overridden below
                 "Breach_Reason": f"SLA exceeded (AGE {age}m > SLA {sla}m)",
-                "Last_Updated": now_iso(),
-            })
+                "Last_Updated": stamp,
+            }, store.row_version(r)))
+
+    # Count only the rows the write applied; a conflicting row was changed
+    # by another console and is re-tracked from its new state
+    applied = _store_write(store.update_many, changes) if changes else []
+    flags["sla_breaches"] = len(applied)
+    flags["high_sla_breaches"] = sum(1 for wo_id in applied if wo_id in high)
+    METRICS.incr("sla_breaches", len(applied))
+    flags["next_breach_min"] = _sla_monitor.next_breach_minutes(now)
 
     # Site status rules based on breaches (plus existing safety rules)
     # If 2+ HIGH breaches => STOP WORK
-    if status_flags["high_sla_breaches"] >= 2:
-        status_flags["site_status"] = "STOP WORK"
-    elif status_flags["sla_breaches"] >= 1:
+    if flags["high_sla_breaches"] >= STOP_WORK_HIGH_SLA_BREACHES:
+        flags["site_status"] = "STOP WORK"
+    elif flags["sla_breaches"] >= 1:
         # any breach => WATCH unless already STOP WORK
-        if status_flags["site_status"] != "STOP WORK":
-            status_flags["site_status"] = "WATCH"
+        if flags["site_status"] != "STOP WORK":
+            flags["site_status"] = "WATCH"
     else:
         # keep NORMAL unless safety rules already made it stricter
-        if status_flags["critical_wrong"] >= 2:
-            status_flags["site_status"] = "STOP WORK"
-        elif status_flags["escalations"] >= 3:
-            status_flags["site_status"] = "WATCH"
+        if flags["critical_wrong"] >= STOP_WORK_CRITICAL_WRONG:
+            flags["site_status"] = "STOP WORK"
+        elif flags["escalations"] >= WATCH_ESCALATIONS:
+            flags["site_status"] = "WATCH"
         else:
-            status_flags["site_status"] = "NORMAL"
+            flags["site_status"] = "NORMAL"
+
+    return len(applied)
+
+
+_last_sla_persist = None
+
+
+def persist_sla_breaches(flags: dict | None = None, force: bool = False) -> int:
+    """
+    Rate-limited SLA scan: runs sla_breach_escalation_scan at most once per
+    SLA_PERSIST_INTERVAL_SEC of clock time (force=True always runs it).
+    Returns the number of rows marked BREACHED (0 if skipped).
+    """
+    global _last_sla_persist
+    now = CLOCK.time()
+    if not force and _last_sla_persist is not None and now - _last_sla_persist < SLA_PERSIST_INTERVAL_SEC:
+        return 0
+    _last_sla_persist = now
+    return sla_breach_escalation_scan(flags)
 
 
 # ----------------------------
 # SUPERVISOR QUEUE VIEW
 # ----------------------------
-def supervisor_queue_view(limit: int = 15):
+def queue_sort_key(row: dict) -> tuple:
     """
-    Shows OPEN + IN_PROGRESS + BREACHED (active), sorted:
+    Supervisor queue order:
     - Breached first
     - Priority (HIGH -> LOW)
     - SLA minutes (shortest first)
-    - Age (oldest first)
+    - Age (oldest first == earliest Created_Timestamp; unparseable last)
     """
-    sla_breach_escalation_scan()
-    ensure_work_orders_csv_schema()
-
-    if not os.path.exists(WORK_ORDERS_CSV):
-        print("\nSUPERVISOR QUEUE: (no work_orders.csv found yet)\n")
-        return
+    created = row_created_epoch(row)
+    return (
+        0 if (row.get("Status", "") or "").strip().upper() == "BREACHED" else 1,
+        priority_rank(row.get("Priority")),
+        _safe_int(row.get("SLA_Minutes"), 999999),
+        created if created is not None else float("inf"),
+    )
+
+
+def _row_sla_deadline(row: dict):
+    return sla_deadline_epoch(row_created_epoch(row), _safe_int(row.get("SLA_Minutes"), 999999))
+
+
+def _index_queue(row: dict):
+    # Store listener: keeps the supervisor queue index in step with status changes
+    wo_id = row.get("WO_ID", "")
+    status = (row.get("Status", "") or "").strip().upper()
+    if status in QUEUE_ACTIVE_STATUSES:
+        _queue_index.upsert(
+            wo_id, status, row.get("Priority"), row.get("Fault"),
+            queue_sort_key(row)[1:],   # breach group is decided at view time
+            _row_sla_deadline(row),
+        )
+    else:
+        _queue_index.remove(wo_id)
 
-    with open(WORK_ORDERS_CSV, "r", newline="", encoding="utf-8") as f:
-        rows = list(csv.DictReader(f))
 
-    active_statuses = ("OPEN", "IN_PROGRESS", "BREACHED")
-    active = [r for r in rows if (r.get("Status", "").strip().upper() in active_statuses)]
+def _unindex_queue(row: dict):
+    _queue_index.remove(row.get("WO_ID", ""))
 
-    for r in active:
-        r["_sla"] = _safe_int(r.get("SLA_Minutes"), 999999)
-        r["_pr"] = priority_rank(r.get("Priority"))
-        r["_age"] = _age_minutes(r.get("Created_Timestamp", ""))
-        r["_breached"] = 0 if r.get("Status", "").strip().upper() == "BREACHED" else 1
 
-    active.sort(key=lambda r: (r["_breached"], r["_pr"], r["_sla"], -r["_age"] if r["_age"] >= 0 else 999999))
+def supervisor_queue_page(offset: int = 0, limit: int = 15, priority=None, status=None, fault=None):
+    """
+    Returns (rows, total_matching) for one page of the active queue without
+    writing anything. Rows past their SLA show Status BREACHED even if the
+    scan has not persisted it yet.
+    - csv:    other consoles' changes are polled in (read-only), then the
+              page comes from the queue index the store listeners maintain
+    - sqlite: ORDER BY ... LIMIT queries on the queue index
+    Filters take a value or a list of values (priority/status are case-insensitive).
+    """
+    store = get_work_order_store()
+    now = CLOCK.time()
+    if isinstance(store, SqliteWorkOrderStore):
+        page, total = store.queue_page(now, offset, limit, priority=priority, status=status, fault=fault)
+    else:
+        store.poll()
+        ids, total = _queue_index.page(now, offset, limit, priority=priority, status=status, fault=fault)
+        page = [(store.get(wo_id), shown) for wo_id, shown in ids]
+    rows = []
+    for row, shown in page:
+        if (row.get("Status", "") or "").strip().upper() != shown:
+            row = {col: row.get(col, "") for col in WORK_ORDER_COLUMNS}
+            row["Status"] = shown
+        rows.append(row)
+    return rows, total
+
+
+def supervisor_queue_view(limit: int = 15, offset: int = 0, priority=None, status=None, fault=None):
+    """
+    Shows OPEN + IN_PROGRESS + BREACHED (active), sorted:
+    - Breached first (overdue rows count as breached, persisted or not)
+    - Priority (HIGH -> LOW)
+    - SLA minutes (shortest first)
+    - Age (oldest first)
+    Read-only: no SLA scan, so polling the queue adds no write load. Only
+    the requested page is read from the priority index. Breaches are
+    persisted by persist_sla_breaches().
+    """
+    rows, total = supervisor_queue_page(offset, limit, priority=priority, status=status, fault=fault)
+    now = CLOCK.time()
 
     print("\nSUPERVISOR DISPATCH QUEUE (OPEN / IN_PROGRESS / BREACHED)")
     print("-" * 92)
-    if not active:
+    if not rows:
         print("No active work orders. ✅")
         print("-" * 92)
         return
@@ -345,88 +814,100 @@ def supervisor_queue_view(limit: int = 15):
     print(f"{'WO_ID':<10} {'PRIORITY':<7} {'STATUS':<10} {'SLA':<6} {'AGE':<6} {'FAULT':<26} {'FLAG'}")
     print("-" * 92)
 
-    for r in active[:limit]:
+    for r in rows:
         wo = (r.get("WO_ID") or "")[:10]
         pr = (r.get("Priority") or "")[:7]
         st = (r.get("Status") or "")[:10]
         sla = str(r.get("SLA_Minutes") or "").strip() or "-"
-        age = r["_age"]
+        age = _age_minutes_epoch(row_created_epoch(r), now)
         age_str = f"{age}m" if age >= 0 else "-"
         fault = (r.get("Fault") or "")[:26]
         flag = "⚠ SLA BREACH" if st.upper() == "BREACHED" else ""
+        if r.get("Assigned_Tech"):
+            flag = f"{flag} [{r['Assigned_Tech']}]".strip()
         print(f"{wo:<10} {pr:<7} {st:<10} {sla:<6} {age_str:<6} {fault:<26} {flag}")
 
     print("-" * 92)
+    if total > len(rows):
+        print(f"Showing {offset + 1}-{offset + len(rows)} of {total} active work orders")
     print("Tip: Type Q at any prompt to view this queue.\n")
 
 
 # ----------------------------
 # FAULT SIMULATION
 # ----------------------------
-def simulate_fault():
-    f = random.choice(FAULTS)
-    severity = random.choice(f["severities"])
+def simulate_fault(rng=random):
+    # Inline timing (no wrapper call): this runs once per event in headless mode
+    started = METRICS.clock() if METRICS.enabled else None
+    if FAULT_WEIGHTS:
+        f = rng.choices(FAULTS, weights=[FAULT_WEIGHTS.get(x["name"], 1.0) for x in FAULTS])[0]
+    else:
+        f = rng.choice(FAULTS)
+    severity = rng.choice(f["severities"])
+    if started is not None:
+        METRICS.observe("fault_simulation", METRICS.clock() - started)
     return f["name"], severity
 
 
 # ----------------------------
 # TECHNICIAN ACTION MENU
 # ----------------------------
+FAULT_ACTIONS = {
+    "Motor Overload": [
+        ("Reset overload relay and restart motor", True),
+        ("Ignore fault and continue running", False),
+        ("Replace sensor (incorrect)", False),
+    ],
+    "Sensor Failure": [
+        ("Check wiring and replace sensor", True),
+        ("Restart motor (incorrect)", False),
+        ("Ignore alarm", False),
+    ],
+    "E-stop Triggered": [
+        ("Inspect safety circuit and reset E-stop", True),
+        ("Bypass E-stop (unsafe)", False),
+        ("Ignore alarm", False),
+    ],
+    "Power Outage": [
+        ("Verify power supply and restore service", True),
+        ("Replace sensor (incorrect)", False),
+        ("Ignore outage", False),
+    ],
+    "Communication Error": [
+        ("Check network connection and reboot equipment", True),
+        ("Replace motor (incorrect)", False),
+        ("Ignore fault", False),
+    ],
+    "Motor Stalling": [
+        ("Diagnose load/binding and reset motor", True),
+        ("Ignore stall", False),
+        ("Replace sensor (incorrect)", False),
+    ],
+    "Sensor Calibration Error": [
+        ("Recalibrate sensor and validate readings", True),
+        ("Restart PLC blindly", False),
+        ("Ignore fault", False),
+    ],
+    "Power Surge": [
+        ("Check UPS/power source and stabilize equipment", True),
+        ("Ignore surge", False),
+        ("Replace sensor (incorrect)", False),
+    ],
+}
+
+DEFAULT_ACTIONS = [
+    ("Perform standard troubleshooting steps", True),
+    ("Ignore fault", False),
+    ("Replace random part (incorrect)", False),
+]
+
+
+def actions_for_fault(fault: str) -> list:
+    return FAULT_ACTIONS.get(fault, DEFAULT_ACTIONS)
+
+
 def technician_action_menu(fault: str, severity: str):
-    if fault == "Motor Overload":
-        actions = [
-            ("Reset overload relay and restart motor", True),
-            ("Ignore fault and continue running", False),
-            ("Replace sensor (incorrect)", False),
-        ]
-    elif fault == "Sensor Failure":
-        actions = [
-            ("Check wiring and replace sensor", True),
-            ("Restart motor (incorrect)", False),
-            ("Ignore alarm", False),
-        ]
-    elif fault == "E-stop Triggered":
-        actions = [
-            ("Inspect safety circuit and reset E-stop", True),
-            ("Bypass E-stop (unsafe)", False),
-            ("Ignore alarm", False),
-        ]
-    elif fault == "Power Outage":
-        actions = [
-            ("Verify power supply and restore service", True),
-            ("Replace sensor (incorrect)", False),
-            ("Ignore outage", False),
-        ]
-    elif fault == "Communication Error":
-        actions = [
-            ("Check network connection and reboot equipment", True),
-            ("Replace motor (incorrect)", False),
-            ("Ignore fault", False),
-        ]
-    elif fault == "Motor Stalling":
-        actions = [
-            ("Diagnose load/binding and reset motor", True),
-            ("Ignore stall", False),
-            ("Replace sensor (incorrect)", False),
-        ]
-    elif fault == "Sensor Calibration Error":
-        actions = [
-            ("Recalibrate sensor and validate readings", True),
-            ("Restart PLC blindly", False),
-            ("Ignore fault", False),
-        ]
-    elif fault == "Power Surge":
-        actions = [
-            ("Check UPS/power source and stabilize equipment", True),
-            ("Ignore surge", False),
-            ("Replace sensor (incorrect)", False),
-        ]
-    else:
-        actions = [
-            ("Perform standard troubleshooting steps", True),
-            ("Ignore fault", False),
-            ("Replace random part (incorrect)", False),
-        ]
+    actions = actions_for_fault(fault)
 
     while True:
         print("\nTECHNICIAN ACTION REQUIRED")
@@ -462,30 +943,32 @@ def compute_grade(accuracy: int) -> str:
     return "D"
 
 
-def update_accuracy_and_grade():
-    total = score["correct"] + score["incorrect"]
-    score["accuracy"] = int((score["correct"] / total) * 100) if total > 0 else 0
-    score["grade"] = compute_grade(score["accuracy"])
+def update_accuracy_and_grade(sc: dict | None = None):
+    sc = score if sc is None else sc
+    total = sc["correct"] + sc["incorrect"]
+    sc["accuracy"] = int((sc["correct"] / total) * 100) if total > 0 else 0
+    sc["grade"] = compute_grade(sc["accuracy"])
 
 
 # ----------------------------
 # ESCALATION RULES (SAFETY)
 # ----------------------------
-def apply_escalation_rules(severity: str, result: str) -> str:
+def apply_escalation_rules(severity: str, result: str, flags: dict | None = None) -> str:
+    flags = status_flags if flags is None else flags
     escalation = "None"
 
     if result == "INCORRECT":
-        status_flags["escalations"] += 1
+        flags["escalations"] += 1
         if severity == "Critical":
-            status_flags["critical_wrong"] += 1
+            flags["critical_wrong"] += 1
             escalation = "AUTO ESCALATE: SAFETY / SUPERVISOR"
         else:
             escalation = "ESCALATE: SUPERVISOR NOTIFY"
 
-    if status_flags["critical_wrong"] >= 2:
-        status_flags["site_status"] = "STOP WORK"
-    elif status_flags["escalations"] >= 3:
-        status_flags["site_status"] = "WATCH"
+    if flags["critical_wrong"] >= STOP_WORK_CRITICAL_WRONG:
+        flags["site_status"] = "STOP WORK"
+    elif flags["escalations"] >= WATCH_ESCALATIONS:
+        flags["site_status"] = "WATCH"
     else:
         # do not force NORMAL here; SLA scan may bump to WATCH/STOP WORK
         pass
@@ -496,35 +979,132 @@ def apply_escalation_rules(severity: str, result: str) -> str:
 # ----------------------------
 # HANDLE FAULT
 # ----------------------------
-def handle_fault(fault: str, severity: str):
-    selected_action, is_correct = technician_action_menu(fault, severity)
+def repair_time_minutes(severity: str, is_correct: bool) -> int:
+    table = REPAIR_MINUTES[bool(is_correct)]
+    return table.get(severity, table["Critical"])
+
+
+def handle_fault(fault: str, severity: str, policy=None, flags: dict | None = None):
+    """
+    Resolves one fault:
+    - Interactive: technician picks an action from the menu (stdin)
+    - Headless: policy.choose(fault, severity, actions) picks it (see engine.py)
+    """
+    if policy is None:
+        selected_action, is_correct = technician_action_menu(fault, severity)
+    else:
+        selected_action, is_correct = policy.choose(fault, severity, actions_for_fault(fault))
 
+    time_taken = repair_time_minutes(severity, is_correct)
     if is_correct:
-        time_taken = 2 if severity == "Minor" else 5 if severity == "Major" else 7
         resolution = f"Correct Action: {selected_action}"
         result = "CORRECT"
     else:
-        time_taken = 8 if severity == "Major" else 12
         resolution = f"Incorrect Action: {selected_action} → Escalation Required"
         result = "INCORRECT"
 
-    escalation = apply_escalation_rules(severity, result)
+    escalation = apply_escalation_rules(severity, result, flags)
     return resolution, time_taken, result, escalation, selected_action
 
 
+# ----------------------------
+# EVENT ENTRY
+# ----------------------------
+def build_event_entry(
+    fault: str,
+    severity: str,
+    result: str,
+    escalation: str,
+    resolution: str,
+    time_taken: int,
+    total_repair: int,
+    total_downtime: int,
+    sc: dict,
+    flags: dict,
+):
+    """FaultEvent record (dict-compatible), or a plain dict if COMPACT_RECORDS is off."""
+    if COMPACT_RECORDS:
+        return FaultEvent.create(
+            now_iso(), fault, severity, result, escalation, resolution, time_taken,
+            total_repair, total_downtime, sc["accuracy"], sc["grade"], flags["site_status"],
+        )
+    return {
+        "timestamp": now_iso(),
+        "fault": fault,
+        "severity": severity,
+        "result": result,
+        "escalation": escalation,
+        "resolution": resolution,
+        "repair_time_min": time_taken,
+        "total_repair_time_min": total_repair,
+        "total_downtime_sec": total_downtime,
+        "accuracy_pct": sc["accuracy"],
+        "grade": sc["grade"],
+        "site_status": flags["site_status"],
+        "work_order_file": None,
+    }
+
+
 # ----------------------------
 # LOGGING (UTF-8 SAFE)
 # ----------------------------
-def write_text_log(entry: dict):
-    with open(FAULT_LOG_TXT, "a", encoding="utf-8") as log_file:
-        log_file.write(
-            f"{entry.get('timestamp')} | "
-            f"{entry.get('fault')} ({entry.get('severity')}) | "
-            f"{entry.get('result')} | "
-            f"{entry.get('escalation')} | "
-            f"{entry.get('resolution')} | "
-            f"Time: {entry.get('repair_time_min', 'N/A')} min\n"
+_event_log = None
+
+
+def get_event_log() -> EventLog:
+    """Long-lived fault event log; reopened if the configured paths change."""
+    global _event_log
+    text_path = FAULT_LOG_TXT if "text" in EVENT_LOG_FORMATS else None
+    jsonl_path = FAULT_LOG_JSONL if "jsonl" in EVENT_LOG_FORMATS else None
+    if _event_log is not None and (_event_log.text_path, _event_log.jsonl_path) != (text_path, jsonl_path):
+        close_event_log()
+    if _event_log is None:
+        _event_log = EventLog(
+            text_path,
+            jsonl_path,
+            flush_bytes=EVENT_LOG_FLUSH_BYTES,
+            flush_sec=EVENT_LOG_FLUSH_SEC,
+            rotate_bytes=EVENT_LOG_ROTATE_BYTES,
+            rotate_daily=EVENT_LOG_ROTATE_DAILY,
+            compress=EVENT_LOG_COMPRESS,
+            clock=lambda: CLOCK.time(),
         )
+    return _event_log
+
+
+def close_event_log():
+    """Flushes and closes the event log (next write reopens it)."""
+    global _event_log
+    if _event_log is not None:
+        before = _event_log.bytes_written
+        _event_log.close()
+        METRICS.add_bytes("event_log", _event_log.bytes_written - before)   # buffered tail
+        _event_log = None
+
+
+def write_text_log(entry: dict):
+    """Buffered: lines reach disk on the size/time thresholds and at close_event_log()."""
+    log = get_event_log()
+    if not METRICS.enabled:
+        log.log(entry)
+        return
+    before = log.bytes_written
+    with METRICS.stage("event_log") as st:
+        log.log(entry)
+        st.add_bytes(log.bytes_written - before)
+
+
+# ----------------------------
+# DASHBOARD RENDERER
+# ----------------------------
+_dashboard = None
+
+
+def get_dashboard() -> DashboardRenderer:
+    global _dashboard
+    if _dashboard is None:
+        _dashboard = DashboardRenderer(max_fps=DASHBOARD_MAX_FPS)
+    return _dashboard
 
 
 # ----------------------------
@@ -564,56 +1144,131 @@ def prompt_work_order_status_update(wo_id: str) -> None:
         return
 
 
+# ----------------------------
+# WORK ORDER DOCUMENTS
+# ----------------------------
+# One format call per document (template parsed once) instead of a write per line
+WORK_ORDER_TEMPLATE = (
+    "MAINTENANCE WORK ORDER\n"
+    + "=" * 60 + "\n\n"
+    "WORK ORDER ID: {wo_id}\n"
+    "Status: {status}\n"
+    "Priority: {priority}\n"
+    "SLA: {sla} minutes\n\n"
+    "Created: {created}\n"
+    "Fault: {fault}\n"
+    "Severity: {severity}\n"
+    "Result: {result}\n"
+    "Escalation: {escalation}\n"
+    "Site Status: {site_status}\n\n"
+    "Technician Notes:\n"
+    "- Action Taken: {resolution}\n"
+    "- Repair Time Estimate: {repair_time_min} min\n\n"
+    "Dispatch / Follow-Up:\n"
+    "- Supervisor review required\n"
+    "- Verify safety compliance\n"
+    "- Schedule corrective maintenance\n\n"
+    "Tools Checklist:\n"
+    "- Multimeter\n"
+    "- Lockout/Tagout Kit\n"
+    "- Replacement parts if needed\n\n"
+    + "=" * 60 + "\n"
+    "END OF WORK ORDER\n"
+)
+_render_template = WORK_ORDER_TEMPLATE.format_map
+
+
+def render_work_order(fields: dict) -> str:
+    return _render_template(fields)
+
+
+_wo_docs = None
+
+
+def get_work_order_docs() -> DocumentContainer:
+    global _wo_docs
+    if _wo_docs is None or _wo_docs.path != WORK_ORDER_CONTAINER:
+        close_work_order_docs()
+        _wo_docs = DocumentContainer(
+            WORK_ORDER_CONTAINER, render=render_work_order, lock_timeout=WORK_ORDERS_LOCK_TIMEOUT_SEC,
+        )
+    return _wo_docs
+
+
+def close_work_order_docs():
+    global _wo_docs
+    if _wo_docs is not None:
+        _wo_docs.close()
+        _wo_docs = None
+
+
+def read_work_order_document(work_order_file: str):
+    """
+    Text of a work order from its Work_Order_File value: "<container>#<WO_ID>"
+    (rendered now if it was stored lazily) or a .txt path. None if missing.
+    """
+    if not work_order_file:
+        return None
+    if "#" in work_order_file:
+        container, key = work_order_file.split("#", 1)
+        docs = get_work_order_docs()
+        if os.path.basename(docs.path) != container:
+            docs = DocumentContainer(container, render=render_work_order)
+            try:
+                return docs.get(key)
+            finally:
+                docs.close()
+        return docs.get(key)
+    try:
+        with open(work_order_file, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
 # ----------------------------
 # WORK ORDER GENERATOR
 # ----------------------------
-def generate_work_order(entry: dict):
+def generate_work_order(entry: dict, interactive: bool = True):
     if entry.get("escalation") == "None":
         return None
 
     ensure_work_orders_csv_schema()
 
     wo_id = next_work_order_id()
+    entry["wo_id"] = wo_id
     priority = severity_to_priority(entry.get("severity"))
     sla = priority_to_sla_minutes(priority)
     status = "OPEN"
 
-    safe_ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    wo_filename = f"work_order_{wo_id}_{safe_ts}.txt"
-
     created_ts = entry.get("timestamp") or now_iso()
-
-    with open(wo_filename, "w", encoding="utf-8") as wo:
-        wo.write("MAINTENANCE WORK ORDER\n")
-        wo.write("=" * 60 + "\n\n")
-        wo.write(f"WORK ORDER ID: {wo_id}\n")
-        wo.write(f"Status: {status}\n")
-        wo.write(f"Priority: {priority}\n")
-        wo.write(f"SLA: {sla} minutes\n\n")
-
-        wo.write(f"Created: {created_ts}\n")
-        wo.write(f"Fault: {entry.get('fault')}\n")
-        wo.write(f"Severity: {entry.get('severity')}\n")
-        wo.write(f"Result: {entry.get('result')}\n")
-        wo.write(f"Escalation: {entry.get('escalation')}\n")
-        wo.write(f"Site Status: {entry.get('site_status')}\n\n")
-
-        wo.write("Technician Notes:\n")
-        wo.write(f"- Action Taken: {entry.get('resolution')}\n")
-        wo.write(f"- Repair Time Estimate: {entry.get('repair_time_min')} min\n\n")
-
-        wo.write("Dispatch / Follow-Up:\n")
-        wo.write("- Supervisor review required\n")
-        wo.write("- Verify safety compliance\n")
-        wo.write("- Schedule corrective maintenance\n\n")
-
-        wo.write("Tools Checklist:\n")
-        wo.write("- Multimeter\n")
-        wo.write("- Lockout/Tagout Kit\n")
-        wo.write("- Replacement parts if needed\n\n")
-
-        wo.write("=" * 60 + "\n")
-        wo.write("END OF WORK ORDER\n")
+    fields = {
+        "wo_id": wo_id,
+        "status": status,
+        "priority": priority,
+        "sla": sla,
+        "created": created_ts,
+        "fault": entry.get("fault"),
+        "severity": entry.get("severity"),
+        "result": entry.get("result"),
+        "escalation": entry.get("escalation"),
+        "site_status": entry.get("site_status"),
+        "resolution": entry.get("resolution"),
+        "repair_time_min": entry.get("repair_time_min"),
+    }
+
+    with METRICS.stage("wo_file_write") as st:
+        if WORK_ORDER_DOCS == "container":
+            docs = get_work_order_docs()
+            lazy = not interactive if WORK_ORDER_DOCS_LAZY is None else WORK_ORDER_DOCS_LAZY
+            st.add_bytes(docs.put_fields(wo_id, fields) if lazy else docs.put(wo_id, render_work_order(fields)))
+            wo_filename = docs.ref(wo_id)
+        else:
+            safe_ts = CLOCK.now().strftime("%Y-%m-%d_%H-%M-%S")
+            wo_filename = f"work_order_{wo_id}_{safe_ts}.txt"
+            with open(wo_filename, "w", encoding="utf-8") as wo:
+                wo.write(render_work_order(fields))
+                st.add_bytes(wo.tell())
 
     append_work_order_to_queue({
         "WO_ID": wo_id,
@@ -633,12 +1288,15 @@ def generate_work_order(entry: dict):
         "Closed_Timestamp": "",
         "Closeout_Notes": "",
         "Breach_Reason": "",
+        "Created_Epoch": to_epoch(created_ts),
     })
+    METRICS.incr("work_orders_created")
 
-    prompt_work_order_status_update(wo_id)
+    if interactive:
+        prompt_work_order_status_update(wo_id)
 
-    # SLA scan + queue view after status update
-    supervisor_queue_view()
+        # SLA scan + queue view after status update
+        supervisor_queue_view()
 
     return wo_filename
 
@@ -646,41 +1304,97 @@ def generate_work_order(entry: dict):
 # ----------------------------
 # CSV EXPORTS + REPORT
 # ----------------------------
+FAULT_HISTORY_COLUMNS = [
+    "Timestamp",
+    "Fault",
+    "Severity",
+    "Result",
+    "Escalation",
+    "Resolution",
+    "Repair_Time_Min",
+    "Total_Repair_Time_Min",
+    "Total_Downtime_Sec",
+    "Accuracy_Pct",
+    "Grade",
+    "Site_Status",
+    "Work_Order_File",
+]
+
+# event entry key for each FAULT_HISTORY_COLUMNS column
+FAULT_HISTORY_KEYS = [
+    "timestamp",
+    "fault",
+    "severity",
+    "result",
+    "escalation",
+    "resolution",
+    "repair_time_min",
+    "total_repair_time_min",
+    "total_downtime_sec",
+    "accuracy_pct",
+    "grade",
+    "site_status",
+    "work_order_file",
+]
+
+
+def fault_history_row(e: dict) -> list:
+    return [e.get(k) for k in FAULT_HISTORY_KEYS]
+
+
+_history_stream = None
+
+
+def get_history_stream() -> CsvStream:
+    """fault_history.csv writer for this run (fresh header on first open)."""
+    global _history_stream
+    if _history_stream is not None and _history_stream.path != FAULT_HISTORY_CSV:
+        close_history_stream()
+    if _history_stream is None:
+        _history_stream = CsvStream(
+            FAULT_HISTORY_CSV,
+            FAULT_HISTORY_COLUMNS,
+            flush_rows=FAULT_HISTORY_FLUSH_ROWS,
+            flush_sec=FAULT_HISTORY_FLUSH_SEC,
+        )
+    return _history_stream
+
+
+def close_history_stream():
+    global _history_stream
+    if _history_stream is not None:
+        before = _history_stream.bytes_written
+        _history_stream.close()
+        METRICS.add_bytes("history_write", _history_stream.bytes_written - before)
+        _history_stream = None
+
+
+def record_fault_event(entry: dict, stream_csv: bool = True):
+    """
+    Records one event:
+    - ring buffer (event_history) for the dashboard
+    - streamed row in fault_history.csv (stream_csv=False skips it, e.g. headless runs)
+    - fault_history table (sqlite backend only)
+    """
+    event_history.append(entry)
+    row = fault_history_row(entry)
+    if stream_csv:
+        stream = get_history_stream()
+        before = stream.bytes_written
+        with METRICS.stage("history_write") as st:
+            stream.writerow(row)
+            st.add_bytes(stream.bytes_written - before)
+    store = get_work_order_store()
+    if isinstance(store, SqliteWorkOrderStore):
+        store.append_event(row)
+
+
 def export_fault_history_csv():
-    with open(FAULT_HISTORY_CSV, "w", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file)
-        writer.writerow([
-            "Timestamp",
-            "Fault",
-            "Severity",
-            "Result",
-            "Escalation",
-            "Resolution",
-            "Repair_Time_Min",
-            "Total_Repair_Time_Min",
-            "Total_Downtime_Sec",
-            "Accuracy_Pct",
-            "Grade",
-            "Site_Status",
-            "Work_Order_File",
-        ])
-
-        for e in event_history:
-            writer.writerow([
-                e.get("timestamp"),
-                e.get("fault"),
-                e.get("severity"),
-                e.get("result"),
-                e.get("escalation"),
-                e.get("resolution"),
-                e.get("repair_time_min"),
-                e.get("total_repair_time_min"),
-                e.get("total_downtime_sec"),
-                e.get("accuracy_pct"),
-                e.get("grade"),
-                e.get("site_status"),
-                e.get("work_order_file"),
-            ])
+    """Rows are already on disk; this is the final flush (header-only file if no events)."""
+    stream = get_history_stream()
+    before = stream.bytes_written
+    stream.flush()
+    METRICS.add_bytes("history_write", stream.bytes_written - before)
 
 
 def generate_report():
@@ -709,8 +1423,31 @@ def generate_report():
         report.write(f"HIGH SLA breaches: {status_flags['high_sla_breaches']}\n")
         report.write(f"Site status: {status_flags['site_status']}\n")
 
+        since = CLOCK.now() - timedelta(days=REPORT_HISTORY_DAYS)
+        by_status = {}
+        for row in iter_work_order_history(start=since):
+            status = (row.get("Status", "") or "").strip().upper() or "-"
+            by_status[status] = by_status.get(status, 0) + 1
+        report.write(f"\nWork Orders (last {REPORT_HISTORY_DAYS} days, live + archive):\n")
+        for status in ("OPEN", "IN_PROGRESS", "BREACHED", "CLOSED"):
+            report.write(f"{status}: {by_status.pop(status, 0)}\n")
+        for status, count in sorted(by_status.items()):
+            report.write(f"{status}: {count}\n")
+
+        if METRICS.enabled:
+            report.write("\nHot-Path Metrics:\n")
+            for line in format_metrics_table(METRICS.snapshot()):
+                report.write(line + "\n")
+
         report.write("\n" + "=" * 60 + "\n")
         report.write("End of Report\n")
+    export_metrics()
+
+
+def export_metrics():
+    """metrics.prom + metrics.json next to the report (no-op unless metrics are enabled)."""
+    if METRICS.enabled:
+        METRICS.export(METRICS_PROM, METRICS_JSON)
 
 
 # ----------------------------
@@ -727,6 +1464,7 @@ def main():
     for _ in range(10):
         fault, severity = simulate_fault()
         resolution, time_taken, result, escalation, _selected_action = handle_fault(fault, severity)
+        get_dashboard().invalidate()   # the prompts scrolled under the last frame
 
         fault_count[fault] += 1
         total_repair_time += time_taken
@@ -738,21 +1476,10 @@ def main():
 
         update_accuracy_and_grade()
 
-        entry = {
-            "timestamp": now_iso(),
-            "fault": fault,
-            "severity": severity,
-            "result": result,
-            "escalation": escalation,
-            "resolution": resolution,
-            "repair_time_min": time_taken,
-            "total_repair_time_min": total_repair_time,
-            "total_downtime_sec": total_downtime_seconds,
-            "accuracy_pct": score["accuracy"],
-            "grade": score["grade"],
-            "site_status": status_flags["site_status"],
-            "work_order_file": None,
-        }
+        entry = build_event_entry(
+            fault, severity, result, escalation, resolution, time_taken,
+            total_repair_time, total_downtime_seconds, score, status_flags,
+        )
 
         write_text_log(entry)
         wo_file = generate_work_order(entry)
@@ -767,10 +1494,10 @@ def main():
             "time_taken_min": time_taken,
         }
 
-        event_history.append(entry)
+        record_fault_event(entry)
 
-        # SLA scan on each cycle so site status reflects queue health
-        sla_breach_escalation_scan()
+        # SLA scan (rate-limited) so site status reflects queue health
+        persist_sla_breaches()
 
         show_dashboard(
             fault_count,
@@ -779,27 +1506,36 @@ def main():
             last_event,
             score=score,
             status_flags=status_flags,
+            now=CLOCK.now(),
+            recent_events=list(event_history)[-DASHBOARD_RECENT_EVENTS:],
+            renderer=get_dashboard(),
         )
 
         delay = random.randint(3, 7)
         total_downtime_seconds += delay
-        time.sleep(delay)
+        CLOCK.sleep(delay)
+        get_dashboard().flush()   # a frame held back by DASHBOARD_MAX_FPS
 
         if status_flags["site_status"] == "STOP WORK":
             print("\nSTOP WORK triggered due to escalation conditions.")
             break
-
     generate_report()
     export_fault_history_csv()
 
     print("\nSimulation complete — updated files:")
-    print(f"- {FAULT_LOG_TXT}")
+    print(f"- {FAULT_LOG_TXT} / {FAULT_LOG_JSONL}")
     print(f"- {FAULT_HISTORY_CSV}")
     print(f"- {REPORT_TXT}")
-    print(f"- {WORK_ORDERS_CSV} (work order queue)")
+    print(f"- {WORK_ORDERS_CSV} (work order queue, compacted from {WORK_ORDERS_LOG})")
     print(f"- {COUNTER_FILE} (persistent WO counter)\n")
 
+    persist_sla_breaches(force=True)
     supervisor_queue_view()
+    close_event_log()
+    close_history_stream()
+    close_work_order_docs()
+    close_work_order_store()
+    release_work_order_ids()
 
 
 if __name__ == "__main__":
@@ -809,4 +1545,10 @@ if __name__ == "__main__":
         generate_report()
         export_fault_history_csv()
         print("\nStopped early — files updated.")
+        persist_sla_breaches(force=True)
         supervisor_queue_view()
+        close_event_log()
+        close_history_stream()
+        close_work_order_docs()
+        close_work_order_store()
+        release_work_order_ids()
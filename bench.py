@@ -0,0 +1,566 @@
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+try:
+    import resource
+except ImportError:   # Windows: no getrusage, peak RSS is reported as None
+    resource = None
+
+import app
+from sim_clock import VirtualClock
+
+
+# ----------------------------
+# PERSISTENCE / QUEUE BENCHMARKS
+# ----------------------------
+# Each size runs in its own process (so peak RSS is per size) inside a scratch
+# directory holding a synthetic work_orders.csv. Every hot path is timed until
+# it has run max_ops times or min_sec have passed, and the results go to JSON
+# for comparing versions (--compare).
+BENCH_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+BENCH_NOW = datetime(2026, 3, 2, 12, 0, 0)   # sim "now" (VirtualClock)
+BENCH_RESULTS_JSON = "bench_results.json"
+BENCH_STRESS_JSON = "bench_stress.json"     # --writers results (kept apart from the --compare baseline)
+
+# Header of the work_orders.csv files in the field (schema v1, before Created_Epoch)
+LEGACY_COLUMNS = app.WORK_ORDER_SCHEMA.versions[0]
+
+# Status mix of a long-running queue: mostly closed, a live tail of active orders
+STATUS_MIX = (("CLOSED", 0.70), ("BREACHED", 0.10), ("OPEN", 0.15), ("IN_PROGRESS", 0.05))
+ACTIVE_WINDOW_MIN = 8 * 60    # OPEN / IN_PROGRESS rows were created in the last shift
+HISTORY_DAYS = 30
+
+
+def _ctime(dt: datetime) -> str:
+    # time.ctime layout: "Mon Mar  2 12:00:00 2026"
+    return f"{dt:%a %b} {dt.day:2d} {dt:%H:%M:%S %Y}"
+
+
+def generate_work_orders_csv(path: str, rows: int, seed: int = 0, now: datetime = BENCH_NOW) -> int:
+    """
+    Writes a synthetic work_orders.csv (LEGACY_COLUMNS header) with `rows` rows:
+    - Created_Timestamp alternates ISO and time.ctime formats at random
+    - statuses follow STATUS_MIX; active rows are recent, the rest span HISTORY_DAYS
+    Returns the file size in bytes.
+    """
+    rng = random.Random(seed)
+    statuses = [s for s, _ in STATUS_MIX]
+    weights = [w for _, w in STATUS_MIX]
+    faults = [(f["name"], f["severities"]) for f in app.FAULTS]
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(LEGACY_COLUMNS)
+        for i in range(1, rows + 1):
+            status = rng.choices(statuses, weights)[0]
+            fault, severities = rng.choice(faults)
+            severity = rng.choice(severities)
+            priority = app.severity_to_priority(severity)
+            sla = app.priority_to_sla_minutes(priority)
+
+            if status in app.SLA_ACTIVE_STATUSES:
+                age_min = rng.uniform(0, ACTIVE_WINDOW_MIN)
+            else:
+                age_min = rng.uniform(0, HISTORY_DAYS * 24 * 60)
+            created = (now - timedelta(minutes=age_min)).replace(microsecond=0)
+            created_ts = _ctime(created) if rng.random() < 0.5 else created.isoformat(sep=" ")
+            updated = min(created + timedelta(minutes=rng.randint(1, 600)), now).isoformat(sep=" ")
+
+            wo_id = f"WO-{i:06d}"
+            w.writerow([
+                wo_id,
+                created_ts,
+                fault,
+                severity,
+                priority,
+                status,
+                sla,
+                "INCORRECT",
+                "AUTO ESCALATE: SLA BREACH" if status == "BREACHED" else "Escalation Required",
+                "WATCH" if status == "BREACHED" else "NORMAL",
+                f"Incorrect Action: {fault} (synthetic)",
+                rng.randint(2, 12),
+                f"work_order_{wo_id}_{created:%Y-%m-%d_%H-%M-%S}.txt",
+                updated,
+                updated if status == "CLOSED" else "",
+                "Closed by bench generator" if status == "CLOSED" else "",
+                f"SLA exceeded (AGE {sla + 1}m > SLA {sla}m)" if status == "BREACHED" else "",
+            ])
+    return os.path.getsize(path)
+
+
+# ----------------------------
+# MEASUREMENT
+# ----------------------------
+def _written_bytes():
+    """Bytes this process has passed to write() so far (Linux /proc), or None."""
+    try:
+        with open("/proc/self/io", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _tree_bytes(path: str) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _measure(fn, workdir: str, max_ops: int, min_sec: float, before=None) -> dict:
+    """
+    Runs fn(i) until max_ops calls or min_sec seconds; ops/sec, bytes written, peak RSS so far.
+    before(i), if given, runs ahead of each call outside the timing and the byte count.
+    """
+    if before is None:
+        io_before = _written_bytes()
+        disk_before = _tree_bytes(workdir) if io_before is None else 0
+        started = time.perf_counter()
+        ops = 0
+        while ops < max_ops:
+            fn(ops)
+            ops += 1
+            if time.perf_counter() - started >= min_sec:
+                break
+        elapsed = time.perf_counter() - started
+        io_after = _written_bytes()
+        written = io_after - io_before if io_before is not None else max(_tree_bytes(workdir) - disk_before, 0)
+    else:
+        wall = time.perf_counter()
+        elapsed = 0.0
+        written = 0
+        ops = 0
+        while ops < max_ops:
+            before(ops)
+            io_before = _written_bytes()
+            disk_before = _tree_bytes(workdir) if io_before is None else 0
+            started = time.perf_counter()
+            fn(ops)
+            elapsed += time.perf_counter() - started
+            io_after = _written_bytes()
+            written += io_after - io_before if io_before is not None else max(_tree_bytes(workdir) - disk_before, 0)
+            ops += 1
+            if time.perf_counter() - wall >= min_sec:
+                break
+
+    return {
+        "ops": ops,
+        "seconds": round(elapsed, 6),
+        "ops_per_sec": round(ops / elapsed, 1) if elapsed > 0 else None,
+        "bytes_written": written,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _bench_entry(rng: random.Random) -> dict:
+    fault, severity = app.simulate_fault(rng)
+    return {
+        "timestamp": app.now_iso(),
+        "fault": fault,
+        "severity": severity,
+        "result": "INCORRECT",
+        "escalation": "Escalation Required",
+        "resolution": f"Incorrect Action: {fault} (bench)",
+        "repair_time_min": 8,
+        "site_status": "NORMAL",
+    }
+
+
+def _peer_store():
+    # A second console on the same files (its writes reach us through the change log / WAL)
+    if app.STORAGE_BACKEND == "sqlite":
+        return app.open_sqlite_store(import_csv=False)
+    return app.WorkOrderStore(
+        app.WORK_ORDERS_CSV,
+        app.WORK_ORDER_COLUMNS,
+        app.WORK_ORDERS_LOG,
+        lock_path=app.WORK_ORDERS_CSV + ".lock",
+        lock_timeout=app.WORK_ORDERS_LOCK_TIMEOUT_SEC,
+    )
+
+
+def bench_size(rows: int, seed: int = 0, max_ops: int = 2000, min_sec: float = 1.0, keep_dir: str | None = None) -> dict:
+    """All hot-path benchmarks against one synthetic work_orders.csv of `rows` rows."""
+    workdir = keep_dir or tempfile.mkdtemp(prefix=f"bench_{rows}_")
+    os.makedirs(workdir, exist_ok=True)
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)   # app's file names are relative
+    previous_clock = app.CLOCK
+    clock = app.set_clock(VirtualClock(BENCH_NOW))
+    rng = random.Random(seed + 1)
+    sink = io.StringIO()
+    ops = {}
+
+    try:
+        started = time.perf_counter()
+        csv_bytes = generate_work_orders_csv(app.WORK_ORDERS_CSV, rows, seed)
+        generate_sec = round(time.perf_counter() - started, 3)
+
+        ops["ensure_schema_upgrade"] = _measure(lambda i: app.ensure_work_orders_csv_schema(), workdir, 1, 0)
+        ops["ensure_schema"] = _measure(lambda i: app.ensure_work_orders_csv_schema(), workdir, max_ops, min_sec)
+        ops["store_open"] = _measure(lambda i: app.get_work_order_store(), workdir, 1, 0)
+
+        ids = [f"WO-{rng.randint(1, rows):06d}" for _ in range(max_ops)]
+        ops["update_work_order_row"] = _measure(
+            lambda i: app.update_work_order_row(ids[i], {"Last_Updated": app.now_iso(), "Closeout_Notes": "bench"}),
+            workdir, max_ops, min_sec,
+        )
+
+        # First scan breaches everything already overdue; later ones see one sim minute each
+        ops["sla_scan_catchup"] = _measure(lambda i: app.sla_breach_escalation_scan(), workdir, 1, 0)
+
+        def scan(_i):
+            clock.advance(60)   # one scan per sim minute, as in a live shift
+            app.sla_breach_escalation_scan()
+
+        ops["sla_breach_escalation_scan"] = _measure(scan, workdir, max_ops, min_sec)
+
+        # Repeat views, then views each taken right after a write that moves an
+        # active order in the queue: by this console, then by another one
+        store = app.get_work_order_store()
+        active = [r["WO_ID"] for r in store.iter_rows() if r.get("Status") in app.SLA_ACTIVE_STATUSES] or ids
+        peer = _peer_store()
+
+        def own_write(i):
+            app.update_work_order_row(active[i % len(active)], {"Status": "IN_PROGRESS" if i % 2 else "OPEN"})
+
+        def peer_write(i):
+            peer.update(active[-1 - i % len(active)], {"Status": "OPEN" if i % 2 else "IN_PROGRESS"})
+
+        with contextlib.redirect_stdout(sink):
+            ops["supervisor_queue_view"] = _measure(lambda i: app.supervisor_queue_view(), workdir, max_ops, min_sec)
+            ops["queue_view_after_write"] = _measure(
+                lambda i: app.supervisor_queue_view(), workdir, max_ops, min_sec, before=own_write,
+            )
+            ops["queue_view_after_peer_write"] = _measure(
+                lambda i: app.supervisor_queue_view(), workdir, max_ops, min_sec, before=peer_write,
+            )
+        peer.close()
+        # The peer compacted on close and replaced work_orders.csv: catch up now,
+        # so the reload is not timed as part of the first write below
+        store.refresh()
+        sink.seek(0)
+        sink.truncate()
+
+        ops["next_work_order_id"] = _measure(lambda i: app.next_work_order_id(), workdir, max_ops, min_sec)
+        ops["generate_work_order"] = _measure(
+            lambda i: app.generate_work_order(_bench_entry(rng), interactive=False), workdir, max_ops, min_sec,
+        )
+        ops["close_store"] = _measure(lambda i: app.close_work_order_store(), workdir, 1, 0)
+        app.release_work_order_ids()
+    finally:
+        app.close_work_order_store()
+        app.release_work_order_ids()
+        app.set_clock(previous_clock)
+        os.chdir(previous_cwd)
+        if keep_dir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "rows": rows,
+        "csv_bytes": csv_bytes,
+        "generate_sec": generate_sec,
+        "peak_rss_mb": _peak_rss_mb(),
+        "ops": ops,
+    }
+
+
+# ----------------------------
+# MULTI-WRITER STRESS
+# ----------------------------
+# N processes share one working directory, as several technician consoles do.
+# Each one increments a counter on random shared rows through
+# modify_work_order (optimistic Row_Version check + retry) and appends new work
+# orders; afterwards every counter must equal the increments that reported
+# success and every appended WO_ID must be present exactly once.
+STRESS_ROWS = 20                      # shared rows (few rows = many conflicts)
+STRESS_COUNTER = "Repair_Time_Min"    # column the writers increment
+STRESS_APPEND_EVERY = 10              # every Nth op appends a work order instead
+
+
+def _seed_stress_csv(path: str, rows: int):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(app.WORK_ORDER_COLUMNS)
+        for i in range(1, rows + 1):
+            row = {
+                "WO_ID": f"WO-{i:06d}",
+                "Created_Timestamp": BENCH_NOW.isoformat(sep=" "),
+                "Fault": "Motor Overload",
+                "Severity": "Minor",
+                "Priority": "LOW",
+                "Status": "OPEN",
+                "SLA_Minutes": 999999,
+                STRESS_COUNTER: 0,
+                "Created_Epoch": int(BENCH_NOW.timestamp()),
+                "Row_Version": 1,
+            }
+            w.writerow([row.get(c, "") for c in app.WORK_ORDER_COLUMNS])
+    with open(app.COUNTER_FILE, "w", encoding="utf-8") as f:
+        f.write(str(rows))
+
+
+def _stress_writer(workdir: str, writer: int, ops: int, seed: int, start_at: float) -> dict:
+    os.chdir(workdir)
+    app.set_clock(VirtualClock(BENCH_NOW))
+    rng = random.Random(seed * 1000 + writer)
+    store = app.get_work_order_store()
+
+    def bump(row):
+        return {STRESS_COUNTER: str(int(row.get(STRESS_COUNTER) or 0) + 1)}
+
+    increments = {}
+    appended = []
+    gave_up = 0
+    time.sleep(max(start_at - time.time(), 0))   # all writers start together
+    started = time.perf_counter()
+    for i in range(ops):
+        if i % STRESS_APPEND_EVERY == STRESS_APPEND_EVERY - 1:
+            wo_id = app.next_work_order_id()
+            app.append_work_order_to_queue({"WO_ID": wo_id, "Status": "OPEN", "Priority": "LOW", STRESS_COUNTER: 0})
+            appended.append(wo_id)
+            continue
+        wo_id = f"WO-{rng.randint(1, STRESS_ROWS):06d}"
+        try:
+            if app.modify_work_order(wo_id, bump):
+                increments[wo_id] = increments.get(wo_id, 0) + 1
+        except app.VersionConflict:
+            gave_up += 1
+    elapsed = time.perf_counter() - started
+    conflicts = store.conflicts
+    app.close_work_order_store()
+    app.release_work_order_ids()
+    return {"seconds": elapsed, "increments": increments, "appended": appended,
+            "conflicts": conflicts, "gave_up": gave_up}
+
+
+def stress_writers(writers: int, ops: int = 500, seed: int = 0) -> dict:
+    """One stress round with `writers` processes; returns throughput and the consistency check."""
+    workdir = tempfile.mkdtemp(prefix=f"stress_{writers}_")
+    previous_cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        _seed_stress_csv(app.WORK_ORDERS_CSV, STRESS_ROWS)
+        start_at = time.time() + 0.5
+        with ProcessPoolExecutor(max_workers=writers) as pool:
+            futures = [pool.submit(_stress_writer, workdir, w, ops, seed, start_at) for w in range(writers)]
+            results = [f.result() for f in futures]
+
+        expected = {}
+        appended = []
+        for r in results:
+            for wo_id, n in r["increments"].items():
+                expected[wo_id] = expected.get(wo_id, 0) + n
+            appended += r["appended"]
+
+        if app.STORAGE_BACKEND == "sqlite":
+            rows = app.read_sqlite_rows(app.WORK_ORDERS_DB, app.WORK_ORDER_COLUMNS)
+        else:
+            rows = app.WorkOrderStore(app.WORK_ORDERS_CSV, app.WORK_ORDER_COLUMNS, app.WORK_ORDERS_LOG).rows
+        final = {r["WO_ID"]: r for r in rows}
+        lost = sum(max(n - int(final.get(wo_id, {}).get(STRESS_COUNTER) or 0), 0) for wo_id, n in expected.items())
+        extra = sum(max(int(final.get(wo_id, {}).get(STRESS_COUNTER) or 0) - expected.get(wo_id, 0), 0)
+                    for wo_id in (f"WO-{i:06d}" for i in range(1, STRESS_ROWS + 1)))
+        missing = sum(1 for wo_id in appended if wo_id not in final)
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    total = writers * ops
+    elapsed = max(r["seconds"] for r in results)
+    return {
+        "writers": writers,
+        "ops": total,
+        "seconds": round(elapsed, 6),
+        "ops_per_sec": round(total / elapsed, 1) if elapsed > 0 else None,
+        "increments": sum(expected.values()),
+        "appends": len(appended),
+        "duplicate_ids": len(appended) - len(set(appended)),
+        "conflicts": sum(r["conflicts"] for r in results),
+        "gave_up": sum(r["gave_up"] for r in results),
+        "lost_updates": lost,
+        "phantom_updates": extra,
+        "missing_appends": missing,
+    }
+
+
+def run_stress(writer_counts, ops: int = 500, seed: int = 0) -> dict:
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "storage_backend": app.STORAGE_BACKEND,
+        "settings": {"seed": seed, "ops_per_writer": ops, "shared_rows": STRESS_ROWS},
+        "sizes": {},
+        "writers": {str(n): stress_writers(n, ops, seed) for n in writer_counts},
+    }
+
+
+def print_stress(results: dict) -> bool:
+    """Prints the stress table; False if any round lost or invented an update."""
+    print("MULTI-WRITER STRESS")
+    print("=" * 92)
+    print(f"rev {results.get('git_rev') or '-'}  python {results['python']}  backend {results['storage_backend']}"
+          f"  {results['settings']['ops_per_writer']} ops/writer on {results['settings']['shared_rows']} shared rows")
+    print(f"  {'WRITERS':>7} {'OPS':>7} {'OPS/SEC':>10} {'CONFLICTS':>10} {'GAVE UP':>8} {'LOST':>6} {'PHANTOM':>8} {'MISSING':>8} {'DUP IDS':>8}")
+    ok = True
+    for n, r in results["writers"].items():
+        rate = f"{r['ops_per_sec']:,.1f}" if r["ops_per_sec"] else "-"
+        print(f"  {int(n):>7} {r['ops']:>7} {rate:>10} {r['conflicts']:>10} {r['gave_up']:>8} {r['lost_updates']:>6} "
+              f"{r['phantom_updates']:>8} {r['missing_appends']:>8} {r['duplicate_ids']:>8}")
+        ok = ok and not (r["lost_updates"] or r["phantom_updates"] or r["missing_appends"] or r["duplicate_ids"])
+    print("=" * 92)
+    print("No lost updates." if ok else "CONSISTENCY CHECK FAILED")
+    return ok
+
+
+def _git_rev():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=5,
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(sizes=BENCH_SIZES, seed: int = 0, max_ops: int = 2000, min_sec: float = 1.0) -> dict:
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "storage_backend": app.STORAGE_BACKEND,
+        "bytes_source": "wchar" if _written_bytes() is not None else "disk",
+        "settings": {"seed": seed, "max_ops": max_ops, "min_sec": min_sec},
+        "sizes": {},
+    }
+    for rows in sizes:
+        # Fresh process per size: peak RSS and app's module state start clean
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results["sizes"][str(rows)] = pool.submit(bench_size, rows, seed, max_ops, min_sec).result()
+    return results
+
+
+# ----------------------------
+# REPORTING
+# ----------------------------
+def print_results(results: dict):
+    print("PERSISTENCE / QUEUE BENCHMARKS")
+    print("=" * 92)
+    print(f"rev {results.get('git_rev') or '-'}  python {results['python']}  backend {results['storage_backend']}")
+    for size, r in results["sizes"].items():
+        print("-" * 92)
+        print(f"{int(size):,} rows  ({r['csv_bytes'] / 1e6:.1f} MB csv, peak RSS {r['peak_rss_mb']} MB)")
+        print(f"  {'OPERATION':<28} {'OPS':>7} {'OPS/SEC':>12} {'MS/OP':>10} {'BYTES WRITTEN':>15}")
+        for name, m in r["ops"].items():
+            ms = m["seconds"] * 1000 / m["ops"] if m["ops"] else 0
+            rate = f"{m['ops_per_sec']:,.1f}" if m["ops_per_sec"] else "-"
+            print(f"  {name:<28} {m['ops']:>7} {rate:>12} {ms:>10.3f} {m['bytes_written']:>15,}")
+    print("=" * 92)
+
+
+def compare_results(base: dict, current: dict, tolerance: float = 0.25) -> list:
+    """
+    Ops/sec of `current` against `base` for every (size, op) in both.
+    Returns the regressions: (size, op, base ops/sec, current ops/sec, ratio)
+    where current is more than `tolerance` slower.
+    """
+    regressions = []
+    print(f"\nCOMPARED WITH rev {base.get('git_rev') or '-'} ({base.get('created', '-')})")
+    print(f"  {'ROWS':>9} {'OPERATION':<28} {'BASE OPS/S':>12} {'NOW OPS/S':>12} {'RATIO':>7}")
+    for size, r in current["sizes"].items():
+        old = base.get("sizes", {}).get(size)
+        if old is None:
+            continue
+        for name, m in r["ops"].items():
+            o = old["ops"].get(name)
+            if not o or not o.get("ops_per_sec") or not m.get("ops_per_sec"):
+                continue
+            ratio = m["ops_per_sec"] / o["ops_per_sec"]
+            mark = "  SLOWER" if ratio < 1 - tolerance else ""
+            print(f"  {int(size):>9,} {name:<28} {o['ops_per_sec']:>12,.1f} {m['ops_per_sec']:>12,.1f} {ratio:>7.2f}{mark}")
+            if mark:
+                regressions.append((int(size), name, o["ops_per_sec"], m["ops_per_sec"], round(ratio, 3)))
+    return regressions
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmarks work order persistence and queue hot paths at scale.")
+    p.add_argument("--sizes", default=",".join(str(s) for s in BENCH_SIZES),
+                   help="comma-separated row counts (default: 1000,10000,100000,1000000)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--max-ops", type=int, default=2000, help="calls per operation at most")
+    p.add_argument("--min-sec", type=float, default=1.0, help="stop timing an operation after this long")
+    p.add_argument("-o", "--output", default=None,
+                   help=f"results JSON (default: {BENCH_RESULTS_JSON}, or {BENCH_STRESS_JSON} with --writers)")
+    p.add_argument("--compare", default=None, metavar="BASE_JSON", help="compare ops/sec with an earlier results file")
+    p.add_argument("--tolerance", type=float, default=0.25, help="slowdown that counts as a regression (0.25 = 25%%)")
+    p.add_argument("--writers", default=None, metavar="N,N,...",
+                   help="run the multi-writer stress instead (e.g. 1,2,4,8 concurrent processes)")
+    p.add_argument("--writer-ops", type=int, default=500, help="stress ops per writer process")
+    args = p.parse_args(argv)
+
+    if args.output is None:
+        args.output = BENCH_STRESS_JSON if args.writers else BENCH_RESULTS_JSON
+
+    if args.writers:
+        counts = [int(n) for n in args.writers.split(",") if n.strip()]
+        results = run_stress(counts, ops=args.writer_ops, seed=args.seed)
+        ok = print_stress(results)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+        if not ok:
+            sys.exit(1)
+        return
+
+    sizes = [int(s.replace("_", "")) for s in args.sizes.split(",") if s.strip()]
+    results = run_benchmarks(sizes, seed=args.seed, max_ops=args.max_ops, min_sec=args.min_sec)
+    print_results(results)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        if compare_results(base, results, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
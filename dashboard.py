@@ -1,9 +1,48 @@
 import os
+import shutil
+import sys
+import time
 from datetime import datetime
+from metrics import METRICS
 
 
-def clear_screen():
-    os.system("cls" if os.name == "nt" else "clear")
+# ANSI control sequences
+CURSOR_HOME_CLEAR = "\x1b[H\x1b[2J"
+ERASE_LINE_END = "\x1b[K"
+ERASE_BELOW = "\x1b[J"
+ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004   # Windows console mode flag
+
+
+def _is_tty(stream) -> bool:
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+
+def _enable_ansi(stream) -> bool:
+    """Turns on VT (ANSI) processing for a Windows console; False if it cannot be."""
+    if os.name != "nt":
+        return True
+    try:
+        import ctypes
+        import msvcrt
+
+        kernel32 = ctypes.windll.kernel32
+        handle = msvcrt.get_osfhandle(stream.fileno())
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        return bool(kernel32.SetConsoleMode(handle, mode.value | ENABLE_VIRTUAL_TERMINAL_PROCESSING))
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+def clear_screen(stream=None):
+    stream = stream or sys.stdout
+    if _is_tty(stream):
+        stream.write(CURSOR_HOME_CLEAR)
+        stream.flush()
 
 
 def format_row(label: str, value: str, width: int = 34) -> str:
@@ -11,62 +50,201 @@ def format_row(label: str, value: str, width: int = 34) -> str:
     return f"{label:<{width}} {value}"
 
 
-def show_dashboard(
+# ----------------------------
+# INCREMENTAL RENDERER
+# ----------------------------
+class DashboardRenderer:
+    """
+    Redraws the dashboard in place with ANSI cursor moves instead of a
+    clear-screen subprocess:
+    - only lines that differ from the frame on screen are rewritten
+    - at most max_fps frames per second; updates in between are coalesced
+      (the latest one is drawn on the next frame or on flush())
+    - when the stream is not a TTY (or a Windows console without ANSI
+      support) nothing is rendered at all
+    - frames taller than the terminal are clipped to it, so the screen never
+      scrolls and the diff stays valid; a resize forces a full redraw
+    - invalidate() after other output (prompts, reports) forces a full redraw
+    """
+
+    def __init__(self, max_fps: float = 10.0, stream=None, enabled: bool | None = None, clock=time.monotonic):
+        self.stream = stream or sys.stdout
+        self.enabled = _is_tty(self.stream) if enabled is None else enabled
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.clock = clock
+
+        self._screen = None     # lines currently on screen; None => next frame is a full redraw
+        self._size = None       # terminal size _screen was drawn for
+        self._pending = None    # build() of the newest update not drawn yet
+        self._last_frame = None
+        self.frames = 0
+        self.coalesced = 0
+        self.lines_written = 0
+
+        if self.enabled:
+            self.enabled = _enable_ansi(self.stream)
+
+    def invalidate(self):
+        self._screen = None
+
+    def submit(self, build, force: bool = False) -> bool:
+        """
+        build() -> list of lines, called only when a frame is actually drawn.
+        Returns True if a frame was drawn now.
+        """
+        if not self.enabled:
+            return False
+        if not force and self._last_frame is not None and self.clock() - self._last_frame < self.min_interval:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = build
+            return False
+        self._pending = None
+        self._draw(build())
+        return True
+
+    def flush(self):
+        if self._pending is not None:
+            build, self._pending = self._pending, None
+            self._draw(build())
+
+    def _draw(self, lines: list):
+        with METRICS.stage("dashboard_render") as st:
+            st.add_bytes(self._write_frame(lines))
+
+    def _write_frame(self, lines: list) -> int:
+        self._last_frame = self.clock()
+        size = shutil.get_terminal_size()
+        lines = [line[: size.columns - 1] for line in lines]   # a wrapped line would shift every row below it
+        rows = max(size.lines - 1, 1)   # the last row holds the parked cursor
+        if len(lines) > rows:
+            hidden = len(lines) - rows + 1
+            lines = lines[: rows - 1] + [f"... {hidden} more lines (enlarge the terminal)"[: size.columns - 1]]
+
+        out = []
+        if self._screen is None or size != self._size:
+            out.append(CURSOR_HOME_CLEAR)
+            out.append("\n".join(lines) + "\n")
+            self.lines_written += len(lines)
+        else:
+            prev = self._screen
+            for i, line in enumerate(lines):
+                if i >= len(prev) or prev[i] != line:
+                    out.append(f"\x1b[{i + 1};1H{line}{ERASE_LINE_END}")
+                    self.lines_written += 1
+            out.append(f"\x1b[{len(lines) + 1};1H{ERASE_BELOW}")   # park the cursor under the frame
+
+        data = "".join(out)
+        self.stream.write(data)
+        self.stream.flush()
+        self._screen = lines
+        self._size = size
+        self.frames += 1
+        return len(data)
+
+
+_default_renderer = None
+
+
+def get_renderer() -> DashboardRenderer:
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = DashboardRenderer()
+    return _default_renderer
+
+
+# ----------------------------
+# DASHBOARD LAYOUT
+# ----------------------------
+def dashboard_lines(
     fault_count: dict,
     total_repair_time: int,
     total_downtime_seconds: int,
     last_event: dict | None,
     score: dict | None = None,
     status_flags: dict | None = None,
-):
-    clear_screen()
+    now: datetime | None = None,
+    recent_events: list | None = None,
+) -> list:
+    lines = []
+    add = lines.append
 
-    print("FIELD SERVICE FAULT DASHBOARD")
-    print("=" * 60)
-    print(format_row("Status", "RUNNING"))
-    print(format_row("Last update", datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-    print("-" * 60)
+    add("FIELD SERVICE FAULT DASHBOARD")
+    add("=" * 60)
+    add(format_row("Status", "RUNNING"))
+    add(format_row("Last update", (now or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")))
+    add("-" * 60)
 
     # Flags
     if status_flags:
         sev = status_flags.get("site_status", "NORMAL")
         escal = status_flags.get("escalations", 0)
         crit_wrong = status_flags.get("critical_wrong", 0)
-        print("SITE STATUS")
-        print(format_row("Plant condition", sev))
-        print(format_row("Escalations", str(escal)))
-        print(format_row("Critical wrong actions", str(crit_wrong)))
-        print("-" * 60)
+        next_breach = status_flags.get("next_breach_min")
+        add("SITE STATUS")
+        add(format_row("Plant condition", sev))
+        add(format_row("Escalations", str(escal)))
+        add(format_row("Critical wrong actions", str(crit_wrong)))
+        add(format_row("Next SLA breach", f"in {next_breach} min" if next_breach is not None else "-"))
+        add("-" * 60)
 
     # Last event
-    print("LAST EVENT")
+    add("LAST EVENT")
     if last_event:
-        print(format_row("Fault", str(last_event.get("fault", "-"))))
-        print(format_row("Severity", str(last_event.get("severity", "-"))))
-        print(format_row("Result", str(last_event.get("result", "-"))))
-        print(format_row("Escalation", str(last_event.get("escalation", "None"))))
-        print(format_row("Resolution", str(last_event.get("resolution", "-"))))
-        print(format_row("Repair time (min)", str(last_event.get("time_taken_min", "-"))))
+        add(format_row("Fault", str(last_event.get("fault", "-"))))
+        add(format_row("Severity", str(last_event.get("severity", "-"))))
+        add(format_row("Result", str(last_event.get("result", "-"))))
+        add(format_row("Escalation", str(last_event.get("escalation", "None"))))
+        add(format_row("Resolution", str(last_event.get("resolution", "-"))))
+        add(format_row("Repair time (min)", str(last_event.get("time_taken_min", "-"))))
     else:
-        print("No events yet.")
-    print("-" * 60)
+        add("No events yet.")
+    add("-" * 60)
+
+    # Recent events (newest last)
+    if recent_events:
+        add("RECENT EVENTS")
+        for e in recent_events:
+            ts = str(e.get("timestamp", ""))[-8:]
+            add(format_row(f"{ts} {e.get('fault', '-')}", f"{e.get('result', '-')} ({e.get('severity', '-')})"))
+        add("-" * 60)
 
     # Totals + score
-    print("TOTALS")
-    print(format_row("Total repair time (min)", str(total_repair_time)))
-    print(format_row("Total downtime (sec)", str(total_downtime_seconds)))
+    add("TOTALS")
+    add(format_row("Total repair time (min)", str(total_repair_time)))
+    add(format_row("Total downtime (sec)", str(total_downtime_seconds)))
 
     if score:
-        print(format_row("Correct actions", str(score.get("correct", 0))))
-        print(format_row("Incorrect actions", str(score.get("incorrect", 0))))
-        print(format_row("Accuracy", f"{score.get('accuracy', 0)}%"))
-        print(format_row("Technician grade", str(score.get("grade", "-"))))
+        add(format_row("Correct actions", str(score.get("correct", 0))))
+        add(format_row("Incorrect actions", str(score.get("incorrect", 0))))
+        add(format_row("Accuracy", f"{score.get('accuracy', 0)}%"))
+        add(format_row("Technician grade", str(score.get("grade", "-"))))
 
-    print("-" * 60)
+    add("-" * 60)
 
     # Fault counts
-    print("FAULT COUNTS")
+    add("FAULT COUNTS")
     for k in sorted(fault_count.keys()):
-        print(format_row(k, str(fault_count[k])))
-    print("=" * 60)
-    print("Tip: Press Ctrl+C in terminal to stop.")
+        add(format_row(k, str(fault_count[k])))
+    add("=" * 60)
+    add("Tip: Press Ctrl+C in terminal to stop.")
+    return lines
+
+
+def show_dashboard(
+    fault_count: dict,
+    total_repair_time: int,
+    total_downtime_seconds: int,
+    last_event: dict | None,
+    score: dict | None = None,
+    status_flags: dict | None = None,
+    now: datetime | None = None,
+    recent_events: list | None = None,
+    renderer: DashboardRenderer | None = None,
+) -> bool:
+    """Queues a frame on `renderer` (default: get_renderer()); True if it was drawn now."""
+    renderer = renderer or get_renderer()
+    return renderer.submit(lambda: dashboard_lines(
+        fault_count, total_repair_time, total_downtime_seconds, last_event,
+        score=score, status_flags=status_flags, now=now, recent_events=recent_events,
+    ))
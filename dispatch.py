@@ -0,0 +1,478 @@
+import argparse
+import heapq
+import math
+import random
+from datetime import datetime
+
+import app
+
+
+# ----------------------------
+# TECHNICIAN ROSTER
+# ----------------------------
+class Technician:
+    """
+    One field technician:
+    - skills: fault names from app.FAULTS this tech may be dispatched to
+    - shift: [shift_start, shift_end) in minutes of the day (may wrap midnight)
+    - works assigned jobs one after another; max_load caps jobs queued on them
+    """
+
+    def __init__(self, tech_id: str, skills, shift_start: int = 0, shift_end: int = 24 * 60, max_load: int = 2):
+        self.tech_id = tech_id
+        self.skills = set(skills)
+        self.shift_start = shift_start
+        self.shift_end = shift_end
+        self.max_load = max_load
+
+        self.load = 0              # jobs assigned and not finished
+        self.free_at = 0.0         # epoch when the current job queue drains
+        self.busy_sec = 0.0
+        self.shift_sec = 0.0
+        self.jobs_done = 0
+        self.version = 0           # bumps on every change (stale heap entries)
+
+    def on_shift(self, minute_of_day: int) -> bool:
+        if self.shift_start <= self.shift_end:
+            return self.shift_start <= minute_of_day < self.shift_end
+        return minute_of_day >= self.shift_start or minute_of_day < self.shift_end
+
+    def has_capacity(self) -> bool:
+        return self.load < self.max_load
+
+
+SHIFTS = {
+    "day": (6 * 60, 14 * 60),
+    "swing": (14 * 60, 22 * 60),
+    "night": (22 * 60, 6 * 60),
+    "all": (0, 24 * 60),
+}
+
+
+def default_roster(n: int, rng=None, shifts=("day", "swing", "night"), skills_per_tech: int = 5) -> list:
+    """
+    n technicians spread over the given shifts; each knows skills_per_tech fault
+    types, and every fault type is covered on every shift.
+    """
+    rng = rng or random.Random()
+    names = [f["name"] for f in app.FAULTS]
+    roster = []
+    for i in range(n):
+        shift = shifts[i % len(shifts)]
+        skills = set(rng.sample(names, min(skills_per_tech, len(names))))
+        roster.append(Technician(f"T-{i + 1:02d}", skills, *SHIFTS[shift]))
+
+    for shift in shifts:
+        crew = [t for t in roster if (t.shift_start, t.shift_end) == SHIFTS[shift]]
+        for k, name in enumerate(names):
+            if crew and not any(name in t.skills for t in crew):
+                crew[k % len(crew)].skills.add(name)
+    return roster
+
+
+# ----------------------------
+# ASSIGNMENT ALGORITHMS
+# ----------------------------
+PRIORITY_WEIGHT = {0: 4.0, 1: 2.0, 2: 1.0}   # priority_rank -> lateness weight
+INF_COST = 1e15
+
+
+def hungarian(cost: list) -> list:
+    """
+    Min-cost assignment for an n x m matrix (n <= m), O(n^2 m).
+    Returns col index per row.
+    """
+    n, m = len(cost), len(cost[0]) if cost else 0
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [math.inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0, delta, j1 = p[j0], math.inf, 0
+            row = cost[i0 - 1]
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j], way[j] = cur, j0
+                    if minv[j] < delta:
+                        delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    result = [-1] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            result[p[j] - 1] = j - 1
+    return result
+
+
+# ----------------------------
+# DISPATCHER
+# ----------------------------
+class Dispatcher:
+    """
+    Assigns queued work orders (OPEN / BREACHED) to technicians each tick.
+    - Pending orders sit in one heap per fault type keyed by (SLA deadline,
+      priority_rank), fed by the work order store's change listener (lazy
+      invalidation)
+    - greedy: most urgent order among the fault types a free tech can take ->
+      least loaded on-shift tech with the skill (per-skill tech heaps); orders
+      no free tech can take stay in their heap, O((F + A + T*S) log N) per tick
+    - hungarian: the batch_limit most urgent orders vs. free techs, minimizing
+      priority-weighted lateness (one new job per tech per tick)
+    Assigned orders get Assigned_Tech (OPEN -> IN_PROGRESS); complete() closes them.
+    """
+
+    DISPATCHABLE = ("OPEN", "BREACHED")
+
+    def __init__(
+        self,
+        roster: list,
+        mode: str = "greedy",
+        batch_limit: int = 200,
+        default_job_min: int = 30,
+        dry_run: bool = False,
+    ):
+        if mode not in ("greedy", "hungarian"):
+            raise ValueError(f"Unknown dispatch mode: {mode}")
+        self.roster = {t.tech_id: t for t in roster}
+        self.mode = mode
+        self.batch_limit = batch_limit
+        self.default_job_min = default_job_min
+        self.dry_run = dry_run
+
+        self._pending = {}          # Fault -> heap of (deadline, pr_rank, wo_id)
+        self._pending_key = {}      # wo_id -> (Fault, live heap key)
+        self._last_tick = None
+        self.waits_sec = []
+        self.assigned = 0
+        self.completed = 0
+
+    # ---------- order intake ----------
+    def watch(self, store):
+        for r in store.iter_rows():
+            self.on_row(r)
+        store.subscribe(self.on_row)
+
+    def on_row(self, row: dict):
+        wo_id = row.get("WO_ID", "")
+        status = (row.get("Status", "") or "").strip().upper()
+        if status not in self.DISPATCHABLE or row.get("Assigned_Tech"):
+            self._pending_key.pop(wo_id, None)
+            return
+        created = app.row_created_epoch(row)
+        sla = app._safe_int(row.get("SLA_Minutes"), 999999)
+        deadline = app.sla_deadline_epoch(created, sla)
+        key = (deadline if deadline is not None else math.inf, app.priority_rank(row.get("Priority")), wo_id)
+        fault = row.get("Fault", "") or ""
+        if self._pending_key.get(wo_id) != (fault, key):
+            self._requeue(fault, key)
+
+    def pending_count(self) -> int:
+        return len(self._pending_key)
+
+    def _requeue(self, fault: str, key: tuple):
+        self._pending_key[key[2]] = (fault, key)
+        heapq.heappush(self._pending.setdefault(fault, []), key)
+
+    def _peek_pending(self, fault: str):
+        heap = self._pending.get(fault)
+        while heap:
+            key = heap[0]
+            if self._pending_key.get(key[2]) == (fault, key):
+                return key
+            heapq.heappop(heap)
+        return None
+
+    def _pop_pending(self, fault: str | None = None):
+        """Removes and returns the most urgent key of `fault` (any fault if None)."""
+        if fault is None:
+            heads = [(key, f) for f in list(self._pending) if (key := self._peek_pending(f)) is not None]
+            if not heads:
+                return None
+            key, fault = min(heads)
+        else:
+            key = self._peek_pending(fault)
+            if key is None:
+                return None
+        heapq.heappop(self._pending[fault])
+        del self._pending_key[key[2]]
+        return key
+
+    # ---------- ticks ----------
+    def _account_shifts(self, now: float, minute: int):
+        if self._last_tick is not None:
+            dt = max(now - self._last_tick, 0.0)
+            for t in self.roster.values():
+                if t.on_shift(minute):
+                    t.shift_sec += dt
+        self._last_tick = now
+
+    def tick(self, now: float) -> list:
+        """
+        Assigns what it can at epoch `now`. Returns assignments as dicts:
+        {wo_id, tech_id, start, end, wait_sec}. Callers schedule/perform the
+        completion at `end` and then call complete().
+        """
+        local = datetime.fromtimestamp(now)
+        minute = local.hour * 60 + local.minute
+        self._account_shifts(now, minute)
+        free = [t for t in self.roster.values() if t.on_shift(minute) and t.has_capacity()]
+        if not free or not self._pending_key:
+            return []
+        booked = {t.tech_id: t.free_at for t in free}
+        if self.mode == "hungarian":
+            plan = self._plan_hungarian(now, free)
+        else:
+            plan = self._plan_greedy(now, free)
+        # Planning advanced free_at to spread the load; _commit books the time
+        # again for the orders whose assignment is actually written
+        for t in free:
+            t.free_at = booked[t.tech_id]
+        assignments = []
+        for wo_id, tech in plan:
+            a = self._commit(now, wo_id, tech)
+            if a is not None:
+                assignments.append(a)
+        return assignments
+
+    def _job_sec(self, row: dict) -> float:
+        return 60.0 * (app._safe_int(row.get("Repair_Time_Min"), self.default_job_min) or self.default_job_min)
+
+    def _plan_greedy(self, now: float, free: list) -> list:
+        by_skill = {}
+
+        def push(t):
+            entry = (t.load, max(t.free_at, now), t.tech_id, t.version)
+            for skill in t.skills:
+                heapq.heappush(by_skill.setdefault(skill, []), entry)
+
+        def best_tech(heap):
+            while heap:
+                _load, _free, tech_id, version = heap[0]
+                cand = self.roster[tech_id]
+                if cand.version == version and cand.has_capacity():
+                    return cand
+                heapq.heappop(heap)
+            return None
+
+        for t in free:
+            push(t)
+
+        # Head of each fault's pending heap that some free tech has the skill for;
+        # the other orders are never popped, so they keep their place untouched
+        heads = [(key, fault) for fault in by_skill if (key := self._peek_pending(fault)) is not None]
+        heapq.heapify(heads)
+
+        store = app.get_work_order_store()
+        plan = []
+        capacity = sum(t.max_load - t.load for t in free)
+        while capacity > 0 and heads:
+            _key, fault = heapq.heappop(heads)
+            tech = best_tech(by_skill[fault])
+            if tech is None:
+                continue  # skilled techs are full for this tick: the fault's orders stay queued
+            key = self._pop_pending(fault)
+            nxt = self._peek_pending(fault)
+            if nxt is not None:
+                heapq.heappush(heads, (nxt, fault))
+            row = store.get(key[2])
+            if row is None:
+                continue
+            plan.append((key[2], tech))
+            tech.load += 1
+            tech.free_at = max(tech.free_at, now) + self._job_sec(row)
+            tech.version += 1
+            capacity -= 1
+            if tech.has_capacity():
+                push(tech)
+        return plan
+
+    def _plan_hungarian(self, now: float, free: list) -> list:
+        store = app.get_work_order_store()
+        batch = []
+        # More than a few candidates per free tech rarely changes the optimum
+        limit = min(self.batch_limit, 3 * len(free))
+        while len(batch) < limit:
+            key = self._pop_pending()
+            if key is None:
+                break
+            row = store.get(key[2])
+            if row is not None:
+                batch.append((key, row))
+        if not batch:
+            return []
+
+        n, slots = len(batch), len(free)
+        cost = []
+        for (deadline, pr_rank, _wo_id), row in batch:
+            w = PRIORITY_WEIGHT.get(pr_rank, 1.0)
+            job = self._job_sec(row)
+            line = []
+            for t in free:
+                if row.get("Fault") not in t.skills:
+                    line.append(INF_COST)
+                    continue
+                finish = max(t.free_at, now) + job
+                late = max(finish - deadline, 0.0) if deadline != math.inf else 0.0
+                line.append(w * late + finish * 1e-6)
+            # dummy columns: leave the order queued until next tick
+            stay = w * (job + 60.0) * 1e3 if deadline == math.inf else w * max(now + 3600 - deadline, 3600) * 1e3
+            line += [stay] * n
+            cost.append(line)
+
+        cols = hungarian(cost)
+        plan = []
+        for i, ((key, row), j) in enumerate(zip(batch, cols)):
+            if 0 <= j < slots and cost[i][j] < INF_COST:
+                tech = free[j]
+                plan.append((key[2], tech))
+                tech.load += 1
+                tech.free_at = max(tech.free_at, now) + self._job_sec(row)
+                tech.version += 1
+            else:
+                self._requeue(row.get("Fault", "") or "", key)
+        return plan
+
+    def _commit(self, now: float, wo_id: str, tech: Technician) -> dict | None:
+        """
+        Writes one planned assignment. Returns None (and gives the tech the
+        planned slot back) if the order was closed, assigned or dropped by
+        another writer since it was queued.
+        """
+        row = app.get_work_order_store().get(wo_id)
+        ok = row is not None
+        if ok and not self.dry_run:
+            def assign(current):
+                # A BREACHED order stays BREACHED (already counted); OPEN -> IN_PROGRESS
+                status = (current.get("Status", "") or "").strip().upper()
+                if status == "CLOSED" or current.get("Assigned_Tech"):
+                    return None   # closed / taken by another console since it was queued
+                return {
+                    "Status": "BREACHED" if status == "BREACHED" else "IN_PROGRESS",
+                    "Assigned_Tech": tech.tech_id,
+                    "Last_Updated": app.now_iso(),
+                }
+
+            ok = app.modify_work_order(wo_id, assign)
+        if not ok:
+            tech.load = max(tech.load - 1, 0)
+            tech.version += 1
+            return None
+
+        job = self._job_sec(row)
+        start = max(tech.free_at, now)
+        end = start + job
+        tech.free_at = end
+        created = app.row_created_epoch(row)
+        wait = max(start - created, 0.0) if created is not None else 0.0
+        self.waits_sec.append(wait)
+        self.assigned += 1
+        return {"wo_id": wo_id, "tech_id": tech.tech_id, "start": start, "end": end, "wait_sec": wait}
+
+    def complete(self, wo_id: str, tech_id: str, job_sec: float | None = None):
+        tech = self.roster[tech_id]
+        row = app.get_work_order_store().get(wo_id)
+        job = job_sec if job_sec is not None else (self._job_sec(row) if row else 0.0)
+        tech.load = max(tech.load - 1, 0)
+        tech.busy_sec += job
+        tech.jobs_done += 1
+        tech.version += 1
+        self.completed += 1
+        if row and not self.dry_run:
+            def close(current):
+                if (current.get("Status", "") or "").strip().upper() == "CLOSED":
+                    return None
+                stamp = app.now_iso()
+                return {
+                    "Status": "CLOSED",
+                    "Last_Updated": stamp,
+                    "Closed_Timestamp": stamp,
+                    "Closeout_Notes": f"Completed by {tech_id}",
+                }
+
+            app.modify_work_order(wo_id, close)
+
+    # ---------- reporting ----------
+    def report(self) -> dict:
+        waits = sorted(self.waits_sec)
+
+        def pct(p):
+            return round(waits[min(int(p * len(waits)), len(waits) - 1)] / 60, 1) if waits else 0.0
+
+        techs = {
+            t.tech_id: {
+                "jobs_done": t.jobs_done,
+                "utilization_pct": round(100 * t.busy_sec / t.shift_sec, 1) if t.shift_sec else 0.0,
+                "on_shift_h": round(t.shift_sec / 3600, 1),
+            }
+            for t in self.roster.values()
+        }
+        return {
+            "mode": self.mode,
+            "assigned": self.assigned,
+            "completed": self.completed,
+            "pending": self.pending_count(),
+            "avg_wait_min": round(sum(waits) / len(waits) / 60, 1) if waits else 0.0,
+            "p95_wait_min": pct(0.95),
+            "max_wait_min": round(waits[-1] / 60, 1) if waits else 0.0,
+            "technicians": techs,
+        }
+
+
+def print_dispatch_report(rep: dict):
+    print("DISPATCH REPORT")
+    print("=" * 60)
+    print(f"Mode: {rep['mode']}  Assigned: {rep['assigned']}  Completed: {rep['completed']}  Pending: {rep['pending']}")
+    print(f"Queue wait (min): avg {rep['avg_wait_min']}  p95 {rep['p95_wait_min']}  max {rep['max_wait_min']}")
+    print("-" * 60)
+    print(f"{'TECH':<8} {'JOBS':<6} {'UTIL %':<8} {'ON SHIFT (h)'}")
+    for tech_id, t in sorted(rep["technicians"].items()):
+        print(f"{tech_id:<8} {t['jobs_done']:<6} {t['utilization_pct']:<8} {t['on_shift_h']}")
+    print("=" * 60)
+
+
+# ----------------------------
+# CLI: DISPATCH THE CURRENT BACKLOG
+# ----------------------------
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Assign queued work orders in work_orders.csv to a technician roster.")
+    p.add_argument("--technicians", type=int, default=4)
+    p.add_argument("--mode", choices=["greedy", "hungarian"], default="greedy")
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--apply", action="store_true", help="write assignments (IN_PROGRESS + Assigned_Tech)")
+    args = p.parse_args(argv)
+
+    roster = default_roster(args.technicians, random.Random(args.seed), shifts=("all",))
+    dispatcher = Dispatcher(roster, mode=args.mode, dry_run=not args.apply)
+    dispatcher.watch(app.get_work_order_store())
+
+    plan = dispatcher.tick(app.CLOCK.time())
+    print(f"{'WO_ID':<10} {'TECH':<6} {'START':<20} {'WAIT (min)'}")
+    for a in plan:
+        start = datetime.fromtimestamp(a["start"]).strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{a['wo_id']:<10} {a['tech_id']:<6} {start:<20} {round(a['wait_sec'] / 60)}")
+    print(f"\n{len(plan)} assigned, {dispatcher.pending_count()} still queued" + ("" if args.apply else " (dry run)"))
+    app.close_work_order_store()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,592 @@
+import argparse
+import random
+import time
+from collections import deque
+from datetime import datetime
+
+import app
+import dashboard
+import dispatch
+import metrics
+from records import EventColumns
+from sim_clock import EventScheduler, VirtualClock
+
+
+# ----------------------------
+# TECHNICIAN POLICIES
+# ----------------------------
+# A policy replaces stdin in handle_fault(): choose() gets the same action list
+# technician_action_menu() would print and returns (action_text, is_correct).
+def _correct_action(actions: list):
+    for text, ok in actions:
+        if ok:
+            return text, ok
+    return actions[0]
+
+
+def _wrong_action(actions: list, rng):
+    wrong = [a for a in actions if not a[1]]
+    return rng.choice(wrong) if wrong else ("Invalid choice → No action taken", False)
+
+
+class AlwaysCorrectPolicy:
+    name = "correct"
+
+    def choose(self, fault: str, severity: str, actions: list):
+        return _correct_action(actions)
+
+
+class FixedAccuracyPolicy:
+    name = "random"
+
+    def __init__(self, accuracy: float = 0.8, rng=None):
+        self.accuracy = max(0.0, min(1.0, float(accuracy)))
+        self.rng = rng or random.Random()
+
+    def choose(self, fault: str, severity: str, actions: list):
+        if self.rng.random() < self.accuracy:
+            return _correct_action(actions)
+        return _wrong_action(actions, self.rng)
+
+
+class HistoryPolicy:
+    """
+    Learns per-fault accuracy from fault_history.csv (Result column):
+    - p(correct | fault) = (correct + 1) / (total + 2)   (Laplace smoothed)
+    - Faults never seen fall back to the overall accuracy
+    """
+    name = "history"
+
+    def __init__(self, accuracy_by_fault: dict, default_accuracy: float, rng=None):
+        self.accuracy_by_fault = accuracy_by_fault
+        self.default_accuracy = default_accuracy
+        self.rng = rng or random.Random()
+
+    @classmethod
+    def from_history_csv(cls, path: str = app.FAULT_HISTORY_CSV, rng=None):
+        history = EventColumns.from_csv(path, app.FAULT_HISTORY_COLUMNS, app.FAULT_HISTORY_KEYS)
+        counts = {k: c for k, c in history.outcomes_by_fault().items() if k.strip()}
+
+        ok = sum(c[0] for c in counts.values())
+        total = sum(c[0] + c[1] for c in counts.values())
+        default = (ok + 1) / (total + 2)
+        by_fault = {k: (c[0] + 1) / (c[0] + c[1] + 2) for k, c in counts.items()}
+        return cls(by_fault, default, rng)
+
+    def choose(self, fault: str, severity: str, actions: list):
+        p = self.accuracy_by_fault.get(fault, self.default_accuracy)
+        if self.rng.random() < p:
+            return _correct_action(actions)
+        return _wrong_action(actions, self.rng)
+
+
+def make_policy(spec: str, rng=None):
+    """
+    Policy spec strings (CLI --policy):
+    - "correct"            always picks the correct action
+    - "random:0.85"        correct with fixed probability
+    - "history[:path]"     per-fault accuracy learned from a fault history CSV
+    """
+    kind, _, arg = (spec or "correct").partition(":")
+    kind = kind.strip().lower()
+    if kind == "correct":
+        return AlwaysCorrectPolicy()
+    if kind == "random":
+        return FixedAccuracyPolicy(float(arg or 0.8), rng)
+    if kind == "history":
+        return HistoryPolicy.from_history_csv(arg or app.FAULT_HISTORY_CSV, rng)
+    raise ValueError(f"Unknown technician policy: {spec}")
+
+
+# ----------------------------
+# HEADLESS RUN
+# ----------------------------
+class HeadlessRun:
+    """
+    Runs the main() fault cycle without stdin or sleeps.
+    - Same simulate_fault / handle_fault / apply_escalation_rules path as main()
+    - Keeps its own counters instead of app's module-level globals
+    - persist=True also writes fault_log.txt and work orders (generate_work_order)
+    - renderer (dashboard.DashboardRenderer) shows a live dashboard, capped at
+      its max_fps; no renderer = no redraws at all
+    """
+
+    def __init__(
+        self,
+        policy,
+        rng=None,
+        persist: bool = False,
+        scan_every: int = 1,
+        stop_on_stop_work: bool = True,
+        renderer=None,
+    ):
+        self.policy = policy
+        self.rng = rng or random.Random()
+        self.persist = persist
+        self.scan_every = max(int(scan_every), 0)
+        self.stop_on_stop_work = stop_on_stop_work
+        self.renderer = renderer
+
+        self.fault_count = {f["name"]: 0 for f in app.FAULTS}
+        self.total_repair_time = 0
+        self.total_downtime_seconds = 0
+        self.score = {"correct": 0, "incorrect": 0, "accuracy": 0, "grade": "-"}
+        self.status_flags = {
+            "escalations": 0,
+            "critical_wrong": 0,
+            "sla_breaches": 0,
+            "high_sla_breaches": 0,
+            "site_status": "NORMAL",
+        }
+        self.work_orders = {"HIGH": 0, "MEDIUM": 0, "LOW": 0}
+        self.last_event = None
+        self.sla_breaches_total = 0        # status_flags counts reset every scan
+        self.high_sla_breaches_total = 0
+        self.events = 0
+        self.stopped = False
+        self.elapsed_sec = 0.0
+
+    def resolve(self, fault: str, severity: str):
+        """
+        handle_fault -> scoring -> counters for one fault, no I/O.
+        Returns (entry, repair_min, result, escalation, resolution); entry
+        (build_event_entry) is None unless persisting.
+        """
+        resolution, time_taken, result, escalation, _selected_action = app.handle_fault(
+            fault, severity, policy=self.policy, flags=self.status_flags
+        )
+
+        self.fault_count[fault] += 1
+        self.total_repair_time += time_taken
+
+        if result == "CORRECT":
+            self.score["correct"] += 1
+        else:
+            self.score["incorrect"] += 1
+
+        app.update_accuracy_and_grade(self.score)
+
+        if escalation != "None":
+            self.work_orders[app.severity_to_priority(severity)] += 1
+
+        entry = None
+        if self.persist:
+            entry = app.build_event_entry(
+                fault, severity, result, escalation, resolution, time_taken,
+                self.total_repair_time, self.total_downtime_seconds,
+                self.score, self.status_flags,
+            )
+
+        self.events += 1
+        if self.status_flags["site_status"] == "STOP WORK":
+            self.stopped = True
+        return entry, time_taken, result, escalation, resolution
+
+    def process_fault(self, fault: str, severity: str, scan: bool = True):
+        """One fault through handle_fault -> scoring -> log/work order. Returns (entry, repair_min)."""
+        entry, time_taken, result, escalation, resolution = self.resolve(fault, severity)
+
+        if entry is not None:
+            app.write_text_log(entry)
+            entry["work_order_file"] = app.generate_work_order(entry, interactive=False)
+            app.record_fault_event(entry, stream_csv=False)   # keep fault_history.csv for real shifts
+
+            if scan and self.scan_every and self.events % self.scan_every == 0:
+                self.sla_scan()
+                if self.status_flags["site_status"] == "STOP WORK":
+                    self.stopped = True
+
+        if self.renderer is not None:
+            self.last_event = {
+                "fault": fault,
+                "severity": severity,
+                "result": result,
+                "escalation": escalation,
+                "resolution": resolution,
+                "time_taken_min": time_taken,
+            }
+            self.renderer.submit(self.dashboard_lines)   # built only when a frame is due
+
+        return entry, time_taken
+
+    def dashboard_lines(self) -> list:
+        return dashboard.dashboard_lines(
+            self.fault_count,
+            self.total_repair_time,
+            self.total_downtime_seconds,
+            self.last_event,
+            score=self.score,
+            status_flags=self.status_flags,
+            now=app.CLOCK.now(),
+            recent_events=list(app.event_history)[-app.DASHBOARD_RECENT_EVENTS:] if self.persist else None,
+        )
+
+    def sla_scan(self):
+        app.sla_breach_escalation_scan(self.status_flags)
+        self.sla_breaches_total += self.status_flags["sla_breaches"]
+        self.high_sla_breaches_total += self.status_flags["high_sla_breaches"]
+
+    def step(self):
+        fault, severity = app.simulate_fault(self.rng)
+        entry, _time_taken = self.process_fault(fault, severity)
+
+        # Downtime between faults is accounted for, never slept
+        self.total_downtime_seconds += self.rng.randint(3, 7)
+        return entry
+
+    def run(self, n_faults: int) -> dict:
+        started = time.perf_counter()
+        for _ in range(n_faults):
+            self.step()
+            if self.stopped and self.stop_on_stop_work:
+                break
+        if self.renderer is not None:
+            self.renderer.flush()
+        if self.persist:
+            app.close_event_log()
+            app.close_work_order_docs()
+            app.close_work_order_store()
+            app.release_work_order_ids()
+        self.elapsed_sec += time.perf_counter() - started
+        return self.summary()
+
+    def summary(self) -> dict:
+        return {
+            "policy": getattr(self.policy, "name", type(self.policy).__name__),
+            "events": self.events,
+            "elapsed_sec": round(self.elapsed_sec, 6),
+            "events_per_sec": round(self.events / self.elapsed_sec, 1) if self.elapsed_sec > 0 else 0.0,
+            "fault_count": dict(self.fault_count),
+            "total_repair_time_min": self.total_repair_time,
+            "total_downtime_sec": self.total_downtime_seconds,
+            "correct": self.score["correct"],
+            "incorrect": self.score["incorrect"],
+            "accuracy_pct": self.score["accuracy"],
+            "grade": self.score["grade"],
+            "escalations": self.status_flags["escalations"],
+            "critical_wrong": self.status_flags["critical_wrong"],
+            "sla_breaches": self.status_flags["sla_breaches"],
+            "high_sla_breaches": self.status_flags["high_sla_breaches"],
+            "sla_breaches_total": self.sla_breaches_total,
+            "high_sla_breaches_total": self.high_sla_breaches_total,
+            "site_status": self.status_flags["site_status"],
+            "stop_work": self.stopped,
+            "work_orders": dict(self.work_orders),
+        }
+
+
+class DiscreteEventRun(HeadlessRun):
+    """
+    Simulated-time run: app's clock is swapped for a VirtualClock driven by an
+    EventScheduler, so hours of shift time run in (milli)seconds.
+    - Fault arrivals: Poisson, mean gap arrival_mean_min
+    - One technician works faults in arrival order; each repair takes its
+      repair_time_minutes(); downtime = technician idle time
+    - Escalated work orders get a follow-up crew that closes them after an
+      exponential delay (followup_mean_min), unless the SLA scan, run every
+      scan_interval_min of sim time, breaches them first (persist=True only)
+    - With a dispatch.Dispatcher, the follow-up crew is replaced by its roster:
+      queued work orders are assigned every dispatch_interval_min and closed
+      when the assigned technician finishes the job (persist=True required)
+    """
+
+    def __init__(
+        self,
+        policy,
+        rng=None,
+        persist: bool = False,
+        stop_on_stop_work: bool = True,
+        start=None,
+        arrival_mean_min: float = 20.0,
+        followup_mean_min: float = 30.0,
+        scan_interval_min: float = 1.0,
+        dispatcher=None,
+        dispatch_interval_min: float = 1.0,
+        renderer=None,
+    ):
+        if dispatcher is not None and not persist:
+            raise ValueError("Dispatching needs persisted work orders (persist=True)")
+        super().__init__(
+            policy,
+            rng=rng,
+            persist=persist,
+            scan_every=0,
+            stop_on_stop_work=stop_on_stop_work,
+            renderer=renderer,
+        )
+        self.clock = VirtualClock(start)
+        self.scheduler = EventScheduler(self.clock)
+        self.arrival_mean_min = arrival_mean_min
+        self.followup_mean_min = followup_mean_min
+        self.scan_interval_min = scan_interval_min
+        self.dispatcher = dispatcher
+        self.dispatch_interval_min = dispatch_interval_min
+
+        self.backlog = deque()       # (arrival_epoch, fault, severity)
+        self.busy = False
+        self.idle_since = self.clock.time()
+        self.total_wait_sec = 0.0
+        self.work_orders_closed = 0
+        self.sim_start = self.clock.time()
+
+    # ---------- events ----------
+    def _on_arrival(self):
+        fault, severity = app.simulate_fault(self.rng)
+        self.backlog.append((self.clock.time(), fault, severity))
+        self.scheduler.schedule(self.rng.expovariate(1.0 / (self.arrival_mean_min * 60)), self._on_arrival)
+        if not self.busy:
+            self._start_next()
+
+    def _start_next(self):
+        if not self.backlog:
+            self.busy = False
+            self.idle_since = self.clock.time()
+            return
+
+        now = self.clock.time()
+        if not self.busy:
+            self.total_downtime_seconds += int(now - self.idle_since)
+        self.busy = True
+
+        arrived, fault, severity = self.backlog.popleft()
+        self.total_wait_sec += now - arrived
+        entry, time_taken = self.process_fault(fault, severity, scan=False)
+
+        if entry and entry.get("wo_id") and self.dispatcher is None:
+            delay = time_taken * 60 + self.rng.expovariate(1.0 / (self.followup_mean_min * 60))
+            self.scheduler.schedule(delay, self._on_followup, entry["wo_id"])
+        self.scheduler.schedule(time_taken * 60, self._on_repair_done)
+
+    def _on_repair_done(self):
+        self.busy = False
+        self.idle_since = self.clock.time()
+        self._start_next()
+
+    def _on_followup(self, wo_id: str):
+        def close(row):
+            if (row.get("Status", "") or "").strip().upper() not in app.SLA_ACTIVE_STATUSES:
+                return None
+            stamp = app.now_iso()
+            return {
+                "Status": "CLOSED",
+                "Last_Updated": stamp,
+                "Closed_Timestamp": stamp,
+                "Closeout_Notes": "Closed by follow-up crew (simulated)",
+            }
+
+        # Another console may have closed or reassigned it meanwhile
+        if app.modify_work_order(wo_id, close):
+            self.work_orders_closed += 1
+
+    def _on_dispatch(self):
+        for a in self.dispatcher.tick(self.clock.time()):
+            self.scheduler.schedule_at(a["end"], self._on_job_done, a["wo_id"], a["tech_id"], a["end"] - a["start"])
+        self.scheduler.schedule(self.dispatch_interval_min * 60, self._on_dispatch)
+
+    def _on_job_done(self, wo_id: str, tech_id: str, job_sec: float):
+        self.dispatcher.complete(wo_id, tech_id, job_sec)
+        self.work_orders_closed += 1
+
+    def _on_scan(self):
+        self.sla_scan()
+        if self.status_flags["site_status"] == "STOP WORK":
+            self.stopped = True
+        self.scheduler.schedule(self.scan_interval_min * 60, self._on_scan)
+
+    # ---------- run ----------
+    def run_for(self, hours: float) -> dict:
+        previous = app.CLOCK
+        app.set_clock(self.clock)
+        started = time.perf_counter()
+        try:
+            if self.scheduler.next_time() is None:
+                self.scheduler.schedule(0, self._on_arrival)
+                if self.persist and self.scan_interval_min > 0:
+                    self.scheduler.schedule(self.scan_interval_min * 60, self._on_scan)
+                if self.dispatcher is not None:
+                    self.dispatcher.watch(app.get_work_order_store())
+                    self.scheduler.schedule(self.dispatch_interval_min * 60, self._on_dispatch)
+            self.scheduler.run(
+                until=self.clock.time() + hours * 3600,
+                stop=lambda: self.stopped and self.stop_on_stop_work,
+            )
+            if self.renderer is not None:
+                self.renderer.flush()
+            if self.persist:
+                app.close_event_log()
+                app.close_work_order_docs()
+                app.close_work_order_store()
+                app.release_work_order_ids()
+        finally:
+            app.set_clock(previous)
+        self.elapsed_sec += time.perf_counter() - started
+        return self.summary()
+
+    def summary(self) -> dict:
+        s = super().summary()
+        s["sim_hours"] = round((self.clock.time() - self.sim_start) / 3600, 2)
+        s["sim_events"] = self.scheduler.processed
+        s["avg_wait_min"] = round(self.total_wait_sec / 60 / self.events, 2) if self.events else 0.0
+        s["backlog"] = len(self.backlog)
+        s["work_orders_closed"] = self.work_orders_closed
+        if self.dispatcher is not None:
+            s["dispatch"] = self.dispatcher.report()
+        return s
+
+
+def _renderer(fps: float | None):
+    """Live dashboard at `fps` frames/sec max (None = off; a no-TTY stdout also turns it off)."""
+    if not fps:
+        return None
+    renderer = dashboard.DashboardRenderer(max_fps=fps)
+    return renderer if renderer.enabled else None
+
+
+def run_headless(
+    n_faults: int,
+    policy="correct",
+    seed: int | None = None,
+    persist: bool = False,
+    scan_every: int = 1,
+    stop_on_stop_work: bool = True,
+    dashboard_fps: float | None = None,
+) -> dict:
+    rng = random.Random(seed)
+    if isinstance(policy, str):
+        policy = make_policy(policy, random.Random(None if seed is None else seed + 1))
+    run = HeadlessRun(
+        policy,
+        rng=rng,
+        persist=persist,
+        scan_every=scan_every,
+        stop_on_stop_work=stop_on_stop_work,
+        renderer=_renderer(dashboard_fps),
+    )
+    return run.run(n_faults)
+
+
+def run_virtual(
+    hours: float,
+    policy="correct",
+    seed: int | None = None,
+    persist: bool = False,
+    stop_on_stop_work: bool = True,
+    start=None,
+    arrival_mean_min: float = 20.0,
+    followup_mean_min: float = 30.0,
+    scan_interval_min: float = 1.0,
+    technicians: int = 0,
+    dispatch_mode: str = "greedy",
+    dispatch_interval_min: float = 1.0,
+    dashboard_fps: float | None = None,
+) -> dict:
+    rng = random.Random(seed)
+    if isinstance(policy, str):
+        policy = make_policy(policy, random.Random(None if seed is None else seed + 1))
+    dispatcher = None
+    if technicians > 0:
+        roster = dispatch.default_roster(technicians, random.Random(None if seed is None else seed + 2))
+        dispatcher = dispatch.Dispatcher(roster, mode=dispatch_mode)
+    run = DiscreteEventRun(
+        policy,
+        rng=rng,
+        persist=persist,
+        stop_on_stop_work=stop_on_stop_work,
+        start=start,
+        arrival_mean_min=arrival_mean_min,
+        followup_mean_min=followup_mean_min,
+        scan_interval_min=scan_interval_min,
+        dispatcher=dispatcher,
+        dispatch_interval_min=dispatch_interval_min,
+        renderer=_renderer(dashboard_fps),
+    )
+    return run.run_for(hours)
+
+
+def print_summary(summary: dict):
+    print("HEADLESS SIMULATION SUMMARY")
+    print("=" * 60)
+    print(f"Policy: {summary['policy']}")
+    print(f"Events: {summary['events']}  ({summary['events_per_sec']} events/sec, {summary['elapsed_sec']}s)")
+    print(f"Accuracy: {summary['accuracy_pct']}%  Grade: {summary['grade']}")
+    print(f"Escalations: {summary['escalations']}  Critical wrong: {summary['critical_wrong']}")
+    print(f"SLA breaches: {summary['sla_breaches_total']}  HIGH SLA breaches: {summary['high_sla_breaches_total']}")
+    print(f"Site status: {summary['site_status']}")
+    wo = summary["work_orders"]
+    print(f"Work orders: {sum(wo.values())}  (HIGH {wo['HIGH']} / MEDIUM {wo['MEDIUM']} / LOW {wo['LOW']})")
+    print(f"Total repair time: {summary['total_repair_time_min']} minutes")
+    print(f"Total downtime (between faults): {summary['total_downtime_sec']} seconds")
+    if "sim_hours" in summary:
+        print(f"Simulated time: {summary['sim_hours']} h  ({summary['sim_events']} scheduler events)")
+        print(f"Avg wait for technician: {summary['avg_wait_min']} min  Backlog at end: {summary['backlog']}")
+        closer = "dispatched technicians" if "dispatch" in summary else "follow-up"
+        print(f"Work orders closed by {closer}: {summary['work_orders_closed']}")
+    print("=" * 60)
+    if "dispatch" in summary:
+        dispatch.print_dispatch_report(summary["dispatch"])
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Headless fault dispatch simulation (no prompts, no sleeps).")
+    p.add_argument("-n", "--faults", type=int, default=100000, help="number of faults to simulate")
+    p.add_argument("--policy", default="correct", help='technician policy: correct | random:<p> | history[:csv]')
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--persist", action="store_true", help="write fault log + work orders like the interactive mode")
+    p.add_argument("--scan-every", type=int, default=1, help="SLA scan every N faults when persisting (0 = never)")
+    p.add_argument("--no-stop", action="store_true", help="keep running after STOP WORK")
+    p.add_argument("--dashboard", type=float, default=None, metavar="FPS",
+                   help="live dashboard, redrawn at most FPS times per second (TTY only)")
+    p.add_argument("--metrics", action="store_true",
+                   help=f"time hot paths; write {app.METRICS_PROM} + {app.METRICS_JSON} and print per-stage latency")
+
+    sim = p.add_argument_group("simulated time (discrete-event mode)")
+    sim.add_argument("--virtual-hours", type=float, default=None, help="run N hours of sim time instead of -n faults")
+    sim.add_argument("--start", default=None, help='sim start, e.g. "2026-02-09 08:00:00" (default: now)')
+    sim.add_argument("--arrival-mean-min", type=float, default=20.0)
+    sim.add_argument("--followup-mean-min", type=float, default=30.0)
+    sim.add_argument("--scan-interval-min", type=float, default=1.0)
+    sim.add_argument("--technicians", type=int, default=0, help="dispatch work orders to a roster of N techs (needs --persist)")
+    sim.add_argument("--dispatch-mode", choices=["greedy", "hungarian"], default="greedy")
+    sim.add_argument("--dispatch-interval-min", type=float, default=1.0)
+    args = p.parse_args(argv)
+    if args.metrics:
+        metrics.METRICS.enable()
+
+    if args.virtual_hours is not None:
+        summary = run_virtual(
+            args.virtual_hours,
+            policy=args.policy,
+            seed=args.seed,
+            persist=args.persist,
+            stop_on_stop_work=not args.no_stop,
+            start=datetime.fromisoformat(args.start) if args.start else None,
+            arrival_mean_min=args.arrival_mean_min,
+            followup_mean_min=args.followup_mean_min,
+            scan_interval_min=args.scan_interval_min,
+            technicians=args.technicians,
+            dispatch_mode=args.dispatch_mode,
+            dispatch_interval_min=args.dispatch_interval_min,
+            dashboard_fps=args.dashboard,
+        )
+    else:
+        summary = run_headless(
+            args.faults,
+            policy=args.policy,
+            seed=args.seed,
+            persist=args.persist,
+            scan_every=args.scan_every,
+            stop_on_stop_work=not args.no_stop,
+            dashboard_fps=args.dashboard,
+        )
+    print_summary(summary)
+
+    if metrics.METRICS.enabled:
+        app.export_metrics()
+        print("\nHOT-PATH METRICS")
+        for line in metrics.format_metrics_table(metrics.METRICS.snapshot()):
+            print(line)
+        print(f"Metrics written to {app.METRICS_PROM} / {app.METRICS_JSON}")
+
+
+if __name__ == "__main__":
+    main()
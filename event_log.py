@@ -0,0 +1,242 @@
+import csv
+import glob
+import gzip
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+
+# ----------------------------
+# BUFFERED, ROTATING LOG WRITER
+# ----------------------------
+class RotatingBufferedWriter:
+    """
+    Long-lived append writer for one log file:
+    - lines collect in memory and are written in one call once flush_bytes
+      are pending or flush_sec have passed since the last flush
+    - rotates before a write that would push the file past rotate_bytes, or
+      on the first write of a new day (rotate_daily); rotated files are
+      named <path>.<YYYY-MM-DD>.<n> and gzipped when compress=True
+    - day boundaries follow `clock` (epoch seconds), so sim time rotates too
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_bytes: int = 64 * 1024,
+        flush_sec: float = 1.0,
+        rotate_bytes: int | None = None,
+        rotate_daily: bool = False,
+        compress: bool = True,
+        clock=time.time,
+    ):
+        self.path = path
+        self.flush_bytes = flush_bytes
+        self.flush_sec = flush_sec
+        self.rotate_bytes = rotate_bytes
+        self.rotate_daily = rotate_daily
+        self.compress = compress
+        self.clock = clock
+
+        self._buf = []
+        self._buf_bytes = 0
+        self._last_flush = time.monotonic()
+        self._f = None
+        self._size = 0
+        self._day = None
+        self.bytes_written = 0
+
+    def _open(self):
+        self._f = open(self.path, "a", encoding="utf-8")
+        self._size = self._f.tell()
+        if self._day is None:
+            stamp = os.path.getmtime(self.path) if self._size else self.clock()
+            self._day = datetime.fromtimestamp(stamp).date()
+
+    def write(self, line: str):
+        self._buf.append(line)
+        self._buf_bytes += len(line)
+        if self._buf_bytes >= self.flush_bytes or time.monotonic() - self._last_flush >= self.flush_sec:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._buf:
+            return
+        if self._f is None:
+            self._open()
+        if self.rotate_daily and datetime.fromtimestamp(self.clock()).date() != self._day:
+            self.rotate()
+        elif self.rotate_bytes and self._size and self._size + self._buf_bytes > self.rotate_bytes:
+            self.rotate()
+
+        data = "".join(self._buf)
+        self._buf.clear()
+        self._buf_bytes = 0
+        self._f.write(data)
+        self._f.flush()
+        n = len(data.encode("utf-8"))
+        self._size += n
+        self.bytes_written += n
+
+    def rotate(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            day = (self._day or datetime.fromtimestamp(self.clock()).date()).isoformat()
+            n = 1
+            while glob.glob(f"{self.path}.{day}.{n}*"):
+                n += 1
+            target = f"{self.path}.{day}.{n}"
+            os.replace(self.path, target)
+            if self.compress:
+                with open(target, "rb") as src, gzip.open(target + ".gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(target)
+        self._day = datetime.fromtimestamp(self.clock()).date()
+        self._open()
+
+    def close(self):
+        self.flush()
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+def rotated_files(path: str) -> list:
+    """Rotated segments of `path`, oldest first (date, then sequence number)."""
+    def order(p):
+        parts = os.path.basename(p)[len(os.path.basename(path)) + 1:].split(".")
+        return parts[0], int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+
+    return sorted(glob.glob(f"{glob.escape(path)}.????-??-??.*"), key=order)
+
+
+def _open_text(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+# ----------------------------
+# FAULT EVENT LOG (TEXT + JSONL)
+# ----------------------------
+def format_text_line(entry: dict) -> str:
+    """Legacy fault_log.txt line (pipe-delimited)."""
+    return (
+        f"{entry.get('timestamp')} | "
+        f"{entry.get('fault')} ({entry.get('severity')}) | "
+        f"{entry.get('result')} | "
+        f"{entry.get('escalation')} | "
+        f"{entry.get('resolution')} | "
+        f"Time: {entry.get('repair_time_min', 'N/A')} min\n"
+    )
+
+
+# One encoder for every line (json.dumps with options builds a new one per call)
+_encode_json = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str).encode
+
+
+class EventLog:
+    """
+    Fault events to the legacy text log and/or a JSONL log (one event dict per
+    line, same keys as build_event_entry), each through its own buffered writer.
+    Entries may be dicts or records.FaultEvent.
+    """
+
+    def __init__(self, text_path: str | None, jsonl_path: str | None, **writer_options):
+        self.text_path = text_path
+        self.jsonl_path = jsonl_path
+        self.text = RotatingBufferedWriter(text_path, **writer_options) if text_path else None
+        self.jsonl = RotatingBufferedWriter(jsonl_path, **writer_options) if jsonl_path else None
+
+    def log(self, entry: dict):
+        if self.text is not None:
+            self.text.write(format_text_line(entry))
+        if self.jsonl is not None:
+            if not isinstance(entry, dict):
+                entry = entry.as_dict()   # records.FaultEvent
+            self.jsonl.write(_encode_json(entry) + "\n")
+
+    @property
+    def bytes_written(self) -> int:
+        return sum(w.bytes_written for w in (self.text, self.jsonl) if w is not None)
+
+    def flush(self):
+        for w in (self.text, self.jsonl):
+            if w is not None:
+                w.flush()
+
+    def close(self):
+        for w in (self.text, self.jsonl):
+            if w is not None:
+                w.close()
+
+
+# ----------------------------
+# STREAMING CSV (FAULT HISTORY)
+# ----------------------------
+class CsvStream:
+    """
+    CSV rows appended as they happen through one open handle:
+    - flushed to the OS every flush_rows rows or flush_sec seconds, so a hard
+      crash loses at most that window
+    - a path is truncated (fresh header) the first time this process opens it,
+      then appended to after close()/reopen
+    """
+
+    _started = set()   # paths already truncated by this process
+
+    def __init__(self, path: str, header: list, flush_rows: int = 50, flush_sec: float = 1.0):
+        self.path = path
+        self.header = list(header)
+        self.flush_rows = flush_rows
+        self.flush_sec = flush_sec
+        self.rows_written = 0
+        self.bytes_written = 0
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+        fresh = os.path.abspath(path) not in CsvStream._started or not os.path.exists(path)
+        CsvStream._started.add(os.path.abspath(path))
+        self._f = open(path, "w" if fresh else "a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._f)
+        self._pos = self._f.tell()
+        if fresh:
+            self._writer.writerow(self.header)
+            self.flush()
+
+    def writerow(self, row: list):
+        self._writer.writerow(row)
+        self.rows_written += 1
+        self._pending += 1
+        if self._pending >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_sec:
+            self.flush()
+
+    def flush(self):
+        self._f.flush()
+        pos = self._f.tell()
+        self.bytes_written += pos - self._pos
+        self._pos = pos
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if self._f is not None:
+            self.flush()
+            self._f.close()
+            self._f = None
+
+
+def iter_jsonl_events(path: str):
+    """Events from a JSONL log, rotated (.gz) segments first; skips a torn last line."""
+    for p in rotated_files(path) + ([path] if os.path.exists(path) else []):
+        with _open_text(p) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
@@ -0,0 +1,78 @@
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# ----------------------------
+# ADVISORY FILE LOCK
+# ----------------------------
+class FileLock:
+    """
+    Cross-process advisory lock on a sidecar file (e.g. "wo_counter.txt.lock").
+    - fcntl.flock on POSIX, msvcrt.locking on Windows
+    - polls up to timeout seconds, then raises TimeoutError
+    Usage: with FileLock(path): ...
+    """
+
+    def __init__(self, path: str, timeout: float = 10.0, poll: float = 0.005):
+        self.path = path
+        self.timeout = timeout
+        self.poll = poll
+        self._fh = None
+
+    def _try_lock(self, fd: int):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+    def _unlock(self, fd: int):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    def acquire(self):
+        fh = open(self.path, "a+")
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._try_lock(fh.fileno())
+                self._fh = fh
+                return self
+            except OSError:
+                if time.monotonic() >= deadline:
+                    fh.close()
+                    raise TimeoutError(f"Timed out waiting for lock on {self.path}")
+                time.sleep(self.poll)
+
+    def release(self):
+        if self._fh is not None:
+            try:
+                self._unlock(self._fh.fileno())
+            finally:
+                self._fh.close()
+                self._fh = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def write_atomic(path: str, text: str):
+    """Write to a temp file in the same directory, fsync, then os.replace over path."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
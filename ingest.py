@@ -0,0 +1,532 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import app
+import engine
+from metrics import METRICS, StageStats, format_metrics_table
+
+
+# ----------------------------
+# CONFIG
+# ----------------------------
+INGEST_QUEUE_SIZE = 1000        # parsed events waiting for a technician; a full queue stops the sources reading
+INGEST_WORKERS = 16             # async technician workers
+INGEST_BATCH_MAX = 256          # events persisted per call on the I/O thread
+INGEST_TAIL_POLL_SEC = 0.2      # tailed file: wait this long at EOF before reading again
+INGEST_READ_CHUNK = 256 * 1024  # tailed file: bytes per executor read
+INGEST_STATS_SEC = 5.0          # progress line interval (0 = off)
+
+
+# ----------------------------
+# EVENT PARSING
+# ----------------------------
+_SEVERITIES = {f["name"]: set(f["severities"]) for f in app.FAULTS}
+
+
+def parse_fault_event(line):
+    """
+    (fault, severity) from one line, or None if it is not a known fault:
+    - JSON object: {"fault": "Motor Overload", "severity": "Critical", ...}
+      ("Fault" / "Severity" keys work too; other keys are ignored)
+    - plain text:  Motor Overload|Critical
+    The severity must be one the fault can have (app.FAULTS).
+    """
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", "replace")
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(rec, dict):
+            return None
+        fault = rec.get("fault", rec.get("Fault"))
+        severity = rec.get("severity", rec.get("Severity"))
+    else:
+        fault, _, severity = line.partition("|")
+    if not isinstance(fault, str) or not isinstance(severity, str):
+        return None
+    fault, severity = fault.strip(), severity.strip().capitalize()
+    if severity not in _SEVERITIES.get(fault, ()):
+        return None
+    return fault, severity
+
+
+# ----------------------------
+# INGESTION SERVICE
+# ----------------------------
+class IngestService:
+    """
+    Live fault ingestion in front of the same fault cycle as engine.py:
+    - sources (TCP / Unix socket connections, tailed JSONL files) parse each
+      line and put (fault, severity) on a bounded asyncio.Queue; when it is
+      full the source awaits, so a socket is no longer read (TCP flow
+      control then slows the sender) and a tailed file waits where it is
+    - `workers` technician coroutines take events off the queue and resolve
+      them (handle_fault + scoring via engine.HeadlessRun.resolve) on the
+      event loop; repair_time_scale > 0 also keeps the technician busy for
+      repair minutes * scale wall seconds
+    - everything that blocks on files (fault log, work orders, fault history,
+      SLA scan, closing the stores) runs on one dedicated I/O thread, a batch
+      of events per call, so the loop never waits on disk and app's stores
+      keep a single writer thread
+    - end-to-end latency runs from the moment a line is read to the moment
+      its batch is written (or resolved, without persist)
+    - stream_history=False keeps events out of fault_history.csv (load tests;
+      opening the stream starts a fresh file)
+    """
+
+    def __init__(
+        self,
+        run: engine.HeadlessRun,
+        workers: int = INGEST_WORKERS,
+        queue_size: int = INGEST_QUEUE_SIZE,
+        batch_max: int = INGEST_BATCH_MAX,
+        repair_time_scale: float = 0.0,
+        scan_interval_sec: float = app.SLA_PERSIST_INTERVAL_SEC,
+        max_events: int | None = None,
+        stream_history: bool = True,
+    ):
+        self.run = run
+        self.workers = max(int(workers), 1)
+        self.queue_size = queue_size
+        self.batch_max = max(int(batch_max), 1)
+        self.repair_time_scale = repair_time_scale
+        self.scan_interval_sec = scan_interval_sec
+        self.max_events = max_events
+        self.stream_history = stream_history
+
+        self.received = 0
+        self.rejected = 0
+        self.processed = 0
+        self.backpressure_waits = 0   # puts that found the queue full
+        self.max_depth = 0
+        self.batches = 0
+        self.persist_errors = 0
+        self.resolve_errors = 0       # events whose run.resolve() raised
+        self.latency = StageStats(4096)
+        self.started = None
+        self.elapsed_sec = 0.0
+
+        self.queue = None
+        self._pending = None          # (entry, future) waiting for the I/O thread
+        self._stop = None
+        self._tasks = []
+        self._servers = []
+        self._conns = set()           # open socket connections (closed on shutdown)
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-io")
+
+    # ---------- sources ----------
+    async def submit_line(self, line):
+        received = time.perf_counter()
+        event = parse_fault_event(line)
+        if event is None:
+            self.rejected += 1
+            METRICS.incr("ingest_rejected")
+            return
+        self.received += 1
+        if self.queue.full():
+            self.backpressure_waits += 1
+        await self.queue.put((event[0], event[1], received))
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    async def _read_stream(self, reader, writer):
+        self._conns.add(writer)
+        try:
+            while not self._stop.is_set():
+                try:
+                    line = await reader.readline()
+                except ValueError:   # line longer than the stream limit
+                    self.rejected += 1
+                    continue
+                if not line:
+                    break
+                await self.submit_line(line)
+        finally:
+            self._conns.discard(writer)
+            writer.close()
+
+    async def listen_tcp(self, host: str, port: int):
+        server = await asyncio.start_server(self._read_stream, host, port)
+        self._servers.append(server)
+        return server
+
+    async def listen_unix(self, path: str):
+        if not hasattr(asyncio, "start_unix_server"):
+            raise OSError("Unix sockets are not supported on this platform")
+        if os.path.exists(path):
+            os.unlink(path)   # stale socket from an earlier run
+        server = await asyncio.start_unix_server(self._read_stream, path)
+        self._servers.append(server)
+        return server
+
+    def tail(self, path: str, from_start: bool = False, poll_sec: float = INGEST_TAIL_POLL_SEC):
+        self._tasks.append(asyncio.create_task(self._tail(path, from_start, poll_sec)))
+
+    async def _tail(self, path: str, from_start: bool, poll_sec: float):
+        """Follows a JSONL file like tail -F: reads run in the default executor; truncation / rotation restart at 0."""
+        loop = asyncio.get_running_loop()
+        state = {"f": None, "ino": None, "pos": None, "partial": b""}
+
+        def read_chunk():
+            try:
+                st = os.stat(path)
+            except OSError:
+                return []
+            f = state["f"]
+            if f is None or st.st_ino != state["ino"] or st.st_size < state["pos"]:
+                # First open starts at the end (unless from_start); a new or truncated file from 0
+                first = state["pos"] is None
+                if f is not None:
+                    f.close()
+                f = state["f"] = open(path, "rb")
+                state["ino"] = st.st_ino
+                state["pos"] = st.st_size if first and not from_start else 0
+                state["partial"] = b""
+                f.seek(state["pos"])
+            data = f.read(INGEST_READ_CHUNK)
+            if not data:
+                return []
+            state["pos"] += len(data)
+            data = state["partial"] + data
+            lines = data.split(b"\n")
+            state["partial"] = lines.pop()   # incomplete last line: wait for the rest
+            return lines
+
+        try:
+            while not self._stop.is_set():
+                lines = await loop.run_in_executor(None, read_chunk)
+                if not lines:
+                    await asyncio.sleep(poll_sec)
+                    continue
+                for line in lines:
+                    await self.submit_line(line)
+        finally:
+            if state["f"] is not None:
+                state["f"].close()
+
+    # ---------- technicians ----------
+    def _done(self, received: float):
+        latency = time.perf_counter() - received
+        self.latency.observe(latency)
+        METRICS.observe("ingest_latency", latency)
+        self.processed += 1
+        self._check_limit()
+
+    def _check_limit(self):
+        if self.max_events is not None and self.processed + self.resolve_errors >= self.max_events:
+            self._stop.set()
+
+    async def _worker(self):
+        while True:
+            fault, severity, received = await self.queue.get()
+            try:
+                try:
+                    entry, time_taken, *_ = self.run.resolve(fault, severity)
+                except Exception as exc:
+                    # Drop the event, keep the worker: a dead worker stalls the
+                    # queue and shutdown's queue.join() with it
+                    self.resolve_errors += 1
+                    METRICS.incr("ingest_resolve_errors")
+                    print(f"[ingest] resolving {fault} / {severity} failed: {exc!r}", flush=True)
+                    self._check_limit()
+                    continue
+                if self.repair_time_scale:
+                    await asyncio.sleep(time_taken * self.repair_time_scale)
+                if entry is not None:
+                    # The technician waits for its batch: a slow disk holds the
+                    # workers, the queue fills and the sources stop reading
+                    written = asyncio.get_running_loop().create_future()
+                    self._pending.put_nowait((entry, written))
+                    await written
+                self._done(received)
+            finally:
+                self.queue.task_done()
+
+    # ---------- persistence (I/O thread) ----------
+    def _persist(self, entries: list):
+        # One store lock + catch-up for the whole batch instead of one per work order
+        with METRICS.stage("ingest_persist"), app.work_order_store_batch():
+            for entry in entries:
+                app.write_text_log(entry)
+                entry["work_order_file"] = app.generate_work_order(entry, interactive=False)
+                app.record_fault_event(entry, stream_csv=self.stream_history)
+
+    async def _writer(self):
+        # Each worker has at most one entry pending, so this queue needs no bound
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._pending.get()]
+            while len(batch) < self.batch_max and not self._pending.empty():
+                batch.append(self._pending.get_nowait())
+            try:
+                await loop.run_in_executor(self._io, self._persist, [entry for entry, _ in batch])
+            except Exception as exc:
+                self.persist_errors += len(batch)
+                print(f"[ingest] persisting {len(batch)} events failed: {exc!r}", flush=True)
+            for _entry, written in batch:
+                written.set_result(None)
+            self.batches += 1
+
+    def _scan(self, flags: dict):
+        app.sla_breach_escalation_scan(flags)
+        return flags
+
+    async def sla_scan(self):
+        """SLA scan on the I/O thread, over a copy of status_flags merged back on the loop."""
+        if not self.run.persist:
+            return
+        flags = self.run.status_flags
+        seen = (flags["escalations"], flags["critical_wrong"])
+        result = await asyncio.get_running_loop().run_in_executor(self._io, self._scan, dict(flags))
+        for key in ("sla_breaches", "high_sla_breaches", "next_breach_min"):
+            flags[key] = result.get(key)
+        self.run.sla_breaches_total += result["sla_breaches"]
+        self.run.high_sla_breaches_total += result["high_sla_breaches"]
+        # Its site status is only current if no escalation happened meanwhile
+        if (flags["escalations"], flags["critical_wrong"]) == seen:
+            flags["site_status"] = result["site_status"]
+
+    async def _scanner(self):
+        while True:
+            await asyncio.sleep(self.scan_interval_sec)
+            await self.sla_scan()
+
+    async def _reporter(self, every_sec: float):
+        last, last_n = time.perf_counter(), 0
+        while True:
+            await asyncio.sleep(every_sec)
+            now = time.perf_counter()
+            p95 = self.latency.snapshot()["p95_sec"]
+            print(
+                f"[ingest] {self.processed} processed  {(self.processed - last_n) / (now - last):,.0f}/s  "
+                f"queue {self.queue.qsize()}/{self.queue_size}  rejected {self.rejected}  "
+                f"p95 {'-' if p95 is None else f'{p95 * 1000:.2f}'} ms",
+                flush=True,
+            )
+            last, last_n = now, self.processed
+
+    # ---------- lifecycle ----------
+    async def start(self, stats_sec: float = 0.0):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._pending = asyncio.Queue()
+        self._stop = asyncio.Event()
+        self.started = time.perf_counter()
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._writer()))
+        if self.run.persist and self.scan_interval_sec:
+            self._tasks.append(asyncio.create_task(self._scanner()))
+        if stats_sec:
+            self._tasks.append(asyncio.create_task(self._reporter(stats_sec)))
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+
+    async def wait(self, duration: float | None = None):
+        try:
+            await asyncio.wait_for(self._stop.wait(), duration)
+        except asyncio.TimeoutError:
+            pass
+
+    async def shutdown(self):
+        """Stops reading, finishes every queued event, runs a last SLA scan and closes the files."""
+        self._stop.set()
+        for server in self._servers:
+            server.close()
+        for writer in list(self._conns):
+            writer.close()
+        for server in self._servers:
+            await server.wait_closed()
+        await self.queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.elapsed_sec = time.perf_counter() - self.started
+        await self.sla_scan()
+        if self.run.persist:
+            await asyncio.get_running_loop().run_in_executor(self._io, _close_files)
+        self._io.shutdown(wait=True)
+
+    def summary(self) -> dict:
+        lat = self.latency.snapshot()
+
+        def ms(v):
+            return round(v * 1000, 3) if v is not None else None
+
+        out = self.run.summary()
+        out.update({
+            "received": self.received,
+            "rejected": self.rejected,
+            "processed": self.processed,
+            "elapsed_sec": round(self.elapsed_sec, 6),
+            "events_per_sec": round(self.processed / self.elapsed_sec, 1) if self.elapsed_sec > 0 else 0.0,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "max_queue_depth": self.max_depth,
+            "backpressure_waits": self.backpressure_waits,
+            "persist_batches": self.batches,
+            "persist_errors": self.persist_errors,
+            "resolve_errors": self.resolve_errors,
+            "latency_ms": {"p50": ms(lat["p50_sec"]), "p95": ms(lat["p95_sec"]),
+                           "p99": ms(lat["p99_sec"]), "max": ms(lat["max_sec"])},
+        })
+        return out
+
+
+def _close_files():
+    app.close_event_log()
+    app.close_history_stream()
+    app.close_work_order_docs()
+    app.close_work_order_store()
+    app.release_work_order_ids()
+
+
+# ----------------------------
+# LOOPBACK LOAD TEST
+# ----------------------------
+async def send_events(host: str, port: int, n: int, seed: int | None = None, rate: float | None = None):
+    """
+    Writes n random JSON fault events to a TCP source: as fast as its
+    backpressure allows, or paced at `rate` events/sec (in 10 ms slices).
+    """
+    rng = random.Random(seed)
+    chunk = max(int(rate / 100), 1) if rate else 1000
+    _reader, writer = await asyncio.open_connection(host, port)
+    started = time.perf_counter()
+    for start in range(0, n, chunk):
+        if rate:
+            await asyncio.sleep(max(started + start / rate - time.perf_counter(), 0))
+        lines = []
+        for _ in range(min(chunk, n - start)):
+            fault, severity = app.simulate_fault(rng)
+            lines.append(json.dumps({"fault": fault, "severity": severity}))
+        writer.write(("\n".join(lines) + "\n").encode("utf-8"))
+        await writer.drain()
+    writer.close()
+    await writer.wait_closed()
+
+
+# ----------------------------
+# CLI
+# ----------------------------
+def print_ingest_summary(s: dict):
+    print("LIVE INGESTION SUMMARY")
+    print("=" * 60)
+    print(f"Processed: {s['processed']}  ({s['events_per_sec']:,} events/sec, {s['elapsed_sec']}s)")
+    print(f"Received: {s['received']}  Rejected lines: {s['rejected']}  Failed events: {s['resolve_errors']}")
+    print(f"Workers: {s['workers']}  Queue: max depth {s['max_queue_depth']}/{s['queue_size']}  "
+          f"backpressure waits {s['backpressure_waits']}")
+    lat = s["latency_ms"]
+    print(f"End-to-end latency (ms): p50 {lat['p50']}  p95 {lat['p95']}  p99 {lat['p99']}  max {lat['max']}")
+    print("-" * 60)
+    engine.print_summary(s)
+
+
+async def _serve(args) -> dict:
+    policy = engine.make_policy(args.policy, random.Random(args.seed))
+    run = engine.HeadlessRun(policy, rng=random.Random(args.seed), persist=args.persist, stop_on_stop_work=False)
+    service = IngestService(
+        run,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        batch_max=args.batch_max,
+        repair_time_scale=args.repair_time_scale,
+        scan_interval_sec=args.scan_interval_sec,
+        max_events=args.bench or args.max_events,
+        stream_history=not args.bench,   # keep fault_history.csv for real alarm streams
+    )
+    await service.start(stats_sec=args.stats_every)
+
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, service.stop)
+    except (NotImplementedError, AttributeError, ValueError):
+        pass   # Windows / not the main thread
+
+    sender = None
+    try:
+        if args.bench:
+            server = await service.listen_tcp("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            sender = asyncio.create_task(send_events("127.0.0.1", port, args.bench, args.seed, args.rate))
+        if args.tcp:
+            host, _, port = args.tcp.rpartition(":")
+            server = await service.listen_tcp(host or "127.0.0.1", int(port))
+            print(f"Listening on tcp {server.sockets[0].getsockname()[:2]}", flush=True)
+        if args.unix:
+            await service.listen_unix(args.unix)
+            print(f"Listening on unix {args.unix}", flush=True)
+        for path in args.tail or []:
+            service.tail(path, from_start=args.from_start)
+            print(f"Tailing {path}", flush=True)
+        await service.wait(args.duration)
+    except asyncio.CancelledError:
+        pass   # Ctrl-C: finish what is queued and print the summary
+    finally:
+        await service.shutdown()
+        if sender is not None:
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
+    return service.summary()
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Live fault ingestion: socket / tailed JSONL alarms -> technician workers -> work orders.")
+    src = p.add_argument_group("sources")
+    src.add_argument("--tcp", default=None, metavar="[HOST:]PORT", help="accept newline-delimited events over TCP")
+    src.add_argument("--unix", default=None, metavar="PATH", help="accept events on a Unix socket")
+    src.add_argument("--tail", action="append", metavar="FILE", help="follow a JSONL file (repeatable)")
+    src.add_argument("--from-start", action="store_true", help="tailed files: read existing lines first")
+    src.add_argument("--bench", type=int, default=None, metavar="N",
+                     help="loopback load test: send N events over TCP, report throughput + latency, exit")
+    src.add_argument("--rate", type=float, default=None, help="--bench: events/sec to send (default: as fast as accepted)")
+
+    p.add_argument("--policy", default="correct", help='technician policy: correct | random:<p> | history[:csv]')
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--persist", action="store_true", help="write fault log, fault history + work orders")
+    p.add_argument("--workers", type=int, default=INGEST_WORKERS, help="async technician workers")
+    p.add_argument("--queue-size", type=int, default=INGEST_QUEUE_SIZE, help="bounded event queue (backpressure)")
+    p.add_argument("--batch-max", type=int, default=INGEST_BATCH_MAX, help="events per persistence batch")
+    p.add_argument("--repair-time-scale", type=float, default=0.0,
+                   help="wall seconds a technician stays busy per repair minute (0 = not at all)")
+    p.add_argument("--scan-interval-sec", type=float, default=app.SLA_PERSIST_INTERVAL_SEC,
+                   help="SLA scan interval while persisting")
+    p.add_argument("--max-events", type=int, default=None, help="stop after N events (processed or failed)")
+    p.add_argument("--duration", type=float, default=None, help="stop after N seconds")
+    p.add_argument("--stats-every", type=float, default=INGEST_STATS_SEC, help="progress line interval (0 = off)")
+    p.add_argument("--metrics", action="store_true",
+                   help=f"time hot paths; write {app.METRICS_PROM} + {app.METRICS_JSON} and print per-stage latency")
+    args = p.parse_args(argv)
+    if not (args.tcp or args.unix or args.tail or args.bench):
+        p.error("give at least one source: --tcp, --unix, --tail or --bench")
+    if args.metrics:
+        METRICS.enable()
+
+    try:
+        summary = asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        return
+    print_ingest_summary(summary)
+
+    if METRICS.enabled:
+        app.export_metrics()
+        print("\nHOT-PATH METRICS")
+        for line in format_metrics_table(METRICS.snapshot()):
+            print(line)
+        print(f"Metrics written to {app.METRICS_PROM} / {app.METRICS_JSON}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import json
+import os
+import random
+import time
+from functools import wraps
+
+
+# ----------------------------
+# HOT-PATH METRICS
+# ----------------------------
+class _NullStage:
+    # Shared no-op stage handed out while metrics are disabled
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_bytes(self, n: int, direction: str = "write"):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics, name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+    def add_bytes(self, n: int, direction: str = "write"):
+        self.metrics.add_bytes(self.name, n, direction)
+
+
+class StageStats:
+    """
+    Latency and I/O of one stage:
+    - count / sum / max of every call
+    - a fixed-size reservoir sample of latencies for p50 / p95 / p99
+      (memory stays bounded however long the run is)
+    - bytes read / written
+    """
+
+    __slots__ = ("count", "total_sec", "max_sec", "samples", "bytes_read", "bytes_written", "_rng", "_size")
+
+    def __init__(self, reservoir: int, seed: int = 0):
+        self.count = 0
+        self.total_sec = 0.0
+        self.max_sec = 0.0
+        self.samples = []
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self._rng = random.Random(seed)
+        self._size = reservoir
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total_sec += seconds
+        if seconds > self.max_sec:
+            self.max_sec = seconds
+        if len(self.samples) < self._size:
+            self.samples.append(seconds)
+        else:
+            j = self._rng.randrange(self.count)
+            if j < self._size:
+                self.samples[j] = seconds
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self.samples)
+
+        def pct(q):
+            return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else None
+
+        return {
+            "count": self.count,
+            "sum_sec": round(self.total_sec, 6),
+            "max_sec": round(self.max_sec, 6),
+            "p50_sec": pct(0.50),
+            "p95_sec": pct(0.95),
+            "p99_sec": pct(0.99),
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+        }
+
+
+class Metrics:
+    """
+    Timers and counters for the simulator's hot paths.
+
+    Disabled (the default) every entry point is one attribute check:
+    stage() returns a shared no-op context, timed() wrappers call straight
+    through and incr()/add_bytes() return at once. Enabled, each stage keeps
+    StageStats and counters are plain ints.
+    """
+
+    QUANTILES = (0.50, 0.95, 0.99)
+    clock = staticmethod(time.perf_counter)
+
+    def __init__(self, enabled: bool = False, reservoir: int = 2048):
+        self.enabled = enabled
+        self.reservoir = reservoir
+        self.stages = {}
+        self.counters = {}
+        self.started = time.time()
+
+    def enable(self, on: bool = True):
+        self.enabled = on
+        return self
+
+    def reset(self):
+        self.stages.clear()
+        self.counters.clear()
+        self.started = time.time()
+
+    def _stats(self, name: str) -> StageStats:
+        s = self.stages.get(name)
+        if s is None:
+            s = self.stages[name] = StageStats(self.reservoir, seed=len(self.stages))
+        return s
+
+    # ---------- recording ----------
+    def stage(self, name: str):
+        """`with metrics.stage("csv_read") as st: ...; st.add_bytes(n, "read")`"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def observe(self, name: str, seconds: float):
+        if self.enabled:
+            self._stats(name).observe(seconds)
+
+    def add_bytes(self, name: str, n: int, direction: str = "write"):
+        if not self.enabled or not n:
+            return
+        s = self._stats(name)
+        if direction == "read":
+            s.bytes_read += n
+        else:
+            s.bytes_written += n
+
+    def incr(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def timed(self, name: str):
+        """Decorator: times each call of the function as stage `name`."""
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self._stats(name).observe(time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    # ---------- export ----------
+    def snapshot(self) -> dict:
+        return {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "uptime_sec": round(time.time() - self.started, 3),
+            "stages": {name: s.snapshot() for name, s in sorted(self.stages.items())},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def prometheus_text(self, prefix: str = "fsd") -> str:
+        """Prometheus text exposition format (stage latency as a summary)."""
+        out = []
+        add = out.append
+        stages = sorted(self.stages.items())
+
+        add(f"# HELP {prefix}_stage_seconds Wall time per call of each instrumented stage.")
+        add(f"# TYPE {prefix}_stage_seconds summary")
+        for name, s in stages:
+            snap = s.snapshot()
+            for q in self.QUANTILES:
+                v = snap[f"p{int(q * 100)}_sec"]
+                if v is not None:
+                    add(f'{prefix}_stage_seconds{{stage="{name}",quantile="{q}"}} {v:.9f}')
+            add(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {s.total_sec:.9f}')
+            add(f'{prefix}_stage_seconds_count{{stage="{name}"}} {s.count}')
+
+        add(f"# HELP {prefix}_stage_io_bytes_total Bytes read or written by each stage.")
+        add(f"# TYPE {prefix}_stage_io_bytes_total counter")
+        for name, s in stages:
+            add(f'{prefix}_stage_io_bytes_total{{stage="{name}",direction="read"}} {s.bytes_read}')
+            add(f'{prefix}_stage_io_bytes_total{{stage="{name}",direction="write"}} {s.bytes_written}')
+
+        if self.counters:
+            add(f"# HELP {prefix}_events_total Event counters.")
+            add(f"# TYPE {prefix}_events_total counter")
+            for name, v in sorted(self.counters.items()):
+                add(f'{prefix}_events_total{{name="{name}"}} {v}')
+        return "\n".join(out) + "\n"
+
+    def export(self, prom_path: str | None = None, json_path: str | None = None):
+        """Writes the Prometheus text file and/or JSON snapshot (temp file + os.replace)."""
+        if prom_path:
+            _write_atomic(prom_path, self.prometheus_text())
+        if json_path:
+            _write_atomic(json_path, json.dumps(self.snapshot(), indent=2) + "\n")
+
+
+def _write_atomic(path: str, text: str):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+# Process-wide instance used by app / engine / dashboard
+METRICS = Metrics(enabled=os.environ.get("FSD_METRICS", "").strip().lower() in ("1", "true", "yes", "on"))
+
+
+def format_metrics_table(snapshot: dict) -> list:
+    """Lines of a per-stage table (calls, p50/p95/p99 ms, bytes) for reports."""
+    def ms(v):
+        return f"{v * 1000:.3f}" if v is not None else "-"
+
+    lines = [f"{'STAGE':<20} {'CALLS':>9} {'P50 MS':>9} {'P95 MS':>9} {'P99 MS':>9} {'READ B':>12} {'WRITTEN B':>12}"]
+    for name, s in snapshot["stages"].items():
+        lines.append(
+            f"{name:<20} {s['count']:>9} {ms(s['p50_sec']):>9} {ms(s['p95_sec']):>9} {ms(s['p99_sec']):>9} "
+            f"{s['bytes_read']:>12,} {s['bytes_written']:>12,}"
+        )
+    return lines
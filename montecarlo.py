@@ -0,0 +1,317 @@
+import argparse
+import json
+import math
+import time
+
+import app
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency: pip install numpy
+    np = None
+
+
+# ----------------------------
+# VECTORIZED MONTE CARLO (NUMPY)
+# ----------------------------
+# Same shift model as engine.DiscreteEventRun with persist=True, drawn for
+# whole batches of replications at once ([replications x faults] arrays):
+# - Poisson arrivals (mean gap arrival_mean_min) from shift start, for shift_hours
+# - One technician works faults in arrival order (Lindley recursion via cumsum/max.accumulate)
+# - Fault type ~ fault_weights (uniform = simulate_fault), severity uniform per fault
+# - Correct with probability `accuracy`; repair minutes from repair_time_minutes()
+# - INCORRECT => escalation + work order; follow-up crew closes it after an
+#   exponential delay (followup_mean_min); the SLA scan (every scan_interval_min)
+#   breaches it if still open once AGE > SLA
+# - STOP WORK: critical_wrong reaches its threshold, or one scan finds
+#   stop_work_high_breaches HIGH breaches; the run stops there (stop_on_stop_work)
+SEVERITIES = ["Minor", "Major", "Critical"]
+PRIORITIES = ["HIGH", "MEDIUM", "LOW"]      # index == app.priority_rank()
+SITE_STATUSES = ["NORMAL", "WATCH", "STOP WORK"]
+
+
+def default_params() -> dict:
+    """Parameters as the app is currently configured (tables built from app's own helpers)."""
+    return {
+        "shift_hours": 8.0,
+        "arrival_mean_min": 20.0,
+        "followup_mean_min": 30.0,
+        "scan_interval_min": 1.0,
+        "accuracy": 0.85,              # float, or {fault name: p}
+        "fault_weights": app.FAULT_WEIGHTS,   # {fault name: weight}; None = uniform
+        "sla_minutes": {p: app.priority_to_sla_minutes(p) for p in PRIORITIES},
+        "repair_minutes": {
+            "correct": {s: app.repair_time_minutes(s, True) for s in SEVERITIES},
+            "incorrect": {s: app.repair_time_minutes(s, False) for s in SEVERITIES},
+        },
+        "stop_work_critical_wrong": app.STOP_WORK_CRITICAL_WRONG,
+        "watch_escalations": app.WATCH_ESCALATIONS,
+        "stop_work_high_breaches": app.STOP_WORK_HIGH_SLA_BREACHES,
+        "stop_on_stop_work": True,
+    }
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Monte Carlo mode needs NumPy: pip install numpy")
+
+
+def _tables(p: dict) -> dict:
+    names = [f["name"] for f in app.FAULTS]
+    sev_code = {s: i for i, s in enumerate(SEVERITIES)}
+
+    n_sev = np.array([len(f["severities"]) for f in app.FAULTS], dtype=np.int64)
+    sev_table = np.zeros((len(names), len(SEVERITIES)), dtype=np.int8)
+    for i, f in enumerate(app.FAULTS):
+        for j, s in enumerate(f["severities"]):
+            sev_table[i, j] = sev_code[s]
+
+    weights = p.get("fault_weights") or {}
+    w = np.array([float(weights.get(n, 1.0)) for n in names])
+    if w.sum() <= 0:
+        raise ValueError("fault_weights must have a positive total")
+
+    acc = p["accuracy"]
+    acc_by_fault = np.array([float(acc.get(n, 0.0)) if isinstance(acc, dict) else float(acc) for n in names])
+
+    pr_by_sev = np.array([app.priority_rank(app.severity_to_priority(s)) for s in SEVERITIES], dtype=np.int8)
+    sla_by_pr = np.array([int(p["sla_minutes"][pr]) for pr in PRIORITIES], dtype=np.float64)
+    rep = p["repair_minutes"]
+    return {
+        "names": names,
+        "n_sev": n_sev,
+        "sev_table": sev_table,
+        "weights": w / w.sum(),
+        "uniform": bool(np.all(w == w[0])),
+        "acc_by_fault": acc_by_fault,
+        "pr_by_sev": pr_by_sev,
+        "sla_by_pr": sla_by_pr,
+        "repair_ok": np.array([rep["correct"][s] for s in SEVERITIES], dtype=np.float64),
+        "repair_bad": np.array([rep["incorrect"][s] for s in SEVERITIES], dtype=np.float64),
+    }
+
+
+def _first_time(mask, times):
+    """Earliest time per row where mask is set (inf if never)."""
+    return np.where(mask, times, np.inf).min(axis=1)
+
+
+def _simulate_chunk(rng, reps: int, n_max: int, p: dict, t: dict) -> dict:
+    horizon = p["shift_hours"] * 3600.0
+    n_faults = len(t["names"])
+    shape = (reps, n_max)
+
+    # Arrivals: first at t=0, then exponential gaps
+    arrival = np.zeros(shape)
+    np.cumsum(rng.exponential(p["arrival_mean_min"] * 60.0, (reps, n_max - 1)), axis=1, out=arrival[:, 1:])
+
+    # Fault type + severity (uniform among that fault's severities)
+    if t["uniform"]:
+        fault = rng.integers(0, n_faults, shape)
+    else:
+        fault = rng.choice(n_faults, size=shape, p=t["weights"])
+    sev_slot = (rng.random(shape) * t["n_sev"][fault]).astype(np.int64)
+    sev = t["sev_table"][fault, sev_slot]
+    critical = sev == SEVERITIES.index("Critical")
+
+    # Technician outcome -> repair minutes (repair_time_minutes table)
+    correct = rng.random(shape) < t["acc_by_fault"][fault]
+    repair = np.where(correct, t["repair_ok"][sev], t["repair_bad"][sev])
+    service = repair * 60.0
+
+    # Single technician, FIFO: end_i = max(arrival_i, end_{i-1}) + service_i
+    done = np.cumsum(service, axis=1)
+    end = done + np.maximum.accumulate(arrival - (done - service), axis=1)
+    start = end - service
+    started = start <= horizon
+
+    # Priority / SLA (severity_to_priority -> priority_to_sla_minutes)
+    pr = t["pr_by_sev"][sev]
+    sla = t["sla_by_pr"][pr]
+
+    # apply_escalation_rules: INCORRECT escalates; Critical + INCORRECT counts critical_wrong
+    incorrect = ~correct & started
+    crit_wrong = incorrect & critical
+    cw_cum = np.cumsum(crit_wrong, axis=1)
+    stop_cw = _first_time(crit_wrong & (cw_cum == p["stop_work_critical_wrong"]), start)
+
+    # SLA breach: work order still open at the first scan after its deadline
+    scan = max(p["scan_interval_min"], 1e-9) * 60.0
+    deadline = start + (sla + 1.0) * 60.0
+    detect = np.ceil(deadline / scan) * scan
+    closed = end + rng.exponential(p["followup_mean_min"] * 60.0, shape)
+    breach = incorrect & (closed > detect)
+
+    # STOP WORK from one scan with >= k HIGH breaches (before the safety stop)
+    k = int(p["stop_work_high_breaches"])
+    high_t = np.where(breach & (pr == 0) & (detect <= stop_cw[:, None]) & (detect <= horizon), detect, np.inf)
+    high_t.sort(axis=1)
+    if k <= 1:
+        stop_hb = high_t[:, 0]
+    elif k <= n_max:
+        same_scan = (high_t[:, : n_max - k + 1] == high_t[:, k - 1:]) & np.isfinite(high_t[:, k - 1:])
+        stop_hb = _first_time(same_scan, high_t[:, : n_max - k + 1])
+    else:
+        stop_hb = np.full(reps, np.inf)
+
+    stop_at = np.minimum(stop_cw, stop_hb)
+    stop_work = stop_at <= horizon
+    cutoff = np.minimum(stop_at, horizon) if p["stop_on_stop_work"] else np.full(reps, horizon)
+    valid = start <= cutoff[:, None]
+    breach &= valid & (detect <= cutoff[:, None])
+
+    faults = valid.sum(axis=1)
+    n_correct = (correct & valid).sum(axis=1)
+    n_incorrect = (incorrect & valid).sum(axis=1)
+    n_crit_wrong = (crit_wrong & valid).sum(axis=1)
+    waits = np.where(valid, start - arrival, 0.0).sum(axis=1)
+
+    # Final site status (status_flags["site_status"] at the cutoff), following
+    # apply_escalation_rules after every fault and sla_breach_escalation_scan,
+    # which recomputes it at every scan:
+    # - critical_wrong at its threshold => STOP WORK from then on
+    # - a scan with >= k HIGH breaches => STOP WORK while every later scan finds
+    #   a breach and no later fault sees escalations >= watch (that sets WATCH)
+    # - otherwise WATCH if the last scan found a breach or escalations >= watch
+    last_scan = np.floor(cutoff / scan + 1e-9)
+    breach_scan = np.where(breach, np.rint(detect / scan), np.inf)
+    breach_scan.sort(axis=1)
+    high_scan = np.where(breach & (pr == 0), np.rint(detect / scan), np.inf)
+    high_scan.sort(axis=1)
+    if k <= 1:
+        hb_scan = np.where(np.isfinite(high_scan), high_scan, -np.inf).max(axis=1)
+    elif k <= n_max:
+        same_scan = (high_scan[:, : n_max - k + 1] == high_scan[:, k - 1:]) & np.isfinite(high_scan[:, k - 1:])
+        hb_scan = np.where(same_scan, high_scan[:, : n_max - k + 1], -np.inf).max(axis=1)
+    else:
+        hb_scan = np.full(reps, -np.inf)
+    first_of_scan = np.ones(shape, dtype=bool)
+    first_of_scan[:, 1:] = breach_scan[:, 1:] != breach_scan[:, :-1]
+    scans_with_breach = (first_of_scan & (breach_scan >= hb_scan[:, None]) & np.isfinite(breach_scan)).sum(axis=1)
+    last_fault = np.where(valid, start, -np.inf).max(axis=1)
+    held = (
+        np.isfinite(hb_scan)
+        & (scans_with_breach == last_scan - hb_scan + 1)
+        & ((last_fault <= hb_scan * scan) | (n_incorrect < p["watch_escalations"]))
+    )
+    status = np.where((n_incorrect >= p["watch_escalations"]) | (breach_scan == last_scan[:, None]).any(axis=1), 1, 0)
+    status = np.where(held | (n_crit_wrong >= p["stop_work_critical_wrong"]), 2, status)
+
+    return {
+        "faults": faults,
+        "correct": n_correct,
+        "incorrect": n_incorrect,
+        "accuracy_pct": np.where(faults > 0, (n_correct * 100) // np.maximum(faults, 1), 0),
+        "escalations": n_incorrect,
+        "critical_wrong": n_crit_wrong,
+        "work_orders_high": (incorrect & valid & (pr == 0)).sum(axis=1),
+        "work_orders_medium": (incorrect & valid & (pr == 1)).sum(axis=1),
+        "work_orders_low": (incorrect & valid & (pr == 2)).sum(axis=1),
+        "sla_breaches": breach.sum(axis=1),
+        "high_sla_breaches": (breach & (pr == 0)).sum(axis=1),
+        "total_repair_time_min": np.where(valid, repair, 0.0).sum(axis=1),
+        "avg_wait_min": np.where(faults > 0, waits / np.maximum(faults, 1) / 60.0, 0.0),
+        "stop_work": stop_work,
+        "stop_work_hour": np.where(stop_work, stop_at / 3600.0, np.nan),
+        "site_status": status.astype(np.int8),
+        "_covered": arrival[:, -1] > horizon,
+    }
+
+
+def run_replications(replications: int, params: dict | None = None, seed=None, chunk_cells: int = 4_000_000) -> dict:
+    """
+    Simulates `replications` independent shifts.
+    Returns {metric: array[replications]}; site_status indexes SITE_STATUSES.
+    """
+    _require_numpy()
+    p = default_params()
+    p.update(params or {})
+    t = _tables(p)
+    rng = np.random.default_rng(seed)
+
+    # Enough arrival slots to cover the shift with overwhelming probability;
+    # a chunk that still runs short is redrawn with twice the slots
+    mean_n = p["shift_hours"] * 60.0 / p["arrival_mean_min"]
+    n_max = int(mean_n + 6 * math.sqrt(mean_n) + 10)
+    chunk = max(1, chunk_cells // n_max)
+
+    parts, done = [], 0
+    while done < replications:
+        reps = min(chunk, replications - done)
+        out = _simulate_chunk(rng, reps, n_max, p, t)
+        if not out.pop("_covered").all():
+            n_max *= 2
+            chunk = max(1, chunk_cells // n_max)
+            continue
+        parts.append(out)
+        done += reps
+    return {k: np.concatenate([part[k] for part in parts]) for k in parts[0]}
+
+
+def summarize(results: dict, z: float = 1.96) -> dict:
+    """Mean and normal-approximation CI per metric, plus STOP WORK / site status shares."""
+    _require_numpy()
+    n = len(results["faults"])
+    out = {"replications": n}
+    for key in (
+        "faults", "accuracy_pct", "escalations", "critical_wrong", "sla_breaches",
+        "high_sla_breaches", "total_repair_time_min", "avg_wait_min",
+    ):
+        v = results[key].astype(np.float64)
+        mean = float(v.mean()) if n else 0.0
+        half = float(z * v.std(ddof=1) / math.sqrt(n)) if n > 1 else 0.0
+        out[key] = {"mean": round(mean, 4), "ci_low": round(mean - half, 4), "ci_high": round(mean + half, 4)}
+    out["stop_work_share"] = round(float(results["stop_work"].mean()), 4) if n else 0.0
+    out["site_status_share"] = {
+        name: round(float((results["site_status"] == i).mean()), 4) if n else 0.0
+        for i, name in enumerate(SITE_STATUSES)
+    }
+    return out
+
+
+def print_mc_summary(s: dict):
+    print("MONTE CARLO SUMMARY")
+    print("=" * 60)
+    print(f"Replications: {s['replications']}")
+    for key in ("faults", "accuracy_pct", "escalations", "critical_wrong", "sla_breaches", "high_sla_breaches",
+                "avg_wait_min"):
+        m = s[key]
+        print(f"{key:<20} {m['mean']:>10.3f}   95% CI [{m['ci_low']:.3f}, {m['ci_high']:.3f}]")
+    print(f"STOP WORK share: {s['stop_work_share'] * 100:.2f}%")
+    print("Final site status: " + "  ".join(f"{k} {v * 100:.1f}%" for k, v in s["site_status_share"].items()))
+    print("=" * 60)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Vectorized Monte Carlo of shifts (SLA breaches, STOP WORK odds).")
+    p.add_argument("-r", "--replications", type=int, default=10000)
+    p.add_argument("--hours", type=float, default=8.0, help="shift length per replication")
+    p.add_argument("--accuracy", type=float, default=0.85)
+    p.add_argument("--arrival-mean-min", type=float, default=20.0)
+    p.add_argument("--followup-mean-min", type=float, default=30.0)
+    p.add_argument("--no-stop", action="store_true", help="keep running after STOP WORK")
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = p.parse_args(argv)
+
+    params = {
+        "shift_hours": args.hours,
+        "accuracy": args.accuracy,
+        "arrival_mean_min": args.arrival_mean_min,
+        "followup_mean_min": args.followup_mean_min,
+        "stop_on_stop_work": not args.no_stop,
+    }
+    started = time.perf_counter()
+    results = run_replications(args.replications, params, seed=args.seed)
+    summary = summarize(results)
+    summary["elapsed_sec"] = round(time.perf_counter() - started, 4)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_mc_summary(summary)
+        print(f"({summary['elapsed_sec']}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import bisect
+import heapq
+from itertools import chain, islice
+
+
+# ----------------------------
+# SUPERVISOR QUEUE PRIORITY INDEX
+# ----------------------------
+def _as_set(value, upper=True):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = [value]
+    return {str(v).strip().upper() if upper else v for v in value}
+
+
+class PriorityIndex:
+    """
+    Active work orders kept pre-sorted for the supervisor queue, updated by the
+    store's change listeners (upsert on append/update, remove on drop).
+
+    Entries live in small buckets keyed by (status, priority, fault); each
+    bucket is a sorted list of (sort_key, wo_id). OPEN / IN_PROGRESS entries
+    with an SLA deadline are also kept in deadline order, so a page as of `now`
+    shows the overdue ones as BREACHED without a rescan: the BREACHED group is
+    a merge of the BREACHED buckets and the k overdue entries, then come the
+    other buckets. offset+limit rows cost O((offset + limit) log B + k log k).
+    """
+
+    def __init__(self, sla_statuses=("OPEN", "IN_PROGRESS")):
+        self.sla_statuses = tuple(sla_statuses)
+        self._buckets = {}     # (STATUS, PRIORITY, Fault) -> sorted [(sort_key, wo_id)]
+        self._entries = {}     # wo_id -> (bucket_key, sort_key, deadline)
+        self._deadlines = []   # sorted [(deadline, wo_id)] of the SLA-status entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, wo_id: str):
+        return wo_id in self._entries
+
+    def upsert(self, wo_id: str, status: str, priority: str, fault: str, sort_key: tuple, deadline=None):
+        bucket_key = ((status or "").strip().upper(), (priority or "").strip().upper(), fault or "")
+        if bucket_key[0] not in self.sla_statuses:
+            deadline = None
+        current = self._entries.get(wo_id)
+        if current == (bucket_key, sort_key, deadline):
+            return
+        if current is not None:
+            self.remove(wo_id)
+        bisect.insort(self._buckets.setdefault(bucket_key, []), (sort_key, wo_id))
+        if deadline is not None:
+            bisect.insort(self._deadlines, (deadline, wo_id))
+        self._entries[wo_id] = (bucket_key, sort_key, deadline)
+
+    def remove(self, wo_id: str):
+        current = self._entries.pop(wo_id, None)
+        if current is None:
+            return
+        bucket_key, sort_key, deadline = current
+        bucket = self._buckets[bucket_key]
+        i = bisect.bisect_left(bucket, (sort_key, wo_id))
+        if i < len(bucket) and bucket[i][1] == wo_id:
+            del bucket[i]
+        if not bucket:
+            del self._buckets[bucket_key]
+        if deadline is not None:
+            i = bisect.bisect_left(self._deadlines, (deadline, wo_id))
+            if i < len(self._deadlines) and self._deadlines[i][1] == wo_id:
+                del self._deadlines[i]
+
+    def clear(self):
+        self._buckets.clear()
+        self._entries.clear()
+        self._deadlines.clear()
+
+    def page(self, now: float, offset: int = 0, limit: int = 15, priority=None, status=None, fault=None):
+        """
+        Returns ([(wo_id, shown_status)], total_matching) for rows [offset,
+        offset + limit) of the queue as of `now`. Filters match the shown
+        status, so an overdue OPEN order counts as BREACHED.
+        """
+        pr, st, fl = _as_set(priority), _as_set(status), _as_set(fault, upper=False)
+
+        def wanted(bucket_key, shown):
+            return (
+                (st is None or shown in st)
+                and (pr is None or bucket_key[1] in pr)
+                and (fl is None or bucket_key[2] in fl)
+            )
+
+        overdue_n = bisect.bisect_right(self._deadlines, now, key=lambda e: e[0])
+        overdue = {wo_id for _deadline, wo_id in self._deadlines[:overdue_n]}
+        late = []
+        for wo_id in overdue:
+            bucket_key, sort_key, _deadline = self._entries[wo_id]
+            if wanted(bucket_key, "BREACHED"):
+                late.append((sort_key, wo_id))
+        late.sort()
+
+        breached, waiting = [], []
+        for bucket_key, bucket in self._buckets.items():
+            if bucket_key[0] == "BREACHED":
+                if wanted(bucket_key, "BREACHED"):
+                    breached.append(bucket)
+            elif wanted(bucket_key, bucket_key[0]):
+                waiting.append(bucket)
+
+        waiting_overdue = sum(1 for wo_id in overdue if wanted(self._entries[wo_id][0], self._entries[wo_id][0][0]))
+        total = len(late) + sum(len(b) for b in breached) + sum(len(b) for b in waiting) - waiting_overdue
+
+        offset, limit = max(offset, 0), max(limit, 0)
+        ordered = chain(
+            ((wo_id, "BREACHED") for _key, wo_id in heapq.merge(late, *breached)),
+            ((wo_id, None) for _key, wo_id in heapq.merge(*waiting) if wo_id not in overdue),
+        )
+        page = []
+        for wo_id, shown in islice(ordered, offset, offset + limit):
+            page.append((wo_id, shown or self._entries[wo_id][0][0]))
+        return page, total
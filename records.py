@@ -0,0 +1,455 @@
+import csv
+import os
+import sys
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field, make_dataclass
+from datetime import datetime
+
+
+# ----------------------------
+# INTERNED CODE TABLES
+# ----------------------------
+class CodeTable:
+    """
+    Low-cardinality strings <-> small int codes. Each value is interned once;
+    records store the code, so a million rows share one copy of "Motor Overload".
+    Codes are stable for the life of the process (append-only).
+    """
+
+    def __init__(self, values=()):
+        self.values = []   # code -> interned string
+        self.codes = {}    # string -> code
+        for v in values:
+            self.code(v)
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value) -> int:
+        value = "" if value is None else str(value)
+        c = self.codes.get(value)
+        if c is None:
+            c = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self.codes[value] = c
+        return c
+
+    def value(self, code: int) -> str:
+        return self.values[code]
+
+
+FAULT_CODES = CodeTable()
+SEVERITY_CODES = CodeTable(["", "Minor", "Major", "Critical"])
+PRIORITY_CODES = CodeTable(["", "HIGH", "MEDIUM", "LOW"])
+STATUS_CODES = CodeTable(["", "OPEN", "IN_PROGRESS", "BREACHED", "CLOSED"])
+RESULT_CODES = CodeTable(["", "CORRECT", "INCORRECT"])
+TEXT_CODES = CodeTable([""])     # escalation, site status, grade, SLA / repair minutes
+ACTION_CODES = CodeTable([""])   # technician action / resolution text
+TECH_CODES = CodeTable([""])     # technician IDs
+
+
+# ----------------------------
+# MAPPING FACADE
+# ----------------------------
+class _RecordMapping:
+    """
+    Lets a slots record stand in for the dict it replaces: get / [] / update /
+    keys / items / dict(record). _access maps key -> (attribute, CodeTable or None).
+    """
+
+    __slots__ = ()
+    _access = {}
+    _optional = frozenset()   # keys that read as missing (default) while None
+
+    def get(self, key, default=None):
+        spec = self._access.get(key)
+        if spec is None:
+            return default
+        v = getattr(self, spec[0])
+        if spec[1] is not None:
+            return spec[1].values[v]
+        return default if v is None and key in self._optional else v
+
+    def __getitem__(self, key):
+        if key not in self._access:
+            raise KeyError(key)
+        return self.get(key)
+
+    def __setitem__(self, key, value):
+        spec = self._access.get(key)
+        if spec is None:
+            raise KeyError(key)
+        setattr(self, spec[0], spec[1].code(value) if spec[1] is not None else value)
+
+    def __contains__(self, key):
+        return key in self._access
+
+    def __iter__(self):
+        return iter(self._access)
+
+    def __len__(self):
+        return len(self._access)
+
+    def keys(self):
+        return self._access.keys()
+
+    def items(self):
+        return [(k, self.get(k)) for k in self._access]
+
+    def update(self, values):
+        items = values.items() if hasattr(values, "items") else values
+        for k, v in items:
+            if k in self._access:
+                self[k] = v
+
+    def as_dict(self) -> dict:
+        return {k: self.get(k) for k in self._access}
+
+
+# ----------------------------
+# FAULT EVENT RECORD
+# ----------------------------
+@dataclass(slots=True)
+class FaultEvent(_RecordMapping):
+    """One handled fault (replaces build_event_entry's 13-key dict)."""
+
+    timestamp: str
+    fault_c: int
+    severity_c: int
+    result_c: int
+    escalation_c: int
+    resolution_c: int
+    repair_time_min: int
+    total_repair_time_min: int
+    total_downtime_sec: int
+    accuracy_pct: int
+    grade_c: int
+    site_status_c: int
+    work_order_file: str | None = None
+    wo_id: str | None = None
+
+    @classmethod
+    def create(
+        cls, timestamp, fault, severity, result, escalation, resolution, repair_time_min,
+        total_repair_time_min, total_downtime_sec, accuracy_pct, grade, site_status, work_order_file=None,
+    ):
+        return cls(
+            timestamp,
+            FAULT_CODES.code(fault),
+            SEVERITY_CODES.code(severity),
+            RESULT_CODES.code(result),
+            TEXT_CODES.code(escalation),
+            ACTION_CODES.code(resolution),
+            repair_time_min,
+            total_repair_time_min,
+            total_downtime_sec,
+            accuracy_pct,
+            TEXT_CODES.code(grade),
+            TEXT_CODES.code(site_status),
+            work_order_file,
+        )
+
+    @property
+    def fault(self) -> str:
+        return FAULT_CODES.values[self.fault_c]
+
+    @property
+    def severity(self) -> str:
+        return SEVERITY_CODES.values[self.severity_c]
+
+    @property
+    def result(self) -> str:
+        return RESULT_CODES.values[self.result_c]
+
+    def as_dict(self) -> dict:
+        d = {k: self.get(k) for k in self._access}
+        if d["wo_id"] is None:
+            del d["wo_id"]   # the dict form only had wo_id once a work order was cut
+        return d
+
+
+FaultEvent._access = {
+    "timestamp": ("timestamp", None),
+    "fault": ("fault_c", FAULT_CODES),
+    "severity": ("severity_c", SEVERITY_CODES),
+    "result": ("result_c", RESULT_CODES),
+    "escalation": ("escalation_c", TEXT_CODES),
+    "resolution": ("resolution_c", ACTION_CODES),
+    "repair_time_min": ("repair_time_min", None),
+    "total_repair_time_min": ("total_repair_time_min", None),
+    "total_downtime_sec": ("total_downtime_sec", None),
+    "accuracy_pct": ("accuracy_pct", None),
+    "grade": ("grade_c", TEXT_CODES),
+    "site_status": ("site_status_c", TEXT_CODES),
+    "work_order_file": ("work_order_file", None),
+    "wo_id": ("wo_id", None),
+}
+FaultEvent._optional = frozenset({"wo_id"})
+
+
+# ----------------------------
+# WORK ORDER RECORD
+# ----------------------------
+# Columns stored as codes; IDs, timestamps and free text (notes, breach reason) stay str
+WORK_ORDER_CODED = {
+    "Fault": FAULT_CODES,
+    "Severity": SEVERITY_CODES,
+    "Priority": PRIORITY_CODES,
+    "Status": STATUS_CODES,
+    "Result": RESULT_CODES,
+    "SLA_Minutes": TEXT_CODES,
+    "Escalation": TEXT_CODES,
+    "Site_Status": TEXT_CODES,
+    "Technician_Action": ACTION_CODES,
+    "Repair_Time_Min": TEXT_CODES,
+    "Assigned_Tech": TECH_CODES,
+}
+
+
+def make_record_class(name: str, columns: list, coded: dict | None = None) -> type:
+    """
+    Slots dataclass with one attribute per column ("" defaults), usable wherever
+    a {column: str} row dict was (see _RecordMapping). `coded` columns keep a
+    CodeTable code instead of the string.
+    """
+    coded = WORK_ORDER_CODED if coded is None else coded
+    attrs, access = [], {}
+    for i, col in enumerate(columns):
+        attr = f"c{i}_{''.join(ch if ch.isalnum() else '_' for ch in col).lower()}"
+        table = coded.get(col)
+        default = table.code("") if table is not None else ""
+        attrs.append((attr, int if table is not None else str, field(default=default)))
+        access[col] = (attr, table)
+
+    cls = make_dataclass(name, attrs, bases=(_RecordMapping,), slots=True)
+    cls._access = access
+    cls._optional = frozenset()
+    return cls
+
+
+# ----------------------------
+# COLUMNAR FAULT HISTORY
+# ----------------------------
+class EventColumns:
+    """
+    Bulk fault history as one typed array per field:
+    - timestamp as int64 epoch seconds, coded text as uint32 codes, counters as int64
+    - work_order_file / wo_id kept sparse (only rows that cut a work order)
+    Rows come back out as FaultEvent records; counting by field never decodes.
+    """
+
+    CODED = {
+        "fault": FAULT_CODES,
+        "severity": SEVERITY_CODES,
+        "result": RESULT_CODES,
+        "escalation": TEXT_CODES,
+        "resolution": ACTION_CODES,
+        "grade": TEXT_CODES,
+        "site_status": TEXT_CODES,
+    }
+    INTS = ["repair_time_min", "total_repair_time_min", "total_downtime_sec", "accuracy_pct"]
+
+    def __init__(self):
+        self.timestamp = array("q")
+        self.codes = {k: array("I") for k in self.CODED}
+        self.ints = {k: array("q") for k in self.INTS}
+        self.work_order_file = {}   # row -> file
+        self.wo_id = {}             # row -> WO_ID
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def append(self, e):
+        """Adds one event (FaultEvent or event dict)."""
+        i = len(self.timestamp)
+        self.timestamp.append(_ts_epoch(e.get("timestamp")))
+        for k, table in self.CODED.items():
+            self.codes[k].append(table.code(e.get(k)))
+        for k in self.INTS:
+            self.ints[k].append(_int(e.get(k)))
+        if e.get("work_order_file"):
+            self.work_order_file[i] = e.get("work_order_file")
+        if e.get("wo_id"):
+            self.wo_id[i] = e.get("wo_id")
+
+    def extend(self, events):
+        for e in events:
+            self.append(e)
+
+    def __getitem__(self, i: int) -> FaultEvent:
+        if i < 0:
+            i += len(self)
+        ev = FaultEvent(
+            _ts_text(self.timestamp[i]),
+            self.codes["fault"][i],
+            self.codes["severity"][i],
+            self.codes["result"][i],
+            self.codes["escalation"][i],
+            self.codes["resolution"][i],
+            self.ints["repair_time_min"][i],
+            self.ints["total_repair_time_min"][i],
+            self.ints["total_downtime_sec"][i],
+            self.ints["accuracy_pct"][i],
+            self.codes["grade"][i],
+            self.codes["site_status"][i],
+            self.work_order_file.get(i),
+        )
+        ev.wo_id = self.wo_id.get(i)
+        return ev
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def count_by(self, key: str) -> dict:
+        """{value: rows} for a coded field, counted on the codes."""
+        table = self.CODED[key]
+        return {table.values[c]: n for c, n in Counter(self.codes[key]).items()}
+
+    def outcomes_by_fault(self) -> dict:
+        """{fault: [correct, incorrect]} (rows with another result are skipped)."""
+        ok, bad = RESULT_CODES.code("CORRECT"), RESULT_CODES.code("INCORRECT")
+        counts = Counter(zip(self.codes["fault"], self.codes["result"]))
+        out = {}
+        for (f, r), n in counts.items():
+            if r in (ok, bad):
+                out.setdefault(FAULT_CODES.values[f], [0, 0])[0 if r == ok else 1] += n
+        return out
+
+    @classmethod
+    def from_csv(cls, path: str, columns: list | None = None, keys: list | None = None):
+        """Loads a fault_history.csv layout (header row mapped through columns -> event keys)."""
+        cols = cls()
+        if not os.path.exists(path):
+            return cols
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return cols
+            mapping = dict(zip(columns, keys)) if columns and keys else {}
+            names = [mapping.get(h, h.strip().lower()) for h in header]
+            for rec in reader:
+                cols.append(dict(zip(names, rec)))
+        return cols
+
+
+def _int(v) -> int:
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _ts_epoch(v) -> int:
+    try:
+        return int(datetime.fromisoformat(str(v)).timestamp())
+    except (TypeError, ValueError):
+        return -1
+
+
+def _ts_text(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch).strftime("%Y-%m-%d %H:%M:%S") if epoch >= 0 else ""
+
+
+# ----------------------------
+# MEMORY PER RECORD (python records.py)
+# ----------------------------
+def _bytes_per(build, n: int) -> float:
+    import gc
+    import tracemalloc
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    held = build(n)
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del held
+    return used / n
+
+
+def main(argv=None):
+    import argparse
+    import random
+
+    import app
+
+    p = argparse.ArgumentParser(description="Measure memory per event / work order record.")
+    p.add_argument("-n", type=int, default=100000)
+    args = p.parse_args(argv)
+
+    rng = random.Random(1)
+    start = datetime(2026, 3, 2, 6).timestamp()
+    samples = []
+    for i in range(1000):
+        fault, sev = app.simulate_fault(rng)
+        ok = rng.random() < 0.85
+        samples.append((fault, sev, "CORRECT" if ok else "INCORRECT", app.repair_time_minutes(sev, ok)))
+
+    def ts(i):
+        return datetime.fromtimestamp(start + 37 * i).strftime("%Y-%m-%d %H:%M:%S")
+
+    def event_args(i):
+        fault, sev, res, rt = samples[i % 1000]
+        esc = "None" if res == "CORRECT" else "ESCALATE: SUPERVISOR NOTIFY"
+        return (ts(i), fault, sev, res, esc, f"{'Correct' if res == 'CORRECT' else 'Incorrect'} Action: Reset",
+                rt, 5 * i, 5 * i, 85, "B", "NORMAL")
+
+    def event_dicts(n):
+        return [dict(zip(app.FAULT_HISTORY_KEYS, event_args(i) + (None,))) for i in range(n)]
+
+    def event_records(n):
+        return [FaultEvent.create(*event_args(i)) for i in range(n)]
+
+    def event_columns(n):
+        cols = EventColumns()
+        for i in range(n):
+            cols.append(FaultEvent.create(*event_args(i)))
+        return cols
+
+    WorkOrderRecord = make_record_class("WorkOrderRecord", app.WORK_ORDER_COLUMNS)
+
+    def wo_values(i):
+        fault, sev, res, rt = samples[i % 1000]
+        pr = app.severity_to_priority(sev)
+        return {
+            "WO_ID": f"WO-{i + 1:06d}", "Created_Timestamp": ts(i), "Fault": fault, "Severity": sev,
+            "Priority": pr, "Status": "OPEN", "SLA_Minutes": str(app.priority_to_sla_minutes(pr)),
+            "Result": res, "Escalation": "ESCALATE: SUPERVISOR NOTIFY", "Site_Status": "WATCH",
+            "Technician_Action": "Incorrect Action: Ignore alarm → Escalation Required", "Repair_Time_Min": str(rt),
+            "Work_Order_File": f"work_order_WO-{i + 1:06d}.txt", "Last_Updated": ts(i),
+            "Created_Epoch": str(int(start + 37 * i)),
+        }
+
+    def wo_dicts(n):
+        rows = []
+        for i in range(n):
+            row = {c: "" for c in app.WORK_ORDER_COLUMNS}
+            row.update(wo_values(i))
+            rows.append(row)
+        return rows
+
+    def wo_records(n):
+        rows = []
+        for i in range(n):
+            row = WorkOrderRecord()
+            row.update(wo_values(i))
+            rows.append(row)
+        return rows
+
+    print(f"MEMORY PER RECORD (n={args.n}, tracemalloc, includes per-row strings)")
+    print("-" * 60)
+    for label, build in (
+        (f"event dict ({len(app.FAULT_HISTORY_KEYS)} keys)", event_dicts),
+        ("FaultEvent (slots + codes)", event_records),
+        ("EventColumns (arrays)", event_columns),
+        (f"work order dict ({len(app.WORK_ORDER_COLUMNS)} cols)", wo_dicts),
+        ("WorkOrderRecord (slots + codes)", wo_records),
+    ):
+        print(f"{label:<34} {_bytes_per(build, args.n):>8.0f} B")
+
+
+if __name__ == "__main__":
+    main()
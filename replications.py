@@ -0,0 +1,168 @@
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import app
+import engine
+
+
+# ----------------------------
+# PARALLEL REPLICATIONS
+# ----------------------------
+# Each replication is one engine run (HeadlessRun / DiscreteEventRun), so its
+# fault_count / score / status_flags live on the run object, never in app's
+# module globals. Replications fan out over a process pool; with persist=True
+# each one works inside its own directory (rep_00001/ ...), so wo_counter.txt,
+# work_orders.csv and the log/report files never collide.
+MERGED_METRICS = [
+    "events",
+    "accuracy_pct",
+    "escalations",
+    "critical_wrong",
+    "sla_breaches_total",
+    "high_sla_breaches_total",
+    "total_repair_time_min",
+]
+
+
+def replication_seed(base_seed, rep: int) -> int:
+    """Independent per-replication seed (hashed, so rep i and i+1 streams don't overlap)."""
+    return random.Random(f"{base_seed}:{rep}").getrandbits(63)
+
+
+def _absolute_policy(spec: str) -> str:
+    # History CSVs resolve against the launch directory, not the replication's
+    kind, _, arg = (spec or "correct").partition(":")
+    if kind.strip().lower() == "history":
+        return f"history:{os.path.abspath(arg or app.FAULT_HISTORY_CSV)}"
+    return spec
+
+
+def _run_one(task: tuple) -> dict:
+    rep, seed, run_dir, options = task
+    cwd = os.getcwd()
+    if run_dir:
+        os.makedirs(run_dir, exist_ok=True)
+        os.chdir(run_dir)
+    try:
+        opts = dict(options)
+        hours = opts.pop("virtual_hours", None)
+        n_faults = opts.pop("n_faults", 1000)
+        if hours is not None:
+            summary = engine.run_virtual(hours, seed=seed, **opts)
+        else:
+            summary = engine.run_headless(n_faults, seed=seed, **opts)
+    finally:
+        os.chdir(cwd)
+    summary["replication"] = rep
+    summary["seed"] = seed
+    summary["run_dir"] = run_dir
+    return summary
+
+
+def run_replications(
+    replications: int,
+    workers: int | None = None,
+    base_seed=0,
+    out_dir: str | None = None,
+    **options,
+) -> list:
+    """
+    Runs `replications` independent engine runs in parallel.
+    options go to engine.run_virtual (if virtual_hours is set) or run_headless
+    (n_faults, policy, persist, scan_every, stop_on_stop_work, ...).
+    Returns the per-replication summaries in replication order.
+    """
+    if "policy" in options:
+        options["policy"] = _absolute_policy(options["policy"])
+    if options.get("persist") and out_dir is None:
+        out_dir = os.path.join("runs", datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
+
+    tasks = []
+    for rep in range(replications):
+        run_dir = os.path.abspath(os.path.join(out_dir, f"rep_{rep:05d}")) if options.get("persist") else None
+        tasks.append((rep, replication_seed(base_seed, rep), run_dir, options))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [_run_one(t) for t in tasks]
+    chunk = max(1, replications // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_one, tasks, chunksize=chunk))
+
+
+def merge_summaries(summaries: list, z: float = 1.96) -> dict:
+    """Mean and normal-approximation CI per metric, plus the share of runs ending in STOP WORK."""
+    n = len(summaries)
+    report = {"replications": n}
+    for key in MERGED_METRICS:
+        values = [float(s.get(key, 0)) for s in summaries]
+        mean = statistics.fmean(values) if values else 0.0
+        half = z * statistics.stdev(values) / math.sqrt(n) if n > 1 else 0.0
+        report[key] = {"mean": round(mean, 4), "ci_low": round(mean - half, 4), "ci_high": round(mean + half, 4)}
+
+    stop = sum(1 for s in summaries if s.get("site_status") == "STOP WORK")
+    report["stop_work_runs"] = stop
+    report["stop_work_share"] = round(stop / n, 4) if n else 0.0
+    return report
+
+
+def print_merged_report(report: dict):
+    print("REPLICATION REPORT")
+    print("=" * 60)
+    print(f"Replications: {report['replications']}")
+    for key in MERGED_METRICS:
+        m = report[key]
+        print(f"{key:<24} {m['mean']:>10.3f}   95% CI [{m['ci_low']:.3f}, {m['ci_high']:.3f}]")
+    print(f"Runs ending in STOP WORK: {report['stop_work_runs']} ({report['stop_work_share'] * 100:.1f}%)")
+    print("=" * 60)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Run seeded, independent simulations in parallel and merge the results.")
+    p.add_argument("-r", "--replications", type=int, default=100)
+    p.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    p.add_argument("--seed", type=int, default=0, help="base seed (replication seeds are derived from it)")
+    p.add_argument("-n", "--faults", type=int, default=1000, help="faults per replication (headless mode)")
+    p.add_argument("--virtual-hours", type=float, default=None, help="sim hours per replication instead of -n")
+    p.add_argument("--start", default=None, help='sim start for --virtual-hours, e.g. "2026-03-02 06:00:00"')
+    p.add_argument("--policy", default="random:0.85")
+    p.add_argument("--persist", action="store_true", help="write files, one directory per replication")
+    p.add_argument("--out-dir", default=None, help="parent directory for --persist runs (default: runs/<timestamp>)")
+    p.add_argument("--no-stop", action="store_true", help="keep running after STOP WORK")
+    p.add_argument("--json", default=None, help="also write the merged report (+ per-run summaries) here")
+    args = p.parse_args(argv)
+
+    options = {
+        "policy": args.policy,
+        "persist": args.persist,
+        "stop_on_stop_work": not args.no_stop,
+        "n_faults": args.faults,
+    }
+    if args.virtual_hours is not None:
+        options.pop("n_faults")
+        options["virtual_hours"] = args.virtual_hours
+        options["start"] = datetime.fromisoformat(args.start) if args.start else None
+
+    started = time.perf_counter()
+    summaries = run_replications(
+        args.replications, workers=args.workers, base_seed=args.seed, out_dir=args.out_dir, **options
+    )
+    report = merge_summaries(summaries)
+    report["elapsed_sec"] = round(time.perf_counter() - started, 3)
+
+    print_merged_report(report)
+    print(f"({report['elapsed_sec']}s)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"report": report, "runs": summaries}, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import heapq
+import itertools
+import time
+from datetime import datetime
+
+
+# ----------------------------
+# CLOCKS
+# ----------------------------
+# app.py reads time only through the active clock (app.set_clock), so the
+# same timestamping / SLA / main-loop code runs on wall time or sim time.
+class RealClock:
+    def time(self) -> float:
+        return time.time()
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Simulated time in epoch seconds; sleep() advances instantly.
+    Time never moves backwards.
+    """
+
+    def __init__(self, start=None):
+        if start is None:
+            start = time.time()
+        elif isinstance(start, datetime):
+            start = start.timestamp()
+        self._t = float(start)
+
+    def time(self) -> float:
+        return self._t
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(int(self._t))
+
+    def sleep(self, seconds: float):
+        self.advance(seconds)
+
+    def advance(self, seconds: float):
+        self._t += max(float(seconds), 0.0)
+
+    def advance_to(self, t: float):
+        self._t = max(self._t, float(t))
+
+
+# ----------------------------
+# DISCRETE-EVENT SCHEDULER
+# ----------------------------
+class EventScheduler:
+    """
+    Event heap over a VirtualClock:
+    - schedule(delay_sec, fn, *args) / schedule_at(epoch, fn, *args) -> handle
+    - cancel(handle) is lazy (skipped when popped)
+    - run() pops events in time order, jumps the clock to each one and calls it;
+      ties run in scheduling order
+    """
+
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self._heap = []
+        self._seq = itertools.count()
+        self._cancelled = set()
+        self.processed = 0
+
+    def __len__(self):
+        return max(len(self._heap) - len(self._cancelled), 0)
+
+    def schedule_at(self, t: float, fn, *args) -> int:
+        handle = next(self._seq)
+        heapq.heappush(self._heap, (max(float(t), self.clock.time()), handle, fn, args))
+        return handle
+
+    def schedule(self, delay_sec: float, fn, *args) -> int:
+        return self.schedule_at(self.clock.time() + max(float(delay_sec), 0.0), fn, *args)
+
+    def cancel(self, handle: int):
+        self._cancelled.add(handle)
+
+    def next_time(self):
+        while self._heap and self._heap[0][1] in self._cancelled:
+            self._cancelled.discard(heapq.heappop(self._heap)[1])
+        return self._heap[0][0] if self._heap else None
+
+    def run(self, until: float | None = None, max_events: int | None = None, stop=None) -> int:
+        """
+        Runs events up to epoch `until` (clock ends there), at most max_events,
+        or until stop() returns True. Returns the number of events run.
+        """
+        n = 0
+        drained = False
+        while True:
+            t = self.next_time()
+            if t is None or (until is not None and t > until):
+                drained = True
+                break
+            if max_events is not None and n >= max_events:
+                break
+            if stop is not None and stop():
+                break
+            _t, _handle, fn, args = heapq.heappop(self._heap)
+            self.clock.advance_to(t)
+            fn(*args)
+            n += 1
+        self.processed += n
+        if drained and until is not None:
+            self.clock.advance_to(until)
+        return n
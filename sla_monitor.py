@@ -0,0 +1,68 @@
+import heapq
+import math
+
+
+# ----------------------------
+# SLA MONITOR (DEADLINE MIN-HEAP)
+# ----------------------------
+class SlaMonitor:
+    """
+    Active work orders keyed by breach deadline (epoch seconds):
+    - track()/untrack() are O(log N) / O(1); untrack just drops the live entry,
+      the stale heap entry is skipped when it surfaces (lazy invalidation)
+    - pop_expired(now) returns only the orders whose deadline has passed,
+      O(k log N) for k breaches instead of re-checking every row
+    """
+
+    def __init__(self):
+        self._heap = []        # (deadline, wo_id), may contain stale entries
+        self._deadline = {}    # wo_id -> live deadline
+
+    def __len__(self):
+        return len(self._deadline)
+
+    def __contains__(self, wo_id: str):
+        return wo_id in self._deadline
+
+    def track(self, wo_id: str, deadline: float):
+        if self._deadline.get(wo_id) == deadline:
+            return
+        self._deadline[wo_id] = deadline
+        heapq.heappush(self._heap, (deadline, wo_id))
+        self._maybe_rebuild()
+
+    def untrack(self, wo_id: str):
+        self._deadline.pop(wo_id, None)
+
+    def _is_live(self, entry) -> bool:
+        deadline, wo_id = entry
+        return self._deadline.get(wo_id) == deadline
+
+    def _maybe_rebuild(self):
+        # Keep stale entries bounded so the heap stays O(active)
+        if len(self._heap) > 2 * len(self._deadline) + 64:
+            self._heap = [(d, w) for w, d in self._deadline.items()]
+            heapq.heapify(self._heap)
+
+    def pop_expired(self, now: float) -> list:
+        expired = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if self._is_live(entry):
+                del self._deadline[entry[1]]
+                expired.append(entry[1])
+        return expired
+
+    def next_deadline(self):
+        heap = self._heap
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def next_breach_minutes(self, now: float):
+        """Whole minutes until the next breach (0 = due now), None if nothing is active."""
+        deadline = self.next_deadline()
+        if deadline is None:
+            return None
+        return max(int(math.ceil((deadline - now) / 60)), 0)
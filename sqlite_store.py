@@ -0,0 +1,422 @@
+import csv
+import math
+import os
+import sqlite3
+import urllib.parse
+from contextlib import contextmanager
+
+from wo_store import VersionConflict
+
+
+# ----------------------------
+# SQLITE WORK ORDER STORE
+# ----------------------------
+# Same surface as WorkOrderStore (get / append / update / update_many /
+# iter_rows / subscribe / close) so app.py can switch backends. Besides the
+# WORK_ORDER_COLUMNS text columns, each row carries a few derived numeric
+# columns (filled by the derive() callback) that the indexes are built on.
+DERIVED_COLUMNS = [
+    ("q_status", "TEXT"),        # Status, upper-cased
+    ("q_priority", "TEXT"),      # Priority, upper-cased
+    ("q_pr_rank", "INTEGER"),    # priority_rank()
+    ("q_sla_min", "INTEGER"),    # SLA_Minutes as int (999999 if unknown)
+    ("q_created", "REAL"),       # Created_Epoch (sorts last if unknown)
+    ("q_deadline", "REAL"),      # breach deadline epoch (NULL if not trackable)
+    ("q_breached", "INTEGER"),   # 0 = BREACHED (sorts first), 1 = otherwise
+]
+
+
+def _q(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SqliteWorkOrderStore:
+    """
+    Work orders + fault history in one sqlite3 database (WAL mode).
+    - WO_ID is the primary key
+    - (q_status, q_priority, q_deadline) and (q_status, q_deadline) serve breach checks
+    - (q_breached, q_pr_rank, q_sla_min, q_created, WO_ID) serves the supervisor queue order
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        columns: list,
+        derive,
+        sla_statuses=("OPEN", "IN_PROGRESS"),
+        queue_statuses=("OPEN", "IN_PROGRESS", "BREACHED"),
+        history_columns: list | None = None,
+        csv_path: str | None = None,
+        version_column: str = "Row_Version",
+    ):
+        self.db_path = db_path
+        self.csv_path = csv_path
+        self.columns = list(columns)
+        self.derive = derive
+        self.sla_statuses = tuple(sla_statuses)
+        self.queue_statuses = tuple(queue_statuses)
+        self.history_columns = list(history_columns or [])
+        self.version_column = version_column if version_column in self.columns else None
+        self.conflicts = 0
+        self.listeners = []
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+        cols = self.columns + [name for name, _ in DERIVED_COLUMNS]
+        # Upsert (not INSERT OR REPLACE) so rowid, i.e. queue file order, survives updates
+        self._insert_sql = (
+            f"INSERT INTO work_orders ({', '.join(_q(c) for c in cols)}) "
+            f"VALUES ({', '.join('?' for _ in cols)}) "
+            f"ON CONFLICT(WO_ID) DO UPDATE SET "
+            + ", ".join(f"{_q(c)} = excluded.{_q(c)}" for c in cols if c != "WO_ID")
+        )
+        self._select_sql = f"SELECT {', '.join(_q(c) for c in self.columns)} FROM work_orders"
+
+        self.sla = SqliteSlaView(self)
+
+    # ---------- schema ----------
+    def _create_schema(self):
+        cols = [f'{_q("WO_ID")} TEXT PRIMARY KEY']
+        cols += [f"{_q(c)} TEXT" for c in self.columns if c != "WO_ID"]
+        cols += [f"{name} {kind}" for name, kind in DERIVED_COLUMNS]
+        with self.conn:
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS work_orders ({', '.join(cols)})")
+            # Columns added to WORK_ORDER_COLUMNS after the db was created
+            existing = {r[1] for r in self.conn.execute("PRAGMA table_info(work_orders)")}
+            for c in self.columns:
+                if c not in existing:
+                    self.conn.execute(f"ALTER TABLE work_orders ADD COLUMN {_q(c)} TEXT DEFAULT ''")
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_wo_status_priority_deadline "
+                "ON work_orders(q_status, q_priority, q_deadline)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_wo_status_deadline ON work_orders(q_status, q_deadline)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_wo_queue_order "
+                "ON work_orders(q_breached, q_pr_rank, q_sla_min, q_created, WO_ID)"
+            )
+            if self.history_columns:
+                hcols = ", ".join(f"{_q(c)} TEXT" for c in self.history_columns)
+                self.conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS fault_history (id INTEGER PRIMARY KEY AUTOINCREMENT, {hcols})"
+                )
+
+    # ---------- helpers ----------
+    def _normalize(self, values: dict) -> dict:
+        return {k: ("" if v is None else str(v)) for k, v in values.items() if k in self.columns}
+
+    def _values(self, row: dict) -> list:
+        d = self.derive(row)
+        return [row.get(c, "") for c in self.columns] + [d.get(name) for name, _ in DERIVED_COLUMNS]
+
+    def _notify(self, row: dict):
+        for fn in self.listeners:
+            fn(row)
+
+    def _as_dict(self, rec) -> dict:
+        return {c: ("" if v is None else v) for c, v in zip(self.columns, rec)}
+
+    # ---------- public API ----------
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM work_orders").fetchone()[0]
+
+    def subscribe(self, fn, on_drop=None):
+        # on_drop is never called: rows are not archived out of the table
+        self.listeners.append(fn)
+
+    def get(self, wo_id: str):
+        rec = self.conn.execute(f"{self._select_sql} WHERE WO_ID = ?", (wo_id,)).fetchone()
+        return self._as_dict(rec) if rec else None
+
+    def iter_rows(self):
+        for rec in self.conn.execute(f"{self._select_sql} ORDER BY rowid"):
+            yield self._as_dict(rec)
+
+    def row_version(self, row: dict) -> int:
+        if self.version_column is None:
+            return 0
+        try:
+            return int(row.get(self.version_column) or 0)
+        except ValueError:
+            return 0
+
+    @contextmanager
+    def _write_txn(self):
+        # BEGIN IMMEDIATE takes the write lock before _apply reads the row, so
+        # another process's read-modify-write cannot interleave with ours
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+    def append(self, wo_row: dict) -> dict:
+        row = {c: "" for c in self.columns}
+        row.update(self._normalize(wo_row))
+        if self.version_column is not None:
+            row[self.version_column] = "1"
+        with self._write_txn():
+            self.conn.execute(self._insert_sql, self._values(row))
+        self._notify(row)
+        return row
+
+    def _apply(self, wo_id: str, updates: dict, expected_version=None):
+        row = self.get(wo_id)
+        if row is None:
+            return None
+        version = self.row_version(row)
+        if expected_version is not None and self.version_column is not None and version != int(expected_version):
+            self.conflicts += 1
+            raise VersionConflict(wo_id, int(expected_version), version)
+        row.update(self._normalize(updates))
+        if self.version_column is not None:
+            row[self.version_column] = str(version + 1)
+        self.conn.execute(self._insert_sql, self._values(row))
+        return row
+
+    def update(self, wo_id: str, updates: dict, expected_version: int | None = None) -> bool:
+        with self._write_txn():
+            row = self._apply(wo_id, updates, expected_version)
+        if row is None:
+            return False
+        self._notify(row)
+        return True
+
+    def update_many(self, changes: list) -> list:
+        """
+        All changes in one transaction; returns the WO_IDs actually updated.
+        (wo_id, updates, expected_version) entries are skipped on a version conflict.
+        """
+        touched = []
+        with self._write_txn():
+            for wo_id, updates, *expected in changes:
+                try:
+                    row = self._apply(wo_id, updates, expected[0] if expected else None)
+                except VersionConflict:
+                    continue
+                if row is not None:
+                    touched.append(row)
+        for row in touched:
+            self._notify(row)
+        return [row.get("WO_ID", "") for row in touched]
+
+    def refresh(self):
+        """Reads always see the latest committed state; nothing to catch up on."""
+
+    # ---------- supervisor queue ----------
+    def queue_page(self, now: float, offset: int = 0, limit: int = 15, priority=None, status=None, fault=None):
+        """
+        Returns ([(row, shown_status)], total_matching) for one page of the
+        active queue as of `now`, read-only:
+        - first BREACHED rows plus OPEN / IN_PROGRESS rows past q_deadline
+          (shown as BREACHED), then the other OPEN / IN_PROGRESS rows
+        - each group is one ORDER BY q_pr_rank, q_sla_min, q_created, WO_ID
+          ... LIMIT / OFFSET query (persisted breaches walk ix_wo_queue_order,
+          the OPEN / IN_PROGRESS rows come off ix_wo_status_deadline), and the
+          totals are index-only counts, so no row outside the page reaches Python
+        Filters match the shown status, like the CSV backend's PriorityIndex.
+        """
+        def as_list(v, upper=True):
+            if isinstance(v, str):
+                v = [v]
+            return [str(x).strip().upper() if upper else x for x in v]
+
+        def marks(values):
+            return ", ".join("?" for _ in values) or "NULL"
+
+        extra, extra_params = "", []
+        if priority is not None:
+            pr = as_list(priority)
+            extra += f" AND q_priority IN ({marks(pr)})"
+            extra_params += pr
+        if fault is not None:
+            fl = as_list(fault, upper=False)
+            extra += f" AND Fault IN ({marks(fl)})"
+            extra_params += fl
+
+        sla = list(self.sla_statuses)
+        waiting = [s for s in sla if s in self.queue_statuses and (status is None or s in as_list(status))]
+        show_breached = "BREACHED" in self.queue_statuses and (status is None or "BREACHED" in as_list(status))
+        order = "ORDER BY q_pr_rank, q_sla_min, q_created, WO_ID"
+        offset, limit = max(offset, 0), max(limit, 0)
+        cols = ", ".join(_q(c) for c in self.columns)
+
+        # BREACHED group: persisted breaches (q_breached = 0 walks the index in
+        # order) merged with the overdue rows the SLA scan has not written yet
+        persisted_where, persisted_params = f"q_breached = 0{extra}", list(extra_params)
+        overdue_where = f"q_status IN ({marks(sla)}) AND q_deadline <= ?{extra}"
+        overdue_params = [*sla, now, *extra_params]
+        # (q_status IN the SLA statuses already means q_breached = 1; leaving it
+        # out lets the count run on ix_wo_status_deadline alone)
+        waiting_where = f"q_status IN ({marks(waiting)}) AND (q_deadline IS NULL OR q_deadline > ?){extra}"
+        waiting_params = [*waiting, now, *extra_params]
+
+        n_breached, n_waiting = self.conn.execute(
+            f"SELECT (SELECT COUNT(*) FROM work_orders WHERE {persisted_where}) "
+            f"+ (SELECT COUNT(*) FROM work_orders WHERE {overdue_where}), "
+            f"(SELECT COUNT(*) FROM work_orders WHERE {waiting_where})",
+            [*persisted_params, *overdue_params, *waiting_params],
+        ).fetchone()
+        if not show_breached:
+            n_breached = 0
+
+        page = []
+        if show_breached and offset < n_breached:
+            sql = (
+                f"SELECT {cols}, q_pr_rank, q_sla_min, q_created FROM work_orders WHERE {persisted_where} "
+                f"UNION ALL SELECT {cols}, q_pr_rank, q_sla_min, q_created FROM work_orders WHERE {overdue_where} "
+                f"{order} LIMIT ? OFFSET ?"
+            )
+            for rec in self.conn.execute(sql, (*persisted_params, *overdue_params, limit, offset)):
+                page.append((self._as_dict(rec), "BREACHED"))
+        remaining = limit - len(page)
+        if remaining > 0 and n_waiting:
+            sql = f"SELECT {cols} FROM work_orders WHERE {waiting_where} {order} LIMIT ? OFFSET ?"
+            for rec in self.conn.execute(sql, (*waiting_params, remaining, max(offset - n_breached, 0))):
+                row = self._as_dict(rec)
+                page.append((row, (row.get("Status", "") or "").strip().upper()))
+        return page, n_breached + n_waiting
+
+    # ---------- fault history ----------
+    def append_event(self, values: list):
+        cols = ", ".join(_q(c) for c in self.history_columns)
+        marks = ", ".join("?" for _ in self.history_columns)
+        with self.conn:
+            self.conn.execute(
+                f"INSERT INTO fault_history ({cols}) VALUES ({marks})",
+                ["" if v is None else str(v) for v in values],
+            )
+
+    def export_history_csv(self, path: str) -> int:
+        cols = ", ".join(_q(c) for c in self.history_columns)
+        return _write_csv_atomic(
+            path, self.history_columns, self.conn.execute(f"SELECT {cols} FROM fault_history ORDER BY id")
+        )
+
+    # ---------- CSV import / export ----------
+    def import_csv(self, path: str) -> int:
+        """Loads a WORK_ORDER_COLUMNS-layout CSV (upserts by WO_ID)."""
+        if not os.path.exists(path):
+            return 0
+        n = 0
+        with open(path, "r", newline="", encoding="utf-8") as f, self.conn:
+            for r in csv.DictReader(f):
+                row = {c: "" for c in self.columns}
+                row.update(self._normalize(r))
+                self.conn.execute(self._insert_sql, self._values(row))
+                n += 1
+        return n
+
+    def export_csv(self, path: str) -> int:
+        """Writes all work orders in WORK_ORDER_COLUMNS layout (temp file + rename)."""
+        return _write_csv_atomic(path, self.columns, self.conn.execute(f"{self._select_sql} ORDER BY rowid"))
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def _write_csv_atomic(path: str, header: list, records) -> int:
+    tmp = f"{path}.{os.getpid()}.tmp"   # per process: several consoles may export at once
+    n = 0
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(header)
+        for rec in records:
+            w.writerow(["" if v is None else v for v in rec])
+            n += 1
+    os.replace(tmp, path)
+    return n
+
+
+def read_rows(db_path: str, columns: list, statuses=None) -> list:
+    """
+    Work order dicts (rowid order) from a read-only connection: no schema
+    creation, no writes. `statuses` limits them to those q_status values.
+    """
+    if not os.path.exists(db_path):
+        return []
+    uri = "file:" + urllib.parse.quote(os.path.abspath(db_path)) + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        sql = f"SELECT {', '.join(_q(c) for c in columns)} FROM work_orders"
+        params = []
+        if statuses is not None:
+            params = [str(s).strip().upper() for s in statuses]
+            sql += f" WHERE q_status IN ({', '.join('?' for _ in params) or 'NULL'})"
+        return [
+            {c: ("" if v is None else v) for c, v in zip(columns, rec)}
+            for rec in conn.execute(sql + " ORDER BY rowid", params)
+        ]
+    finally:
+        conn.close()
+
+
+# ----------------------------
+# SQL-BACKED SLA VIEW
+# ----------------------------
+# Drop-in replacement for SlaMonitor: the indexes do the work.
+class SqliteSlaView:
+    def __init__(self, store: SqliteWorkOrderStore):
+        self.store = store
+
+    def _status_clause(self):
+        return f"q_status IN ({', '.join('?' for _ in self.store.sla_statuses)})"
+
+    def pop_expired(self, now: float) -> list:
+        sql = (
+            f"SELECT WO_ID FROM work_orders WHERE {self._status_clause()} "
+            "AND q_deadline IS NOT NULL AND q_deadline <= ? ORDER BY q_deadline"
+        )
+        return [r[0] for r in self.store.conn.execute(sql, (*self.store.sla_statuses, now))]
+
+    def next_deadline(self):
+        sql = f"SELECT MIN(q_deadline) FROM work_orders WHERE {self._status_clause()}"
+        return self.store.conn.execute(sql, self.store.sla_statuses).fetchone()[0]
+
+    def next_breach_minutes(self, now: float):
+        deadline = self.next_deadline()
+        if deadline is None:
+            return None
+        return max(int(math.ceil((deadline - now) / 60)), 0)
+
+
+# ----------------------------
+# CLI: CSV <-> SQLITE
+# ----------------------------
+def main(argv=None):
+    import argparse
+    import app
+
+    p = argparse.ArgumentParser(description="Import/export work orders between work_orders.csv and SQLite.")
+    p.add_argument("action", choices=["import", "export", "export-history"])
+    p.add_argument("--db", default=app.WORK_ORDERS_DB)
+    p.add_argument("--csv", default=None, help="CSV path (defaults to work_orders.csv / fault_history.csv)")
+    args = p.parse_args(argv)
+
+    app.WORK_ORDERS_DB = args.db
+    store = app.open_sqlite_store(import_csv=False)
+    try:
+        if args.action == "import":
+            path = args.csv or app.WORK_ORDERS_CSV
+            print(f"Imported {store.import_csv(path)} work orders from {path} into {args.db}")
+        elif args.action == "export":
+            path = args.csv or app.WORK_ORDERS_CSV
+            print(f"Exported {store.export_csv(path)} work orders from {args.db} to {path}")
+        else:
+            path = args.csv or app.FAULT_HISTORY_CSV
+            print(f"Exported {store.export_history_csv(path)} fault events from {args.db} to {path}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import copy
+import csv
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import app
+import montecarlo
+import replications
+from file_lock import write_atomic
+
+
+# ----------------------------
+# PARAMETER SWEEP / WHAT-IF ENGINE
+# ----------------------------
+# A grid point is a dict of overrides on top of the app's current config:
+#   sla.HIGH / sla.MEDIUM / sla.LOW           SLA minutes per priority
+#   weight.<fault name>                       relative arrival weight (default 1)
+#   accuracy                                  technician accuracy (0..1)
+#   stop_work_critical_wrong / watch_escalations / stop_work_high_breaches
+#   repair.correct.<severity> / repair.incorrect.<severity>   repair minutes
+#   shift_hours / arrival_mean_min / followup_mean_min
+# Finished points are cached in SWEEP_CACHE_DIR as <sha256 of resolved params>.json,
+# so re-running a sweep (or a wider one) only computes the new points.
+SWEEP_CACHE_DIR = ".sweep_cache"
+MODEL_VERSION = 1   # bump when the simulation model changes (invalidates the cache)
+
+RESULT_METRICS = ["faults", "accuracy_pct", "escalations", "critical_wrong", "sla_breaches", "high_sla_breaches"]
+SCALAR_PARAMS = {
+    "accuracy", "shift_hours", "arrival_mean_min", "followup_mean_min",
+    "stop_work_critical_wrong", "watch_escalations", "stop_work_high_breaches",
+}
+
+
+def resolve_params(overrides: dict) -> dict:
+    """Full model parameters (montecarlo.default_params layout) for one grid point."""
+    p = copy.deepcopy(montecarlo.default_params())
+    for key, value in overrides.items():
+        head, _, rest = key.partition(".")
+        if key in SCALAR_PARAMS:
+            p[key] = value
+        elif head == "sla" and rest.upper() in p["sla_minutes"]:
+            p["sla_minutes"][rest.upper()] = int(value)
+        elif head == "weight" and rest in {f["name"] for f in app.FAULTS}:
+            p["fault_weights"] = dict(p["fault_weights"] or {})
+            p["fault_weights"][rest] = float(value)
+        elif head == "repair":
+            outcome, _, severity = rest.partition(".")
+            if outcome not in p["repair_minutes"] or severity not in montecarlo.SEVERITIES:
+                raise ValueError(f"Unknown sweep parameter: {key}")
+            p["repair_minutes"][outcome][severity] = int(value)
+        else:
+            raise ValueError(f"Unknown sweep parameter: {key}")
+    return p
+
+
+def point_key(params: dict, backend: str, reps: int, seed) -> str:
+    blob = json.dumps(
+        {"params": params, "backend": backend, "replications": reps, "seed": seed, "model": MODEL_VERSION},
+        sort_keys=True,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def expand_grid(grid: dict) -> list:
+    """{"sla.HIGH": [15, 30], "accuracy": [0.7, 0.85]} -> list of override dicts (cartesian product)."""
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+
+# ----------------------------
+# POINT EVALUATION (WORKER SIDE)
+# ----------------------------
+APP_CONFIG = [
+    "SLA_MINUTES", "FAULT_WEIGHTS", "REPAIR_MINUTES",
+    "STOP_WORK_CRITICAL_WRONG", "WATCH_ESCALATIONS", "STOP_WORK_HIGH_SLA_BREACHES",
+]
+
+
+def _configure_app(p: dict) -> dict:
+    """Points the app's module config at this grid point; returns the previous values."""
+    previous = {name: getattr(app, name) for name in APP_CONFIG}
+    app.SLA_MINUTES = dict(p["sla_minutes"])
+    app.FAULT_WEIGHTS = dict(p["fault_weights"]) if p["fault_weights"] else None
+    app.REPAIR_MINUTES = {True: dict(p["repair_minutes"]["correct"]), False: dict(p["repair_minutes"]["incorrect"])}
+    app.STOP_WORK_CRITICAL_WRONG = p["stop_work_critical_wrong"]
+    app.WATCH_ESCALATIONS = p["watch_escalations"]
+    app.STOP_WORK_HIGH_SLA_BREACHES = p["stop_work_high_breaches"]
+    return previous
+
+
+def _row(summary: dict, names: dict) -> dict:
+    out = {}
+    for metric in RESULT_METRICS:
+        m = summary[names.get(metric, metric)]
+        out[metric] = m["mean"]
+        out[f"{metric}_ci"] = round((m["ci_high"] - m["ci_low"]) / 2, 4)
+    out["stop_work_share"] = summary["stop_work_share"]
+    return out
+
+
+def evaluate_point(params: dict, backend: str, reps: int, seed) -> dict:
+    started = time.perf_counter()
+    if backend == "montecarlo":
+        result = _row(montecarlo.summarize(montecarlo.run_replications(reps, params, seed=seed)), {})
+    else:
+        if isinstance(params["accuracy"], dict):
+            raise ValueError("The engine backend takes a single accuracy value")
+        previous = _configure_app(params)
+        try:
+            with tempfile.TemporaryDirectory(prefix="sweep_") as tmp:
+                runs = replications.run_replications(
+                    reps,
+                    workers=1,
+                    base_seed=seed,
+                    out_dir=tmp,
+                    virtual_hours=params["shift_hours"],
+                    start=datetime(2026, 1, 5, 6, 0, 0),
+                    policy=f"random:{params['accuracy']}",
+                    persist=True,
+                    stop_on_stop_work=params["stop_on_stop_work"],
+                    arrival_mean_min=params["arrival_mean_min"],
+                    followup_mean_min=params["followup_mean_min"],
+                    scan_interval_min=params["scan_interval_min"],
+                )
+        finally:
+            for name, value in previous.items():
+                setattr(app, name, value)
+        names = {"faults": "events", "sla_breaches": "sla_breaches_total", "high_sla_breaches": "high_sla_breaches_total"}
+        result = _row(replications.merge_summaries(runs), names)
+    result["elapsed_sec"] = round(time.perf_counter() - started, 4)
+    return result
+
+
+def _evaluate_task(task: tuple) -> tuple:
+    key, params, backend, reps, seed = task
+    return key, evaluate_point(params, backend, reps, seed)
+
+
+# ----------------------------
+# SWEEP DRIVER
+# ----------------------------
+def _cache_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def load_cached(cache_dir: str, key: str):
+    try:
+        with open(_cache_path(cache_dir, key), "r", encoding="utf-8") as f:
+            return json.load(f)["result"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def run_sweep(
+    grid: dict,
+    backend: str = "montecarlo",
+    replications_per_point: int = 2000,
+    seed=0,
+    workers: int | None = None,
+    cache_dir: str | None = SWEEP_CACHE_DIR,
+) -> list:
+    """
+    Evaluates every grid point (parallel over points), reusing cached ones.
+    Returns one dict per point: the overrides, the metrics and `cached`.
+    """
+    if backend not in ("montecarlo", "engine"):
+        raise ValueError(f"Unknown sweep backend: {backend}")
+    points = expand_grid(grid)
+    rows, todo, queued = [], [], set()
+    for overrides in points:
+        params = resolve_params(overrides)
+        key = point_key(params, backend, replications_per_point, seed)
+        cached = load_cached(cache_dir, key) if cache_dir else None
+        rows.append({"point": overrides, "key": key, "result": cached, "cached": cached is not None})
+        if cached is None and key not in queued:   # overrides equal to the defaults share a key
+            queued.add(key)
+            todo.append((key, params, backend, replications_per_point, seed))
+
+    if cache_dir and todo:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    results = {}
+    params_by_key = {t[0]: t[1] for t in todo}
+
+    def store(key, result):
+        results[key] = result
+        if cache_dir:
+            params = params_by_key[key]
+            write_atomic(_cache_path(cache_dir, key), json.dumps({"params": params, "result": result}, indent=2))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(todo) <= 1:
+        for task in todo:
+            store(*_evaluate_task(task))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            for future in as_completed([pool.submit(_evaluate_task, t) for t in todo]):
+                store(*future.result())   # cached as each point finishes
+
+    for row in rows:
+        if row["result"] is None:
+            row["result"] = results[row["key"]]
+    return rows
+
+
+def write_sweep_csv(path: str, rows: list):
+    if not rows:
+        return
+    point_cols = list(rows[0]["point"])
+    metric_cols = list(rows[0]["result"])
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(point_cols + metric_cols + ["cached"])
+        for r in rows:
+            w.writerow([r["point"][c] for c in point_cols] + [r["result"].get(c, "") for c in metric_cols] + [r["cached"]])
+
+
+def print_sweep(rows: list):
+    if not rows:
+        print("Empty grid.")
+        return
+    point_cols = list(rows[0]["point"])
+    widths = [max(len(c), 8) for c in point_cols]
+    head = "  ".join(f"{c:<{w}}" for c, w in zip(point_cols, widths))
+    print(f"{head}  {'ACC %':>7} {'ESC':>7} {'BREACH':>7} {'HIGH BR':>7} {'STOP %':>7}")
+    print("-" * (len(head) + 42))
+    for r in rows:
+        res = r["result"]
+        vals = "  ".join(f"{str(r['point'][c]):<{w}}" for c, w in zip(point_cols, widths))
+        print(
+            f"{vals}  {res['accuracy_pct']:>7.2f} {res['escalations']:>7.3f} {res['sla_breaches']:>7.3f} "
+            f"{res['high_sla_breaches']:>7.3f} {res['stop_work_share'] * 100:>7.2f}" + ("  (cached)" if r["cached"] else "")
+        )
+
+
+def _parse_value(text: str):
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="What-if parameter sweep with on-disk result caching.")
+    p.add_argument("-p", "--param", action="append", default=[], metavar="NAME=V1,V2,...",
+                   help='grid axis, e.g. -p sla.HIGH=15,30 -p "weight.Power Surge=1,2"')
+    p.add_argument("--grid", default=None, help="JSON file {name: [values]} (merged with -p)")
+    p.add_argument("--backend", choices=["montecarlo", "engine"], default="montecarlo")
+    p.add_argument("-r", "--replications", type=int, default=2000, help="replications per grid point")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("-w", "--workers", type=int, default=None)
+    p.add_argument("--cache-dir", default=SWEEP_CACHE_DIR)
+    p.add_argument("--no-cache", action="store_true")
+    p.add_argument("--csv", default=None, help="write results to this CSV")
+    args = p.parse_args(argv)
+
+    grid = {}
+    if args.grid:
+        with open(args.grid, "r", encoding="utf-8") as f:
+            grid.update(json.load(f))
+    for spec in args.param:
+        name, _, values = spec.partition("=")
+        grid[name.strip()] = [_parse_value(v.strip()) for v in values.split(",") if v.strip()]
+
+    started = time.perf_counter()
+    rows = run_sweep(
+        grid,
+        backend=args.backend,
+        replications_per_point=args.replications,
+        seed=args.seed,
+        workers=args.workers,
+        cache_dir=None if args.no_cache else args.cache_dir,
+    )
+    print_sweep(rows)
+    fresh = sum(1 for r in rows if not r["cached"])
+    print(f"\n{len(rows)} points ({fresh} computed, {len(rows) - fresh} cached) in {time.perf_counter() - started:.2f}s")
+    if args.csv:
+        write_sweep_csv(args.csv, rows)
+
+
+if __name__ == "__main__":
+    main()
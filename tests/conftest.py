@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repo root (no package), like the CLI scripts expect
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import app  # noqa: E402
+from wo_store import WorkOrderStore  # noqa: E402
+
+COLUMNS = app.WORK_ORDER_COLUMNS
+
+
+def wo_row(wo_id: str, **values) -> dict:
+    row = {"WO_ID": wo_id, "Status": "OPEN", "Priority": "MEDIUM", "SLA_Minutes": "240", "Fault": "Motor Overload"}
+    row.update(values)
+    return row
+
+
+@pytest.fixture
+def open_store(tmp_path):
+    """open_store(**kw) -> WorkOrderStore on tmp_path's work_orders.csv / .log, shared lock file."""
+    stores = []
+
+    def _open(**kw):
+        kw.setdefault("lock_path", str(tmp_path / "work_orders.csv.lock"))
+        store = WorkOrderStore(str(tmp_path / "work_orders.csv"), COLUMNS, str(tmp_path / "work_orders.log"), **kw)
+        stores.append(store)
+        return store
+
+    yield _open
+    for store in stores:
+        store.close()
+
+
+@pytest.fixture(params=["csv", "sqlite"])
+def app_dir(request, tmp_path, monkeypatch):
+    """app's work order store opened fresh in tmp_path, once per storage backend."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app, "STORAGE_BACKEND", request.param)
+    app.close_work_order_store()
+    yield tmp_path
+    app.close_work_order_store()
+
+
+def peer_store():
+    """A second console on the same files as app's store."""
+    if app.STORAGE_BACKEND == "sqlite":
+        return app.open_sqlite_store(import_csv=False)
+    return WorkOrderStore(
+        app.WORK_ORDERS_CSV,
+        COLUMNS,
+        app.WORK_ORDERS_LOG,
+        lock_path=app.WORK_ORDERS_CSV + ".lock",
+    )
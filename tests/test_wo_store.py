@@ -0,0 +1,214 @@
+import csv
+import multiprocessing
+import os
+
+import pytest
+
+import app
+from conftest import peer_store, wo_row
+from wo_store import VersionConflict
+
+
+def _csv_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return {r["WO_ID"]: r for r in csv.DictReader(f)}
+
+
+def _state(store):
+    return {r["WO_ID"]: dict(r) for r in store.rows}
+
+
+# ----------------------------
+# INDEX + CHANGE LOG
+# ----------------------------
+def test_appends_and_updates_replay_from_log(open_store):
+    store = open_store()
+    store.append(wo_row("WO-000001"))
+    store.append(wo_row("WO-000002"))
+    assert store.update("WO-000001", {"Status": "IN_PROGRESS"})
+    assert not store.update("WO-000404", {"Status": "CLOSED"})
+
+    assert store.get("WO-000001")["Status"] == "IN_PROGRESS"
+    assert len(store) == 2
+    assert not os.path.exists(store.csv_path)   # nothing compacted yet: all of it is in the log
+
+    assert _state(open_store()) == _state(store)
+
+
+def test_compaction_folds_log_into_csv(open_store):
+    store = open_store()
+    for i in range(1, 4):
+        store.append(wo_row(f"WO-{i:06d}"))
+    store.update("WO-000002", {"Status": "CLOSED"})
+
+    store.compact()
+    assert os.path.getsize(store.log_path) == 0
+    assert _csv_rows(store.csv_path) == _state(store)
+
+    assert _state(open_store()) == _state(store)
+
+
+def test_compaction_archives_evicted_rows(open_store):
+    archived = []
+    store = open_store(evict=lambda r: r["Status"] == "CLOSED", archive=archived.extend)
+    for i in range(1, 4):
+        store.append(wo_row(f"WO-{i:06d}"))
+    store.update("WO-000002", {"Status": "CLOSED"})
+
+    assert store.compact() == 1
+    assert [r["WO_ID"] for r in archived] == ["WO-000002"]
+    assert set(_csv_rows(store.csv_path)) == {"WO-000001", "WO-000003"}
+    assert store.get("WO-000002") is None
+
+    assert _state(open_store()) == _state(store)
+
+
+def test_torn_log_tail_is_ignored_on_replay(open_store):
+    store = open_store()
+    store.append(wo_row("WO-000001"))
+    store.update("WO-000001", {"Status": "IN_PROGRESS"})
+    with open(store.log_path, "ab") as f:
+        f.write(b'{"op": "set", "wo": "WO-000001", "set": {"Status": "CLO')   # crash mid-write
+
+    assert open_store().get("WO-000001")["Status"] == "IN_PROGRESS"
+
+
+def test_crash_between_csv_replace_and_log_truncate_replays_idempotently(open_store):
+    store = open_store()
+    for i in range(1, 4):
+        store.append(wo_row(f"WO-{i:06d}"))
+    store.update("WO-000001", {"Status": "IN_PROGRESS"})
+    store.update("WO-000002", {"Status": "BREACHED"})
+    store.update("WO-000003", {"Status": "CLOSED"})
+    with open(store.log_path, "rb") as f:
+        log = f.read()
+    expected = _state(store)
+
+    store.compact()
+    with open(store.log_path, "wb") as f:   # the new CSV landed, the log was never truncated
+        f.write(log)
+
+    recovered = open_store()
+    assert _state(recovered) == expected
+    recovered.compact()
+    assert _csv_rows(store.csv_path) == expected
+
+
+# ----------------------------
+# SEVERAL PROCESSES ON THE SAME FILES
+# ----------------------------
+def test_updates_bump_row_version(open_store):
+    store = open_store()
+    store.append(wo_row("WO-000001"))
+    store.append(wo_row("WO-000002"))
+    assert store.update("WO-000001", {"Status": "IN_PROGRESS"})
+    assert store.update_many([("WO-000001", {"Assigned_Tech": "T-01"}), ("WO-000404", {"Status": "CLOSED"})]) == [
+        "WO-000001"
+    ]
+
+    assert store.row_version(store.get("WO-000001")) == 3
+    assert store.row_version(store.get("WO-000002")) == 1
+    assert _state(open_store()) == _state(store)
+
+
+def test_torn_log_tail_is_trimmed_before_the_next_write(open_store):
+    store = open_store()
+    store.append(wo_row("WO-000001"))
+    store.close()
+    with open(store.log_path, "ab") as f:
+        f.write(b'{"op": "set", "wo": "WO-000001", "set": {"Status": "CLO')   # crash mid-write
+
+    # The next record must not be glued onto the partial line
+    open_store().update("WO-000001", {"Status": "IN_PROGRESS"})
+    assert open_store().get("WO-000001")["Status"] == "IN_PROGRESS"
+
+
+def test_second_store_catches_up_on_log_and_compaction(open_store):
+    a, b = open_store(), open_store()
+    a.append(wo_row("WO-000001"))
+    b.refresh()
+    assert b.get("WO-000001") is not None
+
+    a.update("WO-000001", {"Status": "IN_PROGRESS"})
+    a.compact()
+    a.update("WO-000001", {"Assigned_Tech": "T-02"})
+    b.poll()
+    assert b.reloads == 1
+    assert _state(b) == _state(a)
+
+
+def test_stale_expected_version_raises_conflict(open_store):
+    a, b = open_store(), open_store()
+    a.append(wo_row("WO-000001"))
+    b.refresh()
+    seen = b.row_version(b.get("WO-000001"))
+
+    assert a.update("WO-000001", {"Status": "IN_PROGRESS"}, expected_version=seen)
+    with pytest.raises(VersionConflict) as err:
+        b.update("WO-000001", {"Status": "CLOSED"}, expected_version=seen)
+    assert (err.value.expected, err.value.actual) == (1, 2)
+    assert b.conflicts == 1
+    assert b.get("WO-000001")["Status"] == "IN_PROGRESS"
+    assert b.update_many([("WO-000001", {"Status": "CLOSED"}, seen)]) == []
+
+
+def test_modify_work_order_retries_after_conflict(app_dir):
+    app.append_work_order_to_queue(wo_row("WO-000001", Repair_Time_Min="0"))
+    peer = peer_store()
+    calls = []
+
+    def bump(row):
+        if not calls:
+            # Another console writes between our read and our write
+            peer.update("WO-000001", {"Repair_Time_Min": "10"})
+        calls.append(row["Repair_Time_Min"])
+        return {"Repair_Time_Min": str(int(row["Repair_Time_Min"]) + 1)}
+
+    assert app.modify_work_order("WO-000001", bump)
+    assert calls == ["0", "10"]
+    row = app.get_work_order_store().get("WO-000001")
+    assert (row["Repair_Time_Min"], row["Row_Version"]) == ("11", "3")
+
+    def always_raced(row):
+        peer.update("WO-000001", {"Closeout_Notes": row["Row_Version"]})
+        return {"Status": "CLOSED"}
+
+    with pytest.raises(VersionConflict):
+        app.modify_work_order("WO-000001", always_raced, retries=1)
+    assert app.get_work_order_store().get("WO-000001")["Status"] == "OPEN"
+    peer.close()
+
+
+def _increment_worker(directory: str, backend: str, wo_ids: list, n: int, tag: int):
+    os.chdir(directory)
+    app.STORAGE_BACKEND = backend
+    for i in range(n):
+        app.modify_work_order(
+            wo_ids[i % len(wo_ids)], lambda row: {"Repair_Time_Min": str(int(row["Repair_Time_Min"]) + 1)}, retries=1000
+        )
+        app.append_work_order_to_queue(wo_row(f"WO-{tag}{i:05d}"))
+    app.close_work_order_store()
+
+
+def test_concurrent_writers_lose_no_updates(app_dir):
+    wo_ids = ["WO-000001", "WO-000002"]
+    for wo_id in wo_ids:
+        app.append_work_order_to_queue(wo_row(wo_id, Repair_Time_Min="0"))
+    app.close_work_order_store()
+
+    writers, n = 4, 25
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(target=_increment_worker, args=(str(app_dir), app.STORAGE_BACKEND, wo_ids, n, tag))
+        for tag in range(1, writers + 1)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(120)
+    assert [p.exitcode for p in procs] == [0] * writers
+
+    store = app.get_work_order_store()
+    assert sum(int(store.get(wo_id)["Repair_Time_Min"]) for wo_id in wo_ids) == writers * n
+    ids = [r["WO_ID"] for r in store.iter_rows()]
+    assert len(ids) == len(set(ids)) == len(wo_ids) + writers * n
@@ -0,0 +1,118 @@
+import csv
+import glob
+import os
+import re
+from datetime import datetime
+
+
+# ----------------------------
+# WORK ORDER ARCHIVE (DATED PARTITIONS)
+# ----------------------------
+class WorkOrderArchive:
+    """
+    Work orders that can never become active again, moved out of the live
+    work_orders.csv into append-only monthly partitions:
+    - <directory>/<prefix>_<YYYY-MM>.csv, month from date_of(row)
+      (rows without a date go to <prefix>_undated.csv)
+    - append() only ever adds rows, fsync'd before it returns, so the caller
+      can drop them from the live file afterwards
+    - iter_rows(start, end) opens only the partitions whose month overlaps
+      [start, end] (partition pruning); undated rows are read only for
+      unbounded queries
+    A crash between the archive append and the live-file rewrite can archive
+    a row twice; both copies land in the same partition and iter_rows
+    yields it once.
+    """
+
+    UNDATED = "undated"
+
+    def __init__(self, directory: str, columns: list, date_of, prefix: str = "work_orders"):
+        self.directory = directory
+        self.columns = list(columns)
+        self.date_of = date_of     # row -> datetime or None
+        self.prefix = prefix
+        self._pattern = re.compile(rf"^{re.escape(prefix)}_(\d{{4}}-\d{{2}}|{self.UNDATED})\.csv$")
+        self.bytes_written = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{self.prefix}_{key}.csv")
+
+    def partition_key(self, row: dict) -> str:
+        dt = self.date_of(row)
+        return f"{dt:%Y-%m}" if dt else self.UNDATED
+
+    def append(self, rows: list) -> int:
+        """Appends rows to their partitions; returns the number of rows archived."""
+        if not rows:
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        by_key = {}
+        for row in rows:
+            by_key.setdefault(self.partition_key(row), []).append(row)
+
+        for key, part in sorted(by_key.items()):
+            path = self._path(key)
+            fresh = not os.path.exists(path) or os.path.getsize(path) == 0
+            columns = self.columns if fresh else self._header(path)
+            with open(path, "a", newline="", encoding="utf-8") as f:
+                start = f.tell()
+                w = csv.writer(f)
+                if fresh:
+                    w.writerow(columns)
+                for row in part:
+                    w.writerow([row.get(col, "") for col in columns])
+                f.flush()
+                os.fsync(f.fileno())
+                self.bytes_written += f.tell() - start
+        return len(rows)
+
+    @staticmethod
+    def _header(path: str) -> list:
+        # A partition keeps the layout it was started with, even after columns are added
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            return next(csv.reader(f), [])
+
+    def partitions(self, start: datetime | None = None, end: datetime | None = None) -> list:
+        """[(key, path)] oldest first, pruned to months overlapping [start, end]."""
+        lo = f"{start:%Y-%m}" if start else None
+        hi = f"{end:%Y-%m}" if end else None
+        found = []
+        for path in glob.glob(os.path.join(glob.escape(self.directory), f"{self.prefix}_*.csv")):
+            m = self._pattern.match(os.path.basename(path))
+            if not m:
+                continue
+            key = m.group(1)
+            if key == self.UNDATED:
+                if lo is None and hi is None:
+                    found.append(("9999-99", key, path))   # undated last
+                continue
+            if (lo is not None and key < lo) or (hi is not None and key > hi):
+                continue
+            found.append((key, key, path))
+        return [(key, path) for _order, key, path in sorted(found)]
+
+    def iter_rows(self, start: datetime | None = None, end: datetime | None = None):
+        """Archived rows (dicts) dated within [start, end], partition by partition."""
+        bounded = start is not None or end is not None
+        for _key, path in self.partitions(start, end):
+            seen = set()
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    wo_id = row.get("WO_ID", "")
+                    if wo_id in seen:
+                        continue
+                    seen.add(wo_id)
+                    if bounded:
+                        dt = self.date_of(row)
+                        if dt is None or (start is not None and dt < start) or (end is not None and dt > end):
+                            continue
+                    yield row
+
+    def max_wo_number(self) -> int:
+        """Highest WO-###### in any partition (WO counter recovery)."""
+        best = 0
+        for row in self.iter_rows():
+            wo_id = row.get("WO_ID", "")
+            if wo_id.startswith("WO-") and wo_id[3:].isdigit():
+                best = max(best, int(wo_id[3:]))
+        return best
@@ -0,0 +1,156 @@
+import json
+import os
+
+from file_lock import FileLock
+
+
+# ----------------------------
+# WORK ORDER DOCUMENT CONTAINER
+# ----------------------------
+class DocumentContainer:
+    """
+    Rendered work orders in one append-only file instead of one .txt each:
+    - <path>:     records "<key>\\t<kind>\\t<length>\\n<payload>\\n", never rewritten
+    - <path>.idx: "<key>\\t<kind>\\t<offset>\\t<length>\\n" per record, loaded on open;
+                  records the index missed (crash between the two appends)
+                  are recovered by scanning the data file past the last one
+    - kind "text" is the rendered document; kind "fields" is the JSON of the
+      template fields, rendered by render(fields) on first get() and appended
+      back as "text" so later reads are a single seek + read
+    The latest record for a key wins.
+
+    Several processes can share the container: an append (data record + its
+    index line) runs under a FileLock on <path>.lock, after catching up on the
+    index lines other processes added since we last read. A get() for a key
+    the index does not know catches up the same way before giving up.
+    """
+
+    def __init__(self, path: str, render=None, lock_timeout: float = 10.0):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.render = render
+        self.index = {}          # key -> (kind, offset, length)
+        self.bytes_written = 0
+        self.renders = 0
+        self._data = None        # append handle
+        self._idx = None
+        self._reader = None
+        self._lock = FileLock(path + ".lock", timeout=lock_timeout)
+        self._end = 0            # data bytes covered by self.index
+        self._idx_pos = 0        # index bytes already read
+        with self._lock:
+            self._sync()
+
+    # ---------- loading ----------
+    def _sync(self):
+        # Under the lock: read index lines added since _idx_pos, index data
+        # records the index missed, and drop torn tails (nobody is mid-write)
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                f.seek(self._idx_pos)
+                for line in f:
+                    parts = line.rstrip(b"\n").decode("utf-8", "replace").split("\t")
+                    if not line.endswith(b"\n") or len(parts) != 4:
+                        break   # torn tail
+                    key, kind, offset, length = parts[0], parts[1], int(parts[2]), int(parts[3])
+                    if offset + length + 1 > size:
+                        break
+                    self._idx_pos += len(line)
+                    self.index[key] = (kind, offset, length)
+                    self._end = max(self._end, offset + length + 1)
+            if os.path.getsize(self.index_path) > self._idx_pos:
+                os.truncate(self.index_path, self._idx_pos)
+        if self._end < size:
+            self._recover(self._end, size)
+            if self._end < size:
+                os.truncate(self.path, self._end)
+
+    def _recover(self, start: int, size: int):
+        found = []
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            while f.tell() < size:
+                header = f.readline()
+                parts = header.rstrip(b"\n").decode("utf-8", "replace").split("\t")
+                if not header.endswith(b"\n") or len(parts) != 3 or not parts[2].isdigit():
+                    break   # torn record
+                offset, length = f.tell(), int(parts[2])
+                if offset + length + 1 > size:
+                    break
+                f.seek(offset + length + 1)
+                found.append((parts[0], parts[1], offset, length))
+        for key, kind, offset, length in found:
+            self.index[key] = (kind, offset, length)
+            self._end = offset + length + 1
+        if found:
+            self._write_index(found)
+
+    def _write_index(self, entries: list):
+        if self._idx is None:
+            self._idx = open(self.index_path, "ab")
+        self._idx.write("".join(f"{k}\t{kind}\t{o}\t{n}\n" for k, kind, o, n in entries).encode("utf-8"))
+        self._idx.flush()
+        self._idx_pos = self._idx.tell()
+
+    # ---------- public API ----------
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key: str):
+        return key in self.index
+
+    def ref(self, key: str) -> str:
+        """Work_Order_File value for a document in this container."""
+        return f"{os.path.basename(self.path)}#{key}"
+
+    def _append(self, key: str, kind: str, payload: bytes) -> int:
+        header = f"{key}\t{kind}\t{len(payload)}\n".encode("utf-8")
+        with self._lock:
+            self._sync()
+            if self._data is None:
+                self._data = open(self.path, "ab")
+            start = self._data.seek(0, os.SEEK_END)
+            self._data.write(header + payload + b"\n")
+            self._data.flush()
+            offset = start + len(header)
+            self.index[key] = (kind, offset, len(payload))
+            self._end = offset + len(payload) + 1
+            self._write_index([(key, kind, offset, len(payload))])
+        n = len(header) + len(payload) + 1
+        self.bytes_written += n
+        return n
+
+    def put(self, key: str, text: str) -> int:
+        """Stores a rendered document; returns bytes written."""
+        return self._append(key, "text", text.encode("utf-8"))
+
+    def put_fields(self, key: str, fields: dict) -> int:
+        """Stores template fields only; the text is rendered on first get()."""
+        return self._append(key, "fields", json.dumps(fields, ensure_ascii=False, default=str).encode("utf-8"))
+
+    def get(self, key: str):
+        entry = self.index.get(key)
+        if entry is None:
+            with self._lock:   # another process may have appended it
+                self._sync()
+            entry = self.index.get(key)
+            if entry is None:
+                return None
+        kind, offset, length = entry
+        if self._reader is None:
+            self._reader = open(self.path, "rb")
+        self._reader.seek(offset)
+        payload = self._reader.read(length).decode("utf-8")
+        if kind == "text":
+            return payload
+        text = self.render(json.loads(payload))
+        self.renders += 1
+        self.put(key, text)
+        return text
+
+    def close(self):
+        for f in (self._data, self._idx, self._reader):
+            if f is not None:
+                f.close()
+        self._data = self._idx = self._reader = None
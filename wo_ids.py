@@ -0,0 +1,74 @@
+from file_lock import FileLock, write_atomic
+
+
+# ----------------------------
+# WORK ORDER ID ALLOCATOR
+# ----------------------------
+def _read_counter(path: str):
+    """The counter's high-water mark, or None if the file is missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+class WorkOrderIdAllocator:
+    """
+    Hands out WO-000123 style IDs safe across processes and crashes.
+    - wo_counter.txt holds the highest number reserved by any process
+    - each process reserves block_size numbers at a time under a file lock,
+      rewriting the counter via temp file + atomic rename; IDs inside the
+      block are handed out from memory
+    - the first reservation also takes recover(deep) into account, so a stale
+      counter can never re-issue an existing ID: deep=False (counter file
+      readable) only needs the live queue, deep=True (missing / unreadable)
+      the archived IDs too. It runs before the counter lock is taken, because
+      it may need the work order store lock and writers hold that one while
+      they allocate IDs (taking it second would be an ABBA deadlock)
+    - release() gives unused numbers back if nobody reserved after us
+    A crash just leaves a gap in the numbering, never a duplicate.
+    """
+
+    def __init__(self, counter_path: str, block_size: int = 100, recover=None):
+        self.counter_path = counter_path
+        self.block_size = max(int(block_size), 1)
+        self.recover = recover
+        self._next = 1
+        self._end = 0          # last number in the current block
+        self._recovered = False
+
+    def _lock(self):
+        return FileLock(self.counter_path + ".lock")
+
+    def _reserve_block(self):
+        floor = 0
+        if not self._recovered and self.recover is not None:
+            # IDs issued after this point come from the counter, so a floor
+            # read outside the lock is still a safe lower bound
+            floor = int(self.recover(_read_counter(self.counter_path) is None) or 0)
+            self._recovered = True
+        with self._lock():
+            current = max(_read_counter(self.counter_path) or 0, floor)
+            end = current + self.block_size
+            write_atomic(self.counter_path, str(end))
+        self._next = current + 1
+        self._end = end
+
+    def next_number(self) -> int:
+        if self._next > self._end:
+            self._reserve_block()
+        n = self._next
+        self._next += 1
+        return n
+
+    def next_id(self) -> str:
+        return f"WO-{self.next_number():06d}"
+
+    def release(self):
+        if self._next > self._end:
+            return
+        with self._lock():
+            if _read_counter(self.counter_path) == self._end:
+                write_atomic(self.counter_path, str(self._next - 1))
+        self._next, self._end = 1, 0
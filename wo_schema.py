@@ -0,0 +1,105 @@
+import csv
+import os
+from contextlib import nullcontext
+
+
+# ----------------------------
+# VERSIONED CSV SCHEMA
+# ----------------------------
+class CsvSchema:
+    """
+    Versioned header of a CSV table:
+    - versions[i] is the exact header of schema version i + 1; the last one
+      is current
+    - migrations[v](row) upgrades a row dict from version v to v + 1 in place
+    - a header that matches no version is remapped by column name and then
+      run through every migration (version 0), so migrations must only fill
+      columns that are blank
+
+    ensure(path) only reads the header line, and is skipped entirely while the
+    file's (inode, mtime) is the one last checked. An upgrade is a single
+    streaming pass into a temp file that is fsync'd and os.replace()d over the
+    original, so an interrupted migration leaves the old file untouched. Pass
+    the lock the file's writers hold (ensure(path, lock=...)) and the rewrite
+    runs under it, with the header read again once the lock is held.
+    """
+
+    def __init__(self, versions: list, migrations: dict):
+        self.versions = [list(v) for v in versions]
+        self.migrations = dict(migrations)
+        self.columns = self.versions[-1]
+        self.version = len(self.versions)
+        self._checked = {}   # abspath -> (st_ino, st_mtime_ns) known to be current
+
+    def detect(self, header: list) -> int:
+        """Schema version of `header` (0 = unknown layout)."""
+        for i, cols in enumerate(self.versions, start=1):
+            if header == cols:
+                return i
+        return 0
+
+    @staticmethod
+    def _stamp(path: str):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns
+
+    def is_current(self, path: str) -> bool:
+        stamp = self._stamp(path)
+        return stamp is not None and self._checked.get(os.path.abspath(path)) == stamp
+
+    @staticmethod
+    def _read_header(path: str):
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            return next(csv.reader(f), None)
+
+    def ensure(self, path: str, lock=None) -> int:
+        """
+        Creates `path` with the current header or migrates it to the current
+        version. Returns the bytes written (0 if the file was already current).
+        `lock` (a context manager, e.g. the store's FileLock) is held around
+        the rewrite so a concurrent writer or compaction cannot be clobbered.
+        """
+        if self.is_current(path):
+            return 0
+
+        written = 0
+        if self._read_header(path) != self.columns:
+            with lock or nullcontext():
+                # Another process may have created or migrated it meanwhile
+                header = self._read_header(path)
+                if header != self.columns:
+                    written = self._rewrite(path, header)
+        self._checked[os.path.abspath(path)] = self._stamp(path)
+        return written
+
+    def _rewrite(self, path: str, header):
+        version = self.detect(header) if header else self.version
+        steps = [self.migrations[v] for v in range(max(version, 1), self.version) if v in self.migrations]
+        columns = self.columns
+
+        tmp = f"{path}.{os.getpid()}.migrating"
+        with open(tmp, "w", newline="", encoding="utf-8") as dst:
+            w = csv.writer(dst)
+            w.writerow(columns)
+            if header:
+                width = len(header)
+                with open(path, "r", newline="", encoding="utf-8") as src:
+                    reader = csv.reader(src)
+                    next(reader, None)
+                    for r in reader:
+                        if len(r) < width:
+                            r = r + [""] * (width - len(r))
+                        row = dict(zip(header, r))
+                        for step in steps:
+                            step(row)
+                        w.writerow([row.get(c, "") for c in columns])
+            dst.flush()
+            os.fsync(dst.fileno())
+            written = dst.tell()
+        os.replace(tmp, path)
+        return written
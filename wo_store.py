@@ -0,0 +1,440 @@
+import csv
+import json
+import os
+from contextlib import contextmanager
+
+from file_lock import FileLock
+
+
+# ----------------------------
+# WORK ORDER STORE (INDEXED + CHANGE LOG)
+# ----------------------------
+class VersionConflict(Exception):
+    """An update's expected_version no longer matches the row: someone else wrote it first."""
+
+    def __init__(self, wo_id: str, expected: int, actual: int):
+        super().__init__(f"{wo_id}: expected version {expected}, found {actual}")
+        self.wo_id = wo_id
+        self.expected = expected
+        self.actual = actual
+
+
+def _file_stamp(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class WorkOrderStore:
+    """
+    In-memory work order table backed by:
+    - work_orders.csv (base snapshot, WORK_ORDER_COLUMNS layout)
+    - an append-only JSONL change log (one record per append/update)
+
+    Lookups and updates go through a WO_ID hash index (O(1)); the CSV is only
+    rewritten on compaction, which runs once the log grows past
+    max(compact_min, compact_ratio * rows) records (amortized O(1) per change).
+    With evict + archive set, compaction also hands rows that are done
+    (e.g. CLOSED) to archive(rows) and drops them, so the live file only
+    holds rows that can still change.
+    poll() picks up what other processes wrote to the same files: new
+    change-log records are replayed from the last byte offset this process
+    read, and a CSV that another process compacted (new inode/mtime/size) is
+    reloaded.
+
+    Several processes can share the files when lock_path is set:
+    - every write (and compaction) runs under an advisory FileLock, and first
+      catches up on what other writers did, the same way poll() does
+    - rows carry a version counter (version_column, when it is one of the
+      columns) bumped by every update; update(..., expected_version=v)
+      raises VersionConflict if the row moved on since v was read, so a
+      read-modify-write done outside the lock can retry instead of
+      overwriting someone else's change
+    """
+
+    def __init__(
+        self,
+        csv_path: str,
+        columns: list,
+        log_path: str,
+        compact_min: int = 1000,
+        compact_ratio: float = 0.5,
+        record_class=None,
+        evict=None,
+        archive=None,
+        lock_path: str | None = None,
+        lock_timeout: float = 10.0,
+        version_column: str = "Row_Version",
+    ):
+        self.csv_path = csv_path
+        self.columns = list(columns)
+        self.log_path = log_path
+        self.compact_min = compact_min
+        self.compact_ratio = compact_ratio
+        self.record_class = record_class   # e.g. records.make_record_class(...); None = plain dicts
+        self.evict = evict                 # row -> True if compaction should archive it
+        self.archive = archive             # fn(rows), must be durable when it returns
+        self.version_column = version_column if version_column in self.columns else None
+
+        self.rows = []       # file order (oldest first)
+        self.index = {}      # WO_ID -> row (same objects as self.rows)
+        self.pending = 0     # log records since last compaction
+        self.bytes_written = 0   # change log + compaction bytes (metrics)
+        self.reloads = 0     # full reloads after another process compacted
+        self.conflicts = 0   # updates rejected by a version check
+        self.listeners = []  # fn(row) called after every append/update (indexes hook in here)
+        self.drop_listeners = []   # fn(row) called for rows that left the store (archived / reloaded away)
+        self._log = None
+        self._lock = FileLock(lock_path, timeout=lock_timeout) if lock_path else None
+        self._lock_depth = 0
+        self._csv_stamp = None   # (inode, mtime_ns, size) of the CSV as loaded / last compacted
+        self._log_pos = 0        # change-log bytes already applied
+
+        if self._lock is None:
+            self._load()
+        else:
+            with self._lock:
+                self._load()
+                self._trim_torn_tail()
+
+    # ---------- loading ----------
+    def _blank_row(self):
+        if self.record_class is not None:
+            return self.record_class()
+        return {col: "" for col in self.columns}
+
+    def _normalize(self, values: dict) -> dict:
+        return {k: ("" if v is None else str(v)) for k, v in values.items() if k in self.columns}
+
+    def _load(self):
+        self.rows, self.index, self.pending = [], {}, 0
+        self._csv_stamp = None
+        if os.path.exists(self.csv_path):
+            with open(self.csv_path, "r", newline="", encoding="utf-8") as f:
+                st = os.fstat(f.fileno())
+                self._csv_stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+                for r in csv.DictReader(f):
+                    row = self._blank_row()
+                    row.update(self._normalize(r))
+                    self._put(row)
+
+        records, self._log_pos = self._read_log(0)
+        for rec in records:
+            self._apply(rec)
+        self.pending = len(records)
+
+    def _read_log(self, start: int):
+        """Complete records from byte offset start on; returns (records, offset after the last one)."""
+        records = []
+        pos = start
+        try:
+            f = open(self.log_path, "rb")
+        except FileNotFoundError:
+            return records, 0
+        with f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn write from a crash: ignore the partial tail
+                pos += len(line)
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records, pos
+
+    def _catch_up(self, trim: bool = True):
+        # Pick up what other writers did since we last looked. Under the lock
+        # unless trim=False (poll): a compaction racing with us at worst
+        # replays an old log onto the new CSV (idempotent) and reloads next time
+        size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        if _file_stamp(self.csv_path) != self._csv_stamp or size < self._log_pos:
+            before = self.index
+            self._load()
+            self.reloads += 1
+            for wo_id, row in before.items():
+                if wo_id not in self.index:
+                    self._notify_drop(row)
+            for row in self.rows:
+                self._notify(row)
+        elif size > self._log_pos:
+            records, self._log_pos = self._read_log(self._log_pos)
+            touched = set()
+            for rec in records:
+                self._apply(rec)
+                _touched_ids(rec, touched)
+            self.pending += len(records)
+            for wo_id in touched:
+                row = self.index.get(wo_id)
+                if row is not None:
+                    self._notify(row)
+        if trim:
+            self._trim_torn_tail()
+
+    def _trim_torn_tail(self):
+        # Nobody is mid-write while we hold the lock, so bytes past the last
+        # complete record are a crashed writer's partial line: drop them, or
+        # the next record would be glued onto it and lost on replay
+        if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > self._log_pos:
+            os.truncate(self.log_path, self._log_pos)
+
+    @contextmanager
+    def _locked(self):
+        # Re-entrant: compaction inside update() reuses the lock already held
+        if self._lock is None:
+            yield
+            return
+        if self._lock_depth == 0:
+            self._lock.acquire()
+            try:
+                self._catch_up()
+            except BaseException:
+                self._lock.release()
+                raise
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0:
+                self._lock.release()
+
+    def _put(self, row: dict):
+        wo_id = row.get("WO_ID", "")
+        existing = self.index.get(wo_id)
+        if existing is not None:
+            existing.update(row)
+            return existing
+        self.rows.append(row)
+        self.index[wo_id] = row
+        return row
+
+    def _apply(self, rec: dict):
+        op = rec.get("op")
+        if op == "add":
+            row = self._blank_row()
+            row.update(self._normalize(rec.get("row", {})))
+            self._put(row)
+        elif op == "set":
+            row = self.index.get(rec.get("wo"))
+            if row is not None:
+                row.update(self._normalize(rec.get("set", {})))
+        elif op == "batch":
+            for sub in rec.get("changes", []):
+                self._apply(sub)
+        elif op == "del":
+            self._drop(set(rec.get("wo", [])))
+
+    def _drop(self, wo_ids: set):
+        dropped = [row for row in (self.index.pop(wo_id, None) for wo_id in wo_ids) if row is not None]
+        self.rows = [r for r in self.rows if r.get("WO_ID", "") not in wo_ids]
+        for row in dropped:
+            self._notify_drop(row)
+
+    # ---------- change log ----------
+    def _write_log(self, records: list):
+        if self._log is None:
+            self._log = open(self.log_path, "ab")
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        self._log.write(data)
+        self._log.flush()
+        end = self._log.tell()
+        if end - len(data) == self._log_pos:
+            self._log_pos = end   # else another writer appended first: poll() replays from _log_pos (idempotent)
+        self.bytes_written += len(data)
+        self.pending += len(records)
+
+    def _check_version(self, wo_id: str, row: dict, expected_version):
+        if expected_version is None or self.version_column is None:
+            return
+        actual = self.row_version(row)
+        if actual != int(expected_version):
+            self.conflicts += 1
+            raise VersionConflict(wo_id, int(expected_version), actual)
+
+    def _bump(self, row: dict, changes: dict):
+        # The new version travels in the "set" record, so replay needs nothing special
+        if self.version_column is not None:
+            changes[self.version_column] = str(self.row_version(row) + 1)
+
+    def _maybe_compact(self):
+        # After listeners ran, so they never see a row compaction has archived
+        if self.pending >= max(self.compact_min, int(len(self.rows) * self.compact_ratio)):
+            self.compact()
+
+    def _notify(self, row: dict):
+        for fn in self.listeners:
+            fn(row)
+
+    def _notify_drop(self, row: dict):
+        for fn in self.drop_listeners:
+            fn(row)
+
+    # ---------- public API ----------
+    def __len__(self):
+        return len(self.rows)
+
+    def subscribe(self, fn, on_drop=None):
+        """fn(row) after every append/update; on_drop(row) when a row leaves the store."""
+        self.listeners.append(fn)
+        if on_drop is not None:
+            self.drop_listeners.append(on_drop)
+
+    def get(self, wo_id: str):
+        return self.index.get(wo_id)
+
+    def iter_rows(self):
+        return iter(self.rows)
+
+    def row_version(self, row: dict) -> int:
+        """Version counter of a row (0 if the store has no version column)."""
+        if self.version_column is None:
+            return 0
+        try:
+            return int(row.get(self.version_column) or 0)
+        except ValueError:
+            return 0
+
+    def refresh(self):
+        """Catches up on other writers now (a no-op without lock_path)."""
+        with self._locked():
+            pass
+
+    def poll(self):
+        """
+        Read-only catch-up for views: applies other writers' changes without
+        taking the lock or writing anything (a torn tail is left for the next
+        writer to trim). Two stat() calls when nothing changed.
+        """
+        if self._lock_depth == 0:
+            self._catch_up(trim=False)
+
+    def locked(self):
+        """`with store.locked(): ...` holds the write lock across several writes (one acquire + catch-up)."""
+        return self._locked()
+
+    def append(self, wo_row: dict) -> dict:
+        with self._locked():
+            row = self._blank_row()
+            row.update(self._normalize(wo_row))
+            if self.version_column is not None:
+                row[self.version_column] = "1"
+            row = self._put(row)
+            self._write_log([{"op": "add", "row": dict(row)}])
+            self._notify(row)
+            self._maybe_compact()
+        return row
+
+    def update(self, wo_id: str, updates: dict, expected_version: int | None = None) -> bool:
+        """
+        Applies updates to one row and bumps its version. With expected_version
+        set, raises VersionConflict if the row's version is not that any more.
+        """
+        with self._locked():
+            row = self.index.get(wo_id)
+            if row is None:
+                return False
+            self._check_version(wo_id, row, expected_version)
+            changes = self._normalize(updates)
+            self._bump(row, changes)
+            row.update(changes)
+            self._write_log([{"op": "set", "wo": wo_id, "set": changes}])
+            self._notify(row)
+            self._maybe_compact()
+        return True
+
+    def update_many(self, changes: list) -> list:
+        """
+        Applies [(wo_id, updates), ...] as one change-log record (one write).
+        An entry may be (wo_id, updates, expected_version): it is skipped if
+        the row's version moved on. Unknown WO_IDs are skipped too; returns
+        the WO_IDs actually updated. Nothing is written when no row matches.
+        """
+        records = []
+        touched = []
+        with self._locked():
+            for wo_id, updates, *expected in changes:
+                row = self.index.get(wo_id)
+                if row is None:
+                    continue
+                try:
+                    self._check_version(wo_id, row, expected[0] if expected else None)
+                except VersionConflict:
+                    continue
+                sets = self._normalize(updates)
+                self._bump(row, sets)
+                row.update(sets)
+                records.append({"op": "set", "wo": wo_id, "set": sets})
+                touched.append(row)
+
+            if not records:
+                return []
+            if len(records) == 1:
+                self._write_log(records)
+            else:
+                # One line => replay sees all of the batch or none of it
+                self._write_log([{"op": "batch", "changes": records}])
+            for row in touched:
+                self._notify(row)
+            self._maybe_compact()
+        return [r["wo"] for r in records]
+
+    def compact(self, evict=None) -> int:
+        """
+        Folds the change log back into the CSV:
+        - rows matching evict (default self.evict) go to archive() first and a
+          "del" record is logged, so a replay agrees with the new CSV
+        - writes a temp file and os.replace()s it over work_orders.csv
+        - then truncates the log (replay is idempotent if we crash in between)
+        Returns the number of rows archived; no-op if there is nothing to do.
+        """
+        with self._locked():
+            evict = evict or self.evict
+            evicted = [r for r in self.rows if evict(r)] if evict and self.archive else []
+            if not evicted and not self.pending:
+                return 0
+            if evicted:
+                self.archive(evicted)
+                wo_ids = {r.get("WO_ID", "") for r in evicted}
+                self._write_log([{"op": "del", "wo": sorted(wo_ids)}])
+                self._drop(wo_ids)
+
+            tmp = self.csv_path + ".tmp"
+            with open(tmp, "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(self.columns)
+                for row in self.rows:
+                    w.writerow([row.get(col, "") for col in self.columns])
+            self.bytes_written += os.path.getsize(tmp)
+            os.replace(tmp, self.csv_path)
+            self._csv_stamp = _file_stamp(self.csv_path)
+
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            with open(self.log_path, "w", encoding="utf-8"):
+                pass
+            self._log_pos = 0
+            self.pending = 0
+        return len(evicted)
+
+    def close(self):
+        with self._locked():
+            if self.pending:
+                self.compact()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+def _touched_ids(rec: dict, out: set):
+    op = rec.get("op")
+    if op == "add":
+        out.add(rec.get("row", {}).get("WO_ID", ""))
+    elif op == "set":
+        out.add(rec.get("wo"))
+    elif op == "batch":
+        for sub in rec.get("changes", []):
+            _touched_ids(sub, out)